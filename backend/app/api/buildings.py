@@ -15,6 +15,8 @@ from ..models.building import Building
 from ..models.user import User
 from ..repos import buildings as buildings_repo
 from ..repos import users as users_repo
+from ..services.auth_cache import user_cache
+from ..services.projection_cache import projection_cache
 from ..services.roof import MicrosoftFootprintsAdapter, polygon_area_m2
 
 router = APIRouter(prefix="/buildings", tags=["buildings"])
@@ -92,6 +94,7 @@ async def create_building(
         )
 
     await session.commit()
+    user_cache.invalidate(user.id)
     return {"building": _serialize(building)}
 
 
@@ -145,6 +148,7 @@ async def set_roof(
         confidence=confidence_map[body.source],
     )
     await session.commit()
+    projection_cache.invalidate(bid)
     if building is None:
         raise HTTPException(status_code=404, detail="building_not_found")
     return {"building": _serialize(building)}
@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.session import get_session
@@ -12,6 +12,7 @@ from ..middleware.jwt import get_current_user
 from ..models.user import User
 from ..repos import buildings as buildings_repo
 from ..repos import prepaid as prepaid_repo
+from .pagination import NEXT_CURSOR_HEADER, BuildingFeedParams
 
 router = APIRouter(prefix="/discover", tags=["discover"])
 
@@ -19,24 +20,38 @@ router = APIRouter(prefix="/discover", tags=["discover"])
 @router.get("")
 async def discover(
     role: str,
+    response: Response,
+    feed: BuildingFeedParams = Depends(),
     _: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     """Return ProjectCard[] filtered by role intent.
 
-    Pilot scope: returns all non-retired buildings with role-specific gap copy.
-    Real filtering (region, deal size, equipment match) lands post-pilot.
+    Retired buildings are never listed. Filters: stage (repeatable), kind,
+    region (address match). Keyset-paged via limit/cursor; see
+    BuildingFeedParams. Deal-size and equipment matching land post-pilot.
     """
     if role not in {"provider", "electrician", "financier"}:
         raise HTTPException(status_code=400, detail="invalid_role")
 
-    buildings = await buildings_repo.list_all(session)
+    try:
+        buildings, next_cursor = await buildings_repo.list_page(
+            session,
+            limit=feed.limit,
+            after=feed.cursor,
+            stages=feed.stages,
+            exclude_stages=["retired"],
+            kind=feed.kind,
+            region=feed.region,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_cursor")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    pledged_totals = await prepaid_repo.confirmed_totals(session, [b.id for b in buildings])
     cards = []
     for b in buildings:
-        if b.stage == "retired":
-            continue
-
-        pledged = await prepaid_repo.confirmed_total(session, b.id)
+        pledged = pledged_totals[b.id]
         # Heuristic readiness "gap" copy by role
         if role == "provider":
             gap = "Needs panels + inverter + balance-of-system"
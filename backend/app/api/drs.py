@@ -1,28 +1,50 @@
-"""DRS endpoints — DB-backed reads; canonical scoring via project_building + calculate_drs."""
+"""DRS endpoints — served from the per-building DRS snapshot store (services/drs_store.py)."""
 from __future__ import annotations
 
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.session import get_session
-from ..middleware.jwt import get_current_user
+from ..middleware.jwt import get_current_user, require_admin, require_role
+from ..models.building import Building
+from ..models.drs import DrsTransition
 from ..models.user import User
+from ..repos import audit as audit_repo
 from ..repos import buildings as buildings_repo
-from ..repos import prepaid as prepaid_repo
-from ..services.building_drs import resolve_project_dict_for_drs
-from ..services.projector import project_building
+from ..repos import drs as drs_repo
+from ..schemas.drs import DrsUpdateInput
+from ..services import drs_store
+from ..services.projection_cache import projection_cache
 
 router = APIRouter(prefix="/drs", tags=["drs"])
 
 
-@router.get("/{building_id}")
-async def get_drs(
-    building_id: str,
-    user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
-):
+class DrsUpdateBody(BaseModel):
+    gates: DrsUpdateInput
+
+
+def _serialize_transition(t: DrsTransition) -> dict:
+    return {
+        "version": t.version,
+        "score": t.score,
+        "decision": t.decision,
+        "previousScore": t.previous_score,
+        "previousDecision": t.previous_decision,
+        "changedInputs": list(t.changed_inputs),
+        "createdAt": t.created_at.isoformat() if t.created_at else None,
+    }
+
+
+@router.get("/cache/stats")
+async def projection_cache_stats(_admin: User = Depends(require_admin)):
+    """Hit/miss/eviction/refresh counters for this process's projection cache."""
+    return projection_cache.stats()
+
+
+async def _readable_building(session: AsyncSession, building_id: str, user: User) -> Building:
     try:
         bid = uuid.UUID(building_id)
     except ValueError:
@@ -34,16 +56,52 @@ async def get_drs(
 
     if user.role in {"resident", "homeowner", "building_owner"} and user.building_id != bid:
         raise HTTPException(status_code=403, detail="not_your_building")
+    return building
+
 
-    pledged = await prepaid_repo.confirmed_total(session, bid)
-    project = resolve_project_dict_for_drs(building, float(pledged))
-    projected = project_building(project)
-    return projected["drs"]
+@router.get("/{building_id}")
+async def get_drs(
+    building_id: str,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    building = await _readable_building(session, building_id, user)
+    snapshot = await drs_store.current(session, building)
+    await session.commit()  # persists a refresh when the stored inputs were stale
+    return drs_store.cached_result(snapshot)
 
 
 @router.get("/{building_id}/history")
 async def drs_history(
     building_id: str,
-    _: User = Depends(get_current_user),
+    limit: int = 50,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Score/decision transitions, newest first."""
+    building = await _readable_building(session, building_id, user)
+    rows = await drs_repo.history(session, building.id, limit=max(1, min(limit, 500)))
+    return [_serialize_transition(t) for t in rows]
+
+
+@router.post("/{building_id}/update")
+async def update_drs(
+    building_id: str,
+    body: DrsUpdateBody,
+    user: User = Depends(require_role("admin", "electrician")),
+    session: AsyncSession = Depends(get_session),
 ):
-    return []
+    building = await _readable_building(session, building_id, user)
+    gates = body.gates.model_dump(exclude_none=True)
+    snapshot = await drs_store.refresh(session, building, overrides=gates)
+    await audit_repo.log_event(
+        session,
+        actor_user_id=user.id,
+        action="drs.updated",
+        target_type="building",
+        target_id=str(building.id),
+        payload={"gates": gates, "version": snapshot.version},
+    )
+    await session.commit()
+    projection_cache.invalidate(building.id)
+    return {"drs": drs_store.result(snapshot)}
@@ -1,22 +1,37 @@
 """Energy time-series endpoints."""
 from __future__ import annotations
 
+import asyncio
+import csv
+import io
+import json
 import uuid
+from collections.abc import AsyncIterator, Sequence
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db.session import get_session
-from ..middleware.jwt import get_current_user
-from ..models.energy import EnergyReading
+from ..config import get_settings
+from ..db.session import SessionLocal, get_session
+from ..middleware.jwt import get_current_user, require_admin
+from ..models.energy import EnergyRollupDaily, EnergyRollupHourly
 from ..models.user import User
 from ..repos import energy as energy_repo
+from ..services.ingest import ingest_readings
+from ..services.telemetry_hub import telemetry_hub
 
 router = APIRouter(prefix="/energy", tags=["energy"])
+RESOLUTION_HEADER = "X-Energy-Resolution"
 
+# Backpressure for measured ingest: excess concurrent batches get 429, not a queue.
+_INGEST_SLOTS = asyncio.Semaphore(get_settings().ingest_max_concurrency)
 
-def _serialize(r: EnergyReading) -> dict:
+
+def _serialize(r: Row) -> dict:
     return {
         "buildingId": str(r.building_id),
         "timestamp": r.timestamp.isoformat() if r.timestamp else None,
@@ -28,23 +43,73 @@ def _serialize(r: EnergyReading) -> dict:
     }
 
 
+def _serialize_bucket(r: EnergyRollupHourly | EnergyRollupDaily | Row, resolution: str) -> dict:
+    return {
+        "buildingId": str(r.building_id),
+        "timestamp": r.bucket.isoformat(),
+        "kind": r.kind,
+        "value": float(r.value_sum),
+        "min": float(r.value_min),
+        "max": float(r.value_max),
+        "count": int(r.sample_count),
+        "unit": energy_repo.KIND_UNITS[r.kind],
+        "source": None,
+        "provenance": f"rollup:{resolution}",
+    }
+
+
 @router.get("/{building_id}/series")
 async def series(
     building_id: str,
     kind: str,
-    from_: str | None = None,
+    response: Response,
+    from_: str | None = Query(default=None, alias="from"),
     to: str | None = None,
+    resolution: str | None = None,
+    max_points: int | None = Query(default=None, alias="maxPoints", ge=2, le=10_000),
     _: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
+    """Readings for one kind over [from, to].
+
+    ``resolution`` (raw|hour|day) selects the raw table or a rollup. With
+    ``maxPoints`` the series is re-bucketed in the database so at most that many
+    points come back; ``resolution`` then acts as the minimum bucket size. The
+    resolution actually served is returned in the ``X-Energy-Resolution`` header.
+    """
     try:
         bid = uuid.UUID(building_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="invalid_building_id")
     if kind not in ("generation", "load", "irradiance"):
         raise HTTPException(status_code=400, detail="invalid_kind")
+    if resolution not in (None, "raw") and resolution not in energy_repo.ROLLUP_MODELS:
+        raise HTTPException(status_code=400, detail="invalid_resolution")
     start = datetime.fromisoformat(from_) if from_ else datetime(1970, 1, 1)
     end = datetime.fromisoformat(to) if to else datetime.utcnow()
+
+    if max_points is not None:
+        first, last, count = await energy_repo.series_extent(session, bid, kind=kind, start=start, end=end)
+        floor_seconds = {"hour": 3_600, "day": 86_400}.get(resolution or "raw", 0)
+        if first is None or (count <= max_points and floor_seconds == 0):
+            resolution = "raw"
+        else:
+            span = min(last, energy_repo.as_utc(end)) - max(first, energy_repo.as_utc(start))
+            width = energy_repo.pick_bucket_seconds(span.total_seconds(), max_points, floor_seconds)
+            label = energy_repo.resolution_label(width)
+            buckets = await energy_repo.bucketed_series(
+                session, bid, kind=kind, start=start, end=end, width_seconds=width
+            )
+            response.headers[RESOLUTION_HEADER] = label
+            return [_serialize_bucket(b, label) for b in buckets]
+
+    resolution = resolution or "raw"
+    response.headers[RESOLUTION_HEADER] = resolution
+    if resolution != "raw":
+        buckets = await energy_repo.rollup_series(
+            session, bid, kind=kind, start=start, end=end, resolution=resolution
+        )
+        return [_serialize_bucket(b, resolution) for b in buckets]
     rows = await energy_repo.series(session, bid, kind=kind, start=start, end=end)
     return [_serialize(r) for r in rows]
 
@@ -60,3 +125,163 @@ async def today(
     except ValueError:
         raise HTTPException(status_code=400, detail="invalid_building_id")
     return await energy_repo.today_summary(session, bid)
+
+
+_EXPORT_COLUMNS = ("buildingId", "timestamp", "kind", "value", "unit", "source", "provenance")
+_EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+async def _encode_ndjson(chunks: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    async for chunk in chunks:
+        yield "".join(json.dumps(_serialize(r)) + "\n" for r in chunk)
+
+
+async def _encode_csv(chunks: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(_EXPORT_COLUMNS)
+    async for chunk in chunks:
+        writer.writerows(_serialize(r).values() for r in chunk)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+async def _encode_arrow(chunks: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    import pyarrow as pa  # optional dependency; availability is checked before streaming starts
+
+    schema = pa.schema(
+        [
+            ("buildingId", pa.string()),
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("kind", pa.string()),
+            ("value", pa.float64()),
+            ("unit", pa.string()),
+            ("source", pa.string()),
+            ("provenance", pa.string()),
+        ]
+    )
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for chunk in chunks:
+            writer.write_batch(
+                pa.record_batch(
+                    [
+                        pa.array([str(r.building_id) for r in chunk], pa.string()),
+                        pa.array([r.timestamp for r in chunk], schema.field("timestamp").type),
+                        pa.array([r.kind for r in chunk], pa.string()),
+                        pa.array([float(r.value) for r in chunk], pa.float64()),
+                        pa.array([r.unit for r in chunk], pa.string()),
+                        pa.array([r.source for r in chunk], pa.string()),
+                        pa.array([r.provenance for r in chunk], pa.string()),
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # End-of-stream marker written on close.
+    yield sink.getvalue()
+
+
+_EXPORT_ENCODERS = {"ndjson": _encode_ndjson, "csv": _encode_csv, "arrow": _encode_arrow}
+
+
+@router.get("/{building_id}/export")
+async def export(
+    building_id: str,
+    kind: str,
+    from_: str | None = Query(default=None, alias="from"),
+    to: str | None = None,
+    format: str = "ndjson",
+    _: User = Depends(get_current_user),
+):
+    """Stream raw readings as NDJSON, CSV or Arrow IPC (stream format).
+
+    Rows are pulled through a server-side cursor in fixed-size chunks and
+    encoded chunk by chunk, so a multi-month export never holds the whole
+    range in memory. The stream owns its session because it outlives the
+    request's dependency scope. Arrow requires the optional ``pyarrow`` package.
+    """
+    try:
+        bid = uuid.UUID(building_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_building_id")
+    if kind not in ("generation", "load", "irradiance"):
+        raise HTTPException(status_code=400, detail="invalid_kind")
+    if format not in _EXPORT_ENCODERS:
+        raise HTTPException(status_code=400, detail="invalid_format")
+    if format == "arrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="arrow_unavailable")
+    start = datetime.fromisoformat(from_) if from_ else datetime(1970, 1, 1)
+    end = datetime.fromisoformat(to) if to else datetime.utcnow()
+
+    async def _chunks() -> AsyncIterator[Sequence[Row]]:
+        async with SessionLocal() as session:
+            async for chunk in energy_repo.stream_series(session, bid, kind=kind, start=start, end=end):
+                yield chunk
+
+    return StreamingResponse(
+        _EXPORT_ENCODERS[format](_chunks()),
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="energy-{bid}-{kind}.{format}"'},
+    )
+
+
+class IngestReading(BaseModel):
+    building_id: uuid.UUID = Field(alias="buildingId")
+    timestamp: datetime
+    kind: str
+    value: float
+    provenance: str = Field(min_length=1)
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class IngestBody(BaseModel):
+    readings: list[IngestReading]
+
+
+@router.post("/ingest")
+async def ingest(
+    body: IngestBody,
+    _admin: User = Depends(require_admin),
+    session: AsyncSession = Depends(get_session),
+):
+    """Load a batch of measured meter/inverter readings (source='measured').
+
+    Invalid rows are rejected individually (first 50 reasons returned); repeated
+    (building, kind, timestamp) keys are skipped. Batches above
+    ``ingest_max_batch`` get 413; when ``ingest_max_concurrency`` batches are
+    already loading the call gets 429 so devices back off and retry. After the
+    commit, each building's newest values go out to /ws/{building_id} listeners.
+    """
+    if len(body.readings) > get_settings().ingest_max_batch:
+        raise HTTPException(status_code=413, detail="batch_too_large")
+    if _INGEST_SLOTS.locked():
+        raise HTTPException(status_code=429, detail="ingest_busy", headers={"Retry-After": "1"})
+    async with _INGEST_SLOTS:
+        report = await ingest_readings(session, [r.model_dump() for r in body.readings])
+        await session.commit()
+    for building_id, delta in report.deltas.items():
+        await telemetry_hub.publish(building_id, "energy.readings", delta)
+    return {
+        "received": report.received,
+        "accepted": report.accepted,
+        "inserted": report.inserted,
+        "duplicates": report.duplicates,
+        "rejected": report.rejected,
+        "seconds": round(report.seconds, 4),
+        "rowsPerSecond": round(report.rows_per_second, 1),
+        "errors": report.errors,
+    }
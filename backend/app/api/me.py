@@ -19,6 +19,8 @@ from ..models.user import User
 from ..repos import audit as audit_repo
 from ..repos import buildings as buildings_repo
 from ..repos import users as users_repo
+from ..services.auth_cache import user_cache
+from ..services.projection_cache import projection_cache
 
 router = APIRouter(prefix="/me", tags=["me"])
 
@@ -100,6 +102,7 @@ async def select_role(
 
     await session.execute(update(User).where(User.id == user.id).values(**values))
     await session.commit()
+    user_cache.invalidate(user.id)
 
     refreshed = await users_repo.get_by_id(session, user.id)
     assert refreshed is not None
@@ -159,6 +162,7 @@ async def onboarding_complete(
 
     await session.execute(update(User).where(User.id == user.id).values(**values))
     await session.commit()
+    user_cache.invalidate(user.id)
 
     refreshed = await users_repo.get_by_id(session, user.id)
     assert refreshed is not None
@@ -201,6 +205,8 @@ async def join_building(
         payload={"code": body.code.upper().strip()},
     )
     await session.commit()
+    user_cache.invalidate(user.id)
+    projection_cache.invalidate(building.id)
 
     return {
         "building": {
@@ -0,0 +1,37 @@
+"""Shared query parameters for paged building feeds (/projects, /discover)."""
+from __future__ import annotations
+
+from fastapi import HTTPException, Query
+
+BUILDING_STAGES = ("listed", "qualifying", "funding", "installing", "live", "retired")
+BUILDING_KINDS = ("apartment", "single_family")
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+
+
+class BuildingFeedParams:
+    """?stage=…&stage=…&kind=…&region=…&limit=…&cursor=… with validation.
+
+    The response body stays a plain array; when more rows exist the cursor
+    for the next page is returned in the X-Next-Cursor header. Paging is
+    opt-in: without limit or cursor the whole (filtered) feed comes back, as
+    it did before paging existed; a cursor alone pages by DEFAULT_PAGE_SIZE.
+    """
+
+    def __init__(
+        self,
+        stage: list[str] | None = Query(default=None),
+        kind: str | None = None,
+        region: str | None = Query(default=None, max_length=80),
+        limit: int | None = Query(default=None, ge=1, le=500),
+        cursor: str | None = None,
+    ) -> None:
+        if stage and any(s not in BUILDING_STAGES for s in stage):
+            raise HTTPException(status_code=400, detail="invalid_stage")
+        if kind is not None and kind not in BUILDING_KINDS:
+            raise HTTPException(status_code=400, detail="invalid_kind")
+        self.stages = stage
+        self.kind = kind
+        self.region = region.strip() if region else None
+        self.limit = DEFAULT_PAGE_SIZE if limit is None and cursor is not None else limit
+        self.cursor = cursor
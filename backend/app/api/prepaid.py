@@ -17,6 +17,8 @@ from ..repos import audit as audit_repo
 from ..repos import buildings as buildings_repo
 from ..repos import prepaid as prepaid_repo
 from ..repos import wallet as wallet_repo
+from ..services import drs_store
+from ..services.projection_cache import projection_cache
 
 router = APIRouter(prefix="/prepaid", tags=["prepaid"])
 
@@ -81,7 +83,9 @@ async def commit_pledge(
         target_id=str(building_id),
         payload={"amount_kes": body.amount_kes, "commitment_id": str(pledge.id)},
     )
+    await drs_store.refresh(session, building)
     await session.commit()
+    projection_cache.invalidate(building_id)
     return {"commitment": _serialize(pledge)}
 
 
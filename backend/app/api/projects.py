@@ -8,8 +8,9 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from decimal import Decimal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db.session import get_session
@@ -17,12 +18,12 @@ from ..middleware.jwt import get_current_user
 from ..models.user import User
 from ..repos import buildings as buildings_repo
 from ..repos import prepaid as prepaid_repo
+from .pagination import NEXT_CURSOR_HEADER, BuildingFeedParams
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
-async def _serialize_with_pledged(session: AsyncSession, building) -> dict:
-    pledged = await prepaid_repo.confirmed_total(session, building.id)
+def _serialize_with_pledged(building, pledged: Decimal) -> dict:
     return {
         "id": str(building.id),
         "name": building.name,
@@ -47,18 +48,34 @@ async def _serialize_with_pledged(session: AsyncSession, building) -> dict:
 
 @router.get("")
 async def list_projects(
+    response: Response,
+    feed: BuildingFeedParams = Depends(),
     user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
-    rows = await buildings_repo.list_all(session)
-
     # Scope: residents/homeowners/building_owners see only their own building.
     # Other roles see the full portfolio (provider/electrician/financier need it
-    # for Discover; admin needs it for the cockpit).
+    # for Discover; admin needs it for the cockpit), keyset-paged and filtered.
     if user.role in {"resident", "homeowner", "building_owner"} and user.building_id:
-        rows = [r for r in rows if r.id == user.building_id]
+        own = await buildings_repo.get(session, user.building_id)
+        rows = [own] if own is not None else []
+    else:
+        try:
+            rows, next_cursor = await buildings_repo.list_page(
+                session,
+                limit=feed.limit,
+                after=feed.cursor,
+                stages=feed.stages,
+                kind=feed.kind,
+                region=feed.region,
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid_cursor")
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
-    return [await _serialize_with_pledged(session, b) for b in rows]
+    pledged = await prepaid_repo.confirmed_totals(session, [b.id for b in rows])
+    return [_serialize_with_pledged(b, pledged[b.id]) for b in rows]
 
 
 @router.get("/{building_id}")
@@ -76,4 +93,4 @@ async def get_project(
         raise HTTPException(status_code=404, detail="building_not_found")
     if user.role in {"resident", "homeowner", "building_owner"} and user.building_id != bid:
         raise HTTPException(status_code=403, detail="not_your_building")
-    return await _serialize_with_pledged(session, building)
+    return _serialize_with_pledged(building, await prepaid_repo.confirmed_total(session, bid))
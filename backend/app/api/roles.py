@@ -12,6 +12,7 @@ from ..db.session import get_session
 from ..middleware.jwt import get_current_user
 from ..models.user import User
 from ..repos import buildings as buildings_repo
+from ..repos import prepaid as prepaid_repo
 from .projects import _serialize_with_pledged
 
 router = APIRouter(prefix="/roles", tags=["roles"])
@@ -43,7 +44,8 @@ async def role_home(
     rows = await buildings_repo.list_all(session)
     if user.role in {"resident", "homeowner", "building_owner"} and user.building_id:
         rows = [r for r in rows if r.id == user.building_id]
-    projects = [await _serialize_with_pledged(session, b) for b in rows]
+    pledged = await prepaid_repo.confirmed_totals(session, [b.id for b in rows])
+    projects = [_serialize_with_pledged(b, pledged[b.id]) for b in rows]
     primary = projects[0] if projects else None
     return {
         "role": role,
@@ -1,9 +1,8 @@
-"""Settlement endpoints — pilot mode runs always tag simulation=true."""
+"""Settlement endpoints — runs settle metered energy via services/settlement_engine; pilot mode tags simulation=true."""
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timedelta, timezone
-from decimal import Decimal
+from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, ConfigDict, Field
@@ -14,8 +13,9 @@ from ..middleware.jwt import get_current_user, require_admin
 from ..models.settlement import SettlementPeriod
 from ..models.user import User
 from ..repos import buildings as buildings_repo
-from ..repos import prepaid as prepaid_repo
 from ..repos import settlement as settlement_repo
+from ..services import settlement_engine
+from ..services.settlement_runner import run_portfolio_settlement
 
 router = APIRouter(prefix="/settlement", tags=["settlement"])
 
@@ -59,41 +59,48 @@ async def run_settlement(
     if building is None:
         raise HTTPException(status_code=404, detail="building_not_found")
 
-    pledged = await prepaid_repo.confirmed_total(session, bid)
-    if pledged <= 0:
-        raise HTTPException(status_code=400, detail="zero_pledge")
-
-    # Pilot waterfall — minimal but real allocation.
-    revenue = Decimal(str(pledged))
-    reserve = revenue * Decimal("0.10")
-    provider = revenue * Decimal("0.40")
-    financier = revenue * Decimal("0.20")
-    owner = revenue * Decimal("0.20")
-    emappa = revenue - reserve - provider - financier - owner
-
-    period = await settlement_repo.create_period(
-        session,
-        building_id=bid,
-        period_start=datetime.fromisoformat(body.period_start),
-        period_end=datetime.fromisoformat(body.period_end),
-        e_gen=Decimal(0),
-        e_sold=Decimal(0),
-        e_waste=Decimal(0),
-        revenue_kes=revenue,
-        payouts={
-            "reserve": float(reserve),
-            "provider": float(provider),
-            "financier": float(financier),
-            "owner": float(owner),
-            "emappa": float(emappa),
-        },
-        simulation=True,
-        data_source="synthetic",
-    )
+    try:
+        period_start = datetime.fromisoformat(body.period_start)
+        period_end = datetime.fromisoformat(body.period_end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_period")
+
+    try:
+        period = await settlement_engine.settle_period(session, building, period_start, period_end)
+    except settlement_engine.SettlementError as exc:
+        raise HTTPException(status_code=400, detail=exc.code)
     await session.commit()
     return {"period": _serialize(period)}
 
 
+class RunAllBody(BaseModel):
+    period_start: str = Field(alias="periodStart")
+    period_end: str = Field(alias="periodEnd")
+    workers: int | None = Field(default=None, ge=1, le=32)
+    shard_size: int | None = Field(default=None, alias="shardSize", ge=1, le=1000)
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+@router.post("/run-all")
+async def run_all(
+    body: RunAllBody,
+    _admin: User = Depends(require_admin),
+):
+    """Settle every live building for the period; returns the run report."""
+    try:
+        period_start = datetime.fromisoformat(body.period_start)
+        period_end = datetime.fromisoformat(body.period_end)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_period")
+    try:
+        return await run_portfolio_settlement(
+            period_start, period_end, workers=body.workers, shard_size=body.shard_size
+        )
+    except settlement_engine.SettlementError as exc:
+        raise HTTPException(status_code=400, detail=exc.code)
+
+
 @router.get("/{building_id}/latest")
 async def latest(
     building_id: str,
@@ -1,12 +1,90 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+"""WS /ws/{building_id}?token=<jwt> — live per-building telemetry.
+
+Browsers cannot set Authorization on a WebSocket upgrade, so the JWT comes in
+the ``token`` query parameter. Residents may only follow their own building,
+as with GET /drs/{building_id}. After the ``connected`` frame the socket gets
+every frame published to the building's topic (see services.telemetry_hub).
+A client that falls a full queue behind is closed with 1013 (try again
+later) and should reconnect.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+
+from ..db.session import SessionLocal
+from ..middleware.jwt import require_admin
+from ..models.user import User
+from ..repos import users as users_repo
+from ..services.auth_cache import user_cache
+from ..services.jwt import JwtDecodeError, decode_token, user_id_from_payload
+from ..services.telemetry_hub import telemetry_hub
 
 router = APIRouter(tags=["websocket"])
 
+_BUILDING_SCOPED_ROLES = {"resident", "homeowner", "building_owner"}
+
+
+async def _authorize(token: str | None, building_id: uuid.UUID) -> str | None:
+    """Return a close reason, or None when the token may follow building_id."""
+    if not token:
+        return "missing_token"
+    try:
+        user_id = user_id_from_payload(decode_token(token))
+    except (JwtDecodeError, KeyError, ValueError):
+        return "invalid_token"
+    user = user_cache.get(user_id)
+    if user is None:
+        async with SessionLocal() as session:
+            user = await users_repo.get_by_id(session, user_id)
+            if user is None:
+                return "user_not_found"
+            session.expunge(user)
+        user_cache.put(user)
+    if user.role in _BUILDING_SCOPED_ROLES and user.building_id != building_id:
+        return "forbidden"
+    return None
+
+
+@router.get("/ws/metrics")
+async def telemetry_metrics(_admin: User = Depends(require_admin)):
+    """Fan-out counters and publish → send latency percentiles for this process."""
+    return telemetry_hub.metrics()
+
 
 @router.websocket("/ws/{building_id}")
-async def websocket_endpoint(websocket: WebSocket, building_id: str):
+async def websocket_endpoint(websocket: WebSocket, building_id: str, token: str | None = None):
+    try:
+        bid = uuid.UUID(building_id)
+    except ValueError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="invalid_building_id")
+        return
+    refused = await _authorize(token, bid)
+    if refused:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=refused)
+        return
+
     await websocket.accept()
-    await websocket.send_json({"type": "connected", "buildingId": building_id, "data": {}, "timestamp": None})
+    sub = await telemetry_hub.subscribe(str(bid))
+    try:
+        await websocket.send_json({"type": "connected", "buildingId": str(bid), "data": {}, "timestamp": None})
+        pump = asyncio.create_task(telemetry_hub.pump(sub, websocket.send_text))
+        listen = asyncio.create_task(_until_disconnect(websocket))
+        await asyncio.wait({pump, listen}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (pump, listen):
+            task.cancel()
+        await asyncio.gather(pump, listen, return_exceptions=True)
+        if sub.dropped and not listen.done():
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="slow_consumer")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        telemetry_hub.unsubscribe(sub)
+
+
+async def _until_disconnect(websocket: WebSocket) -> None:
     try:
         while True:
             await websocket.receive_text()
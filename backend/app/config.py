@@ -26,6 +26,41 @@ class Settings(BaseSettings):
     ms_footprints_base: str = "https://minedbuildings.z5.web.core.windows.net"
     google_maps_static_key: str = ""
 
+    # Shared outbound HTTP pool + response cache for the adapters above
+    http_max_connections: int = 20
+    http_max_connections_per_host: int = 4
+    http_cache_max_entries: int = 256
+    http_cache_dir: str = ""  # empty = in-memory only
+    open_meteo_cache_ttl_seconds: float = 3_600.0
+    geocode_cache_ttl_seconds: float = 7 * 86_400.0
+    nominatim_min_interval_seconds: float = 1.0  # Nominatim usage policy: max 1 req/s
+
+    # Per-kWp PVWatts profiles (float32 .npy) keyed by snapped site/orientation
+    pv_profile_dir: str = ".cache/pv_profiles"
+    pv_profile_grid_deg: float = 0.05
+
+    # Measured-reading ingest (POST /energy/ingest)
+    ingest_max_batch: int = 50_000
+    ingest_chunk_rows: int = 10_000
+    ingest_max_concurrency: int = 2
+
+    # Per-process cache of GET /drs/{building_id} payloads (services/projection_cache.py)
+    projection_cache_max_entries: int = 1_024
+    projection_cache_ttl_seconds: float = 300.0
+
+    # Portfolio settlement (POST /settlement/run-all): shards of buildings, one session per shard
+    settlement_workers: int = 4
+    settlement_shard_size: int = 50
+
+    # Auth fast path: cached user snapshots + batched last_seen_at writes
+    auth_user_cache_ttl_seconds: float = 30.0
+    auth_user_cache_max_entries: int = 10_000
+    last_seen_flush_seconds: float = 60.0
+
+    # Live telemetry fan-out for WS /ws/{building_id}: "memory" (one process) or "postgres" (LISTEN/NOTIFY)
+    telemetry_backend: str = "memory"
+    ws_client_queue_size: int = 64
+
     # Dev-only seed switch
     dev_seed: bool = False
 
@@ -1,6 +1,8 @@
 """FastAPI app — wiring."""
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -25,10 +27,23 @@ from .api import (
     wallet,
     websocket,
 )
+from .api.pagination import NEXT_CURSOR_HEADER
 from .config import get_settings
+from .services.auth_cache import last_seen_tracker
+from .services.http_pool import http_pool
+from .services.telemetry_hub import telemetry_hub
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    await last_seen_tracker.flush()
+    await telemetry_hub.close()
+    await http_pool.aclose()
+
 
 settings = get_settings()
-app = FastAPI(title=settings.app_name, version="0.1.0")
+app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -36,6 +51,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, energy.RESOLUTION_HEADER],
 )
 
 for router in [
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ..db.session import get_session
 from ..models.user import User
 from ..repos import users as users_repo
+from ..services.auth_cache import last_seen_tracker, user_cache
 from ..services.jwt import JwtDecodeError, decode_token, user_id_from_payload
 
 
@@ -26,12 +27,17 @@ async def get_current_user(
         ) from exc
 
     user_id = user_id_from_payload(payload)
-    user = await users_repo.get_by_id(session, user_id)
-    if user is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="user_not_found")
-    await users_repo.touch_last_seen(session, user_id)
-    await session.commit()
-    return user
+    cached = user_cache.get(user_id)
+    if cached is None:
+        loaded = await users_repo.get_by_id(session, user_id)
+        if loaded is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="user_not_found")
+        session.expunge(loaded)
+        user_cache.put(loaded)
+        cached = loaded
+    # No write transaction here: last_seen_at is batched by the tracker.
+    last_seen_tracker.mark(user_id)
+    return await session.merge(cached, load=False)
 
 
 def require_role(*allowed: str):
@@ -7,7 +7,8 @@ from ..db.session import Base
 from .audit import AuditLog
 from .building import Building
 from .certification import Certification
-from .energy import EnergyReading
+from .drs import DrsSnapshot, DrsTransition
+from .energy import EnergyProvenance, EnergyReading, EnergyRollupDaily, EnergyRollupHourly
 from .financier import FinancierPosition
 from .inventory import InventoryItem
 from .job import Job
@@ -22,7 +23,12 @@ __all__ = [
     "AuditLog",
     "Building",
     "Certification",
+    "DrsSnapshot",
+    "DrsTransition",
+    "EnergyProvenance",
     "EnergyReading",
+    "EnergyRollupDaily",
+    "EnergyRollupHourly",
     "FinancierPosition",
     "InventoryItem",
     "Job",
@@ -6,7 +6,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import DateTime, Boolean, CheckConstraint, Integer, Numeric, Text, func
+from sqlalchemy import DateTime, Boolean, CheckConstraint, Index, Integer, Numeric, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -36,6 +36,7 @@ class Building(Base):
             "data_source IN ('synthetic','measured','mixed')",
             name="buildings_data_source_check",
         ),
+        Index("idx_buildings_created_id", "created_at", "id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
@@ -0,0 +1,52 @@
+"""DRS snapshots — the current DRS per building plus its score/decision transitions.
+
+drs_snapshots holds one row per building: the calculate_drs inputs last seen,
+their rule outcome (services.drs.drs_outcome — gate codes, bits, components;
+messages are rebuilt from the rule tables on read), the gate overrides
+written through POST /drs/{id}/update, and the resolver fingerprint
+(``source_key``) the inputs were derived from. drs_transitions is append-only and gets a row only
+when a write moves the score or the decision, tagged with the inputs that
+changed. See services/drs_store.py and migrations/versions/0007_drs_snapshots.py.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, DateTime, Double, ForeignKey, Identity, Index, Integer, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.session import Base
+
+
+class DrsSnapshot(Base):
+    __tablename__ = "drs_snapshots"
+
+    building_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("buildings.id"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_key: Mapped[str] = mapped_column(Text, nullable=False)
+    inputs: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    overrides: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, server_default="{}")
+    outcome: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class DrsTransition(Base):
+    __tablename__ = "drs_transitions"
+    __table_args__ = (Index("idx_drs_transitions_building_id", "building_id", "id"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    building_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("buildings.id"), nullable=False
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    score: Mapped[float] = mapped_column(Double, nullable=False)
+    decision: Mapped[str] = mapped_column(Text, nullable=False)
+    previous_score: Mapped[float | None] = mapped_column(Double, nullable=True)
+    previous_decision: Mapped[str | None] = mapped_column(Text, nullable=True)
+    changed_inputs: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
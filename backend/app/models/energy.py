@@ -1,32 +1,99 @@
-"""EnergyReading — time-series synthetic + measured readings per building."""
+"""EnergyReading — time-series synthetic + measured readings per building.
+
+energy_readings is range-partitioned by month on "timestamp" (one child table
+per UTC month, created on demand by energy_readings_ensure_partitions), so old
+months can be detached/dropped without touching live data. Rows are kept
+compact: kind and source are smallint codes, provenance points into the small
+energy_provenances dictionary, and unit is implied by kind. CodedText maps the
+codes back to the public labels, so queries keep comparing against strings.
+
+Hourly and daily rollups (sum/min/max/count per building, kind, bucket) sit
+alongside the raw table so dashboards never scan raw rows. They are maintained
+by repos.energy.bulk_insert_readings; see migrations/versions/0003_energy_rollups.py
+and 0005_energy_readings_partitioned.py.
+"""
 from __future__ import annotations
 
 import uuid
 from datetime import datetime
-from decimal import Decimal
 
-from sqlalchemy import DateTime, BigInteger, CheckConstraint, ForeignKey, Index, Numeric, Text
+from sqlalchemy import DateTime, CheckConstraint, Double, ForeignKey, Integer, SmallInteger, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator
 
 from ..db.session import Base
 
+# Storage codes. Append only — existing codes are baked into stored rows.
+KIND_CODES = {"generation": 1, "load": 2, "irradiance": 3}
+SOURCE_CODES = {"synthetic": 1, "measured": 2}
+
+
+class CodedText(TypeDecorator):
+    """Text label stored as a smallint code. Unknown labels bind as NULL."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes: dict[str, int]):
+        super().__init__()
+        self.codes = tuple(codes.items())
+        self._by_label = dict(codes)
+        self._by_code = {code: label for label, code in codes.items()}
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self._by_label.get(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self._by_code[value]
+
+
+class EnergyProvenance(Base):
+    """Dictionary of provenance labels ('seed:pvwatts-fallback', 'meter:…'), referenced by id."""
+
+    __tablename__ = "energy_provenances"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    label: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+
 
 class EnergyReading(Base):
     __tablename__ = "energy_readings"
     __table_args__ = (
-        CheckConstraint("kind IN ('generation','load','irradiance')", name="energy_kind_check"),
-        CheckConstraint("source IN ('synthetic','measured')", name="energy_source_check"),
-        Index("idx_energy_building_kind_time", "building_id", "kind", "timestamp"),
+        CheckConstraint("kind BETWEEN 1 AND 3", name="energy_kind_check"),
+        CheckConstraint("source IN (1, 2)", name="energy_source_check"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
     )
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     building_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("buildings.id"), nullable=False
+        UUID(as_uuid=True), ForeignKey("buildings.id"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(CodedText(KIND_CODES), primary_key=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    value: Mapped[float] = mapped_column(Double, nullable=False)
+    source: Mapped[str] = mapped_column(CodedText(SOURCE_CODES), nullable=False)
+    provenance_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("energy_provenances.id"), nullable=False
     )
-    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    kind: Mapped[str] = mapped_column(Text, nullable=False)
-    value: Mapped[Decimal] = mapped_column(Numeric, nullable=False)
-    unit: Mapped[str] = mapped_column(Text, nullable=False)
-    source: Mapped[str] = mapped_column(Text, nullable=False)
-    provenance: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class _EnergyRollupColumns:
+    """Shared columns for the time-bucketed rollup tables. Buckets are UTC-aligned."""
+
+    building_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("buildings.id"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(CodedText(KIND_CODES), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    value_sum: Mapped[float] = mapped_column(Double, nullable=False)
+    value_min: Mapped[float] = mapped_column(Double, nullable=False)
+    value_max: Mapped[float] = mapped_column(Double, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class EnergyRollupHourly(_EnergyRollupColumns, Base):
+    __tablename__ = "energy_rollup_hourly"
+
+
+class EnergyRollupDaily(_EnergyRollupColumns, Base):
+    __tablename__ = "energy_rollup_daily"
@@ -1,4 +1,4 @@
-"""SettlementPeriod model — pilot writes always have simulation=true."""
+"""SettlementPeriod model — one row per (building, window); pilot writes always have simulation=true."""
 from __future__ import annotations
 
 import uuid
@@ -6,7 +6,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import DateTime, Boolean, CheckConstraint, ForeignKey, Index, Numeric, Text, func
+from sqlalchemy import DateTime, Boolean, CheckConstraint, ForeignKey, Index, Numeric, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -20,6 +20,7 @@ class SettlementPeriod(Base):
             "data_source IN ('synthetic','measured','mixed')", name="settlement_data_source_check"
         ),
         Index("idx_settlement_building_created", "building_id", "created_at"),
+        UniqueConstraint("building_id", "period_start", "period_end", name="settlement_period_key"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
@@ -20,6 +20,7 @@ class WalletTransaction(Base):
             name="wallet_kind_check",
         ),
         Index("idx_wallet_user_at", "user_id", "at"),
+        Index("idx_wallet_reference", "reference"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
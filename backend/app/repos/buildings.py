@@ -1,14 +1,16 @@
 """Buildings repository."""
 from __future__ import annotations
 
+import base64
 import secrets
 import string
 import uuid
+from collections.abc import Sequence
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import select, update
+from sqlalchemy import select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.building import Building
@@ -35,10 +37,76 @@ async def list_all(session: AsyncSession) -> list[Building]:
     return list(result.scalars().all())
 
 
+async def list_by_stage(session: AsyncSession, stages: Sequence[str]) -> list[Building]:
+    result = await session.execute(
+        select(Building).where(Building.stage.in_(stages)).order_by(Building.created_at, Building.id)
+    )
+    return list(result.scalars().all())
+
+
+def encode_cursor(building: Building) -> str:
+    """Opaque keyset cursor pointing just past ``building`` in (created_at, id) order."""
+    raw = f"{building.created_at.isoformat()}|{building.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, building_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(building_id)
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+async def list_page(
+    session: AsyncSession,
+    *,
+    limit: int | None,
+    after: str | None = None,
+    stages: list[str] | None = None,
+    exclude_stages: list[str] | None = None,
+    kind: str | None = None,
+    region: str | None = None,
+) -> tuple[list[Building], str | None]:
+    """One keyset page of buildings in (created_at, id) order, plus the next cursor (None at the end).
+
+    ``region`` matches case-insensitively anywhere in the address; buildings
+    carry no separate region column. ``limit=None`` returns every match.
+    """
+    stmt = select(Building).order_by(Building.created_at, Building.id)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(tuple_(Building.created_at, Building.id) > decode_cursor(after))
+    if stages:
+        stmt = stmt.where(Building.stage.in_(stages))
+    if exclude_stages:
+        stmt = stmt.where(Building.stage.not_in(exclude_stages))
+    if kind is not None:
+        stmt = stmt.where(Building.kind == kind)
+    if region:
+        escaped = region.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        stmt = stmt.where(Building.address.ilike(f"%{escaped}%"))
+    rows = list((await session.execute(stmt)).scalars().all())
+    if limit is not None and len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
 async def get(session: AsyncSession, building_id: uuid.UUID) -> Building | None:
     return await session.get(Building, building_id)
 
 
+async def existing_ids(session: AsyncSession, building_ids: set[uuid.UUID]) -> set[uuid.UUID]:
+    """Subset of building_ids that exist, in one round trip."""
+    if not building_ids:
+        return set()
+    result = await session.execute(select(Building.id).where(Building.id.in_(building_ids)))
+    return set(result.scalars().all())
+
+
 async def create(
     session: AsyncSession,
     *,
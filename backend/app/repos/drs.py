@@ -0,0 +1,85 @@
+"""DRS snapshot + transition repository."""
+from __future__ import annotations
+
+import uuid
+from typing import Any
+
+from sqlalchemy import desc, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.drs import DrsSnapshot, DrsTransition
+
+
+async def get_snapshot(
+    session: AsyncSession, building_id: uuid.UUID, *, for_update: bool = False
+) -> DrsSnapshot | None:
+    stmt = select(DrsSnapshot).where(DrsSnapshot.building_id == building_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def create_snapshot(
+    session: AsyncSession,
+    *,
+    building_id: uuid.UUID,
+    source_key: str,
+    inputs: dict[str, Any],
+    overrides: dict[str, Any],
+    outcome: dict[str, Any],
+) -> DrsSnapshot | None:
+    """Insert version 1 for building_id; None when a concurrent writer got there first."""
+    stmt = (
+        insert(DrsSnapshot)
+        .values(
+            building_id=building_id,
+            version=1,
+            source_key=source_key,
+            inputs=inputs,
+            overrides=overrides,
+            outcome=outcome,
+        )
+        .on_conflict_do_nothing(index_elements=["building_id"])
+        .returning(DrsSnapshot)
+    )
+    created = await session.execute(stmt)
+    return created.scalar_one_or_none()
+
+
+async def add_transition(
+    session: AsyncSession,
+    *,
+    building_id: uuid.UUID,
+    version: int,
+    score: float,
+    decision: str,
+    previous_score: float | None,
+    previous_decision: str | None,
+    changed_inputs: list[str],
+) -> DrsTransition:
+    transition = DrsTransition(
+        building_id=building_id,
+        version=version,
+        score=score,
+        decision=decision,
+        previous_score=previous_score,
+        previous_decision=previous_decision,
+        changed_inputs=changed_inputs,
+    )
+    session.add(transition)
+    await session.flush()
+    return transition
+
+
+async def history(
+    session: AsyncSession, building_id: uuid.UUID, *, limit: int = 50
+) -> list[DrsTransition]:
+    result = await session.execute(
+        select(DrsTransition)
+        .where(DrsTransition.building_id == building_id)
+        .order_by(desc(DrsTransition.id))
+        .limit(limit)
+    )
+    return list(result.scalars().all())
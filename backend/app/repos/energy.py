@@ -1,25 +1,300 @@
-"""Energy readings repository."""
+"""Energy readings repository.
+
+Raw readings live in energy_readings (monthly partitions, compact codes — see
+app.models.energy); hourly/daily rollups live in energy_rollup_hourly /
+energy_rollup_daily and are refreshed for the touched buckets on every bulk
+insert. Read paths that only need bucketed totals (today_summary,
+rollup_series) never touch the raw table.
+
+Callers only ever see labels: raw reads return rows with building_id,
+timestamp, kind, value, unit, source and provenance, and writes take the same
+keys (unit is implied by kind and ignored).
+"""
 from __future__ import annotations
 
+import math
 import uuid
+from collections.abc import AsyncIterator, Iterable, Sequence
 from datetime import datetime, timedelta, timezone
-from decimal import Decimal
 
-from sqlalchemy import desc, select
+from sqlalchemy import Row, SmallInteger, case, desc, extract, func, literal_column, select, text, type_coerce
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.energy import EnergyReading
+from ..models.energy import (
+    KIND_CODES,
+    SOURCE_CODES,
+    EnergyProvenance,
+    EnergyReading,
+    EnergyRollupDaily,
+    EnergyRollupHourly,
+)
+
+ENERGY_KINDS = ("generation", "load", "irradiance")
+KIND_UNITS = {"generation": "kWh", "load": "kWh", "irradiance": "W/m2"}
+# asyncpg caps a statement at 32,767 bind params; 6 columns per stored reading.
+INSERT_CHUNK_ROWS = 5_000
+_STORED_COLUMNS = ("building_id", "timestamp", "kind", "value", "source", "provenance_id")
+PARTITION_PREFIX = "energy_readings_"
+
+ROLLUP_MODELS: dict[str, type[EnergyRollupHourly] | type[EnergyRollupDaily]] = {
+    "hour": EnergyRollupHourly,
+    "day": EnergyRollupDaily,
+}
+_BUCKET_WIDTH = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def as_utc(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def floor_bucket(ts: datetime, resolution: str) -> datetime:
+    """UTC-aligned start of the hour/day bucket containing ts."""
+    ts = as_utc(ts).replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if resolution == "day" else ts
+
+
+def _date_trunc(resolution: str, column):
+    # Literal (not bound) args so the SELECT and GROUP BY expressions compare equal.
+    return func.date_trunc(literal_column(f"'{resolution}'"), column, literal_column("'UTC'"))
+
+
+def _reading_select():
+    """Raw readings decoded back to their public columns."""
+    return select(
+        EnergyReading.building_id,
+        EnergyReading.timestamp,
+        EnergyReading.kind,
+        EnergyReading.value,
+        case(
+            {KIND_CODES[kind]: unit for kind, unit in KIND_UNITS.items()},
+            value=type_coerce(EnergyReading.kind, SmallInteger),
+        ).label("unit"),
+        EnergyReading.source,
+        EnergyProvenance.label.label("provenance"),
+    ).join(EnergyProvenance, EnergyProvenance.id == EnergyReading.provenance_id)
+
+
+async def provenance_ids(session: AsyncSession, labels: Iterable[str]) -> dict[str, int]:
+    """Map provenance labels to energy_provenances ids, registering new labels."""
+    wanted = sorted(set(labels))
+    if not wanted:
+        return {}
+    await session.execute(
+        insert(EnergyProvenance)
+        .values([{"label": label} for label in wanted])
+        .on_conflict_do_nothing(index_elements=["label"])
+    )
+    result = await session.execute(
+        select(EnergyProvenance.label, EnergyProvenance.id).where(EnergyProvenance.label.in_(wanted))
+    )
+    return dict(result.all())
+
+
+async def ensure_partitions(session: AsyncSession, *, start: datetime, end: datetime) -> int:
+    """Create any missing monthly partitions covering [start, end]; returns how many were created."""
+    result = await session.execute(
+        select(func.energy_readings_ensure_partitions(as_utc(start), as_utc(end)))
+    )
+    return int(result.scalar_one())
+
+
+async def list_partitions(session: AsyncSession) -> list[str]:
+    """Names of the attached monthly partitions, oldest first."""
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i"
+            " JOIN pg_class c ON c.oid = i.inhrelid"
+            " WHERE i.inhparent = 'energy_readings'::regclass"
+            " ORDER BY c.relname"
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def detach_partitions_before(
+    session: AsyncSession, before: datetime, *, drop: bool = False
+) -> list[str]:
+    """Detach every monthly partition that ends on or before ``before``'s month.
+
+    Detached partitions stay behind as ordinary tables (ready for pg_dump or a
+    move to cheaper storage) unless ``drop`` is set. Rollups are untouched, so
+    dashboards keep their history. Returns the affected partition names.
+    """
+    cutoff = f"{PARTITION_PREFIX}{as_utc(before):%Y_%m}"
+    affected = [name for name in await list_partitions(session) if name < cutoff]
+    for name in affected:
+        await session.execute(text(f'ALTER TABLE energy_readings DETACH PARTITION "{name}"'))
+        if drop:
+            await session.execute(text(f'DROP TABLE "{name}"'))
+    return affected
+
+
+async def _prepare_rows(session: AsyncSession, readings: Sequence[dict]) -> list[dict]:
+    """Swap provenance labels for ids and create the partitions the batch lands in."""
+    ids = await provenance_ids(session, (r["provenance"] for r in readings))
+    timestamps = [r["timestamp"] for r in readings]
+    await ensure_partitions(session, start=min(timestamps), end=max(timestamps))
+    return [
+        {
+            "building_id": r["building_id"],
+            "timestamp": r["timestamp"],
+            "kind": r["kind"],
+            "value": float(r["value"]),
+            "source": r["source"],
+            "provenance_id": ids[r["provenance"]],
+        }
+        for r in readings
+    ]
+
+
+def _upsert_rollup(model, source_select):
+    stmt = insert(model).from_select(
+        ["building_id", "kind", "bucket", "value_sum", "value_min", "value_max", "sample_count"],
+        source_select,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=["building_id", "kind", "bucket"],
+        set_={
+            "value_sum": stmt.excluded.value_sum,
+            "value_min": stmt.excluded.value_min,
+            "value_max": stmt.excluded.value_max,
+            "sample_count": stmt.excluded.sample_count,
+        },
+    )
+
+
+async def refresh_rollups(
+    session: AsyncSession,
+    building_ids: Iterable[uuid.UUID],
+    *,
+    start: datetime,
+    end: datetime,
+) -> None:
+    """Recompute the hourly, then daily, buckets covering [start, end] for the given buildings.
+
+    Buckets are rebuilt from their source rows rather than incremented, so the
+    refresh is idempotent and safe to rerun after a partial failure.
+    """
+    ids = list(set(building_ids))
+    if not ids:
+        return
+
+    hour_bucket = _date_trunc("hour", EnergyReading.timestamp)
+    hourly = (
+        select(
+            EnergyReading.building_id,
+            EnergyReading.kind,
+            hour_bucket,
+            func.sum(EnergyReading.value),
+            func.min(EnergyReading.value),
+            func.max(EnergyReading.value),
+            func.count(),
+        )
+        .where(EnergyReading.building_id.in_(ids))
+        .where(EnergyReading.timestamp >= floor_bucket(start, "hour"))
+        .where(EnergyReading.timestamp < floor_bucket(end, "hour") + _BUCKET_WIDTH["hour"])
+        .group_by(EnergyReading.building_id, EnergyReading.kind, hour_bucket)
+    )
+    await session.execute(_upsert_rollup(EnergyRollupHourly, hourly))
+
+    day_bucket = _date_trunc("day", EnergyRollupHourly.bucket)
+    daily = (
+        select(
+            EnergyRollupHourly.building_id,
+            EnergyRollupHourly.kind,
+            day_bucket,
+            func.sum(EnergyRollupHourly.value_sum),
+            func.min(EnergyRollupHourly.value_min),
+            func.max(EnergyRollupHourly.value_max),
+            func.sum(EnergyRollupHourly.sample_count),
+        )
+        .where(EnergyRollupHourly.building_id.in_(ids))
+        .where(EnergyRollupHourly.bucket >= floor_bucket(start, "day"))
+        .where(EnergyRollupHourly.bucket < floor_bucket(end, "day") + _BUCKET_WIDTH["day"])
+        .group_by(EnergyRollupHourly.building_id, EnergyRollupHourly.kind, day_bucket)
+    )
+    await session.execute(_upsert_rollup(EnergyRollupDaily, daily))
 
 
 async def bulk_insert_readings(
     session: AsyncSession, readings: list[dict]
 ) -> int:
+    """Insert readings in bounded chunks, skipping (building, kind, timestamp) duplicates.
+
+    Returns the number of rows actually inserted and refreshes the rollups once
+    for the whole batch.
+    """
     if not readings:
         return 0
-    stmt = insert(EnergyReading).values(readings)
-    await session.execute(stmt)
-    return len(readings)
+    rows = await _prepare_rows(session, readings)
+    inserted = 0
+    for i in range(0, len(rows), INSERT_CHUNK_ROWS):
+        stmt = (
+            insert(EnergyReading)
+            .values(rows[i : i + INSERT_CHUNK_ROWS])
+            .on_conflict_do_nothing(index_elements=["building_id", "kind", "timestamp"])
+        )
+        result = await session.execute(stmt)
+        inserted += result.rowcount
+    timestamps = [r["timestamp"] for r in readings]
+    await refresh_rollups(
+        session,
+        (r["building_id"] for r in readings),
+        start=min(timestamps),
+        end=max(timestamps),
+    )
+    return inserted
+
+
+async def copy_readings(
+    session: AsyncSession, readings: Sequence[dict], *, chunk_size: int = 10_000
+) -> int:
+    """COPY pre-validated readings into energy_readings, chunk_size rows at a time.
+
+    Each chunk is COPYed into a transaction-scoped staging table, then moved
+    across with ON CONFLICT DO NOTHING so duplicates already stored are
+    skipped. Rollups are not refreshed here; callers batch that once per
+    ingest. Returns the number of rows inserted.
+    """
+    if not readings:
+        return 0
+    records = [
+        (
+            row["building_id"],
+            row["timestamp"],
+            KIND_CODES[row["kind"]],
+            row["value"],
+            SOURCE_CODES[row["source"]],
+            row["provenance_id"],
+        )
+        for row in await _prepare_rows(session, readings)
+    ]
+    await session.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS energy_ingest_staging ("
+            " building_id uuid, \"timestamp\" timestamptz, kind smallint, value double precision,"
+            " source smallint, provenance_id integer) ON COMMIT DROP"
+        )
+    )
+    conn = await session.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    inserted = 0
+    for i in range(0, len(records), chunk_size):
+        await raw.copy_records_to_table(
+            "energy_ingest_staging", records=records[i : i + chunk_size], columns=_STORED_COLUMNS
+        )
+        result = await session.execute(
+            text(
+                "INSERT INTO energy_readings (building_id, \"timestamp\", kind, value, source, provenance_id)"
+                " SELECT building_id, \"timestamp\", kind, value, source, provenance_id"
+                " FROM energy_ingest_staging"
+                " ON CONFLICT (building_id, kind, \"timestamp\") DO NOTHING"
+            )
+        )
+        inserted += result.rowcount
+        await session.execute(text("TRUNCATE energy_ingest_staging"))
+    return inserted
 
 
 async def series(
@@ -29,45 +304,267 @@ async def series(
     kind: str,
     start: datetime,
     end: datetime,
-) -> list[EnergyReading]:
+) -> list[Row]:
     result = await session.execute(
-        select(EnergyReading)
+        _reading_select()
         .where(EnergyReading.building_id == building_id)
         .where(EnergyReading.kind == kind)
         .where(EnergyReading.timestamp >= start)
         .where(EnergyReading.timestamp <= end)
         .order_by(EnergyReading.timestamp)
     )
+    return list(result.all())
+
+
+async def stream_series(
+    session: AsyncSession,
+    building_id: uuid.UUID,
+    *,
+    kind: str,
+    start: datetime,
+    end: datetime,
+    chunk_size: int = 5_000,
+) -> AsyncIterator[Sequence[Row]]:
+    """Yield raw readings in time order, chunk_size rows at a time.
+
+    Uses a server-side cursor (session.stream + yield_per), so memory stays flat
+    no matter how long the range is. Rows carry the same columns as series().
+    """
+    result = await session.stream(
+        _reading_select()
+        .where(EnergyReading.building_id == building_id)
+        .where(EnergyReading.kind == kind)
+        .where(EnergyReading.timestamp >= start)
+        .where(EnergyReading.timestamp <= end)
+        .order_by(EnergyReading.timestamp)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for chunk in result.partitions(chunk_size):
+        yield chunk
+
+
+async def rollup_series(
+    session: AsyncSession,
+    building_id: uuid.UUID,
+    *,
+    kind: str,
+    start: datetime,
+    end: datetime,
+    resolution: str,
+) -> list[EnergyRollupHourly] | list[EnergyRollupDaily]:
+    """Bucketed series from the hourly or daily rollup; buckets overlapping [start, end]."""
+    model = ROLLUP_MODELS[resolution]
+    result = await session.execute(
+        select(model)
+        .where(model.building_id == building_id)
+        .where(model.kind == kind)
+        .where(model.bucket >= floor_bucket(start, resolution))
+        .where(model.bucket <= as_utc(end))
+        .order_by(model.bucket)
+    )
     return list(result.scalars().all())
 
 
+def pick_bucket_seconds(span_seconds: float, max_points: int, floor_seconds: int = 0) -> int:
+    """Smallest bucket width that fits span into max_points epoch-aligned buckets.
+
+    Widths above an hour are rounded up to whole hours (or days) so they can be
+    served from the hourly (or daily) rollup instead of the raw table.
+    """
+    width = max(floor_seconds, 1, math.ceil(span_seconds / max(1, max_points - 1)))
+    for step in (86_400, 3_600):
+        if width >= step:
+            return math.ceil(width / step) * step
+    return width
+
+
+def resolution_label(width_seconds: int) -> str:
+    return {3_600: "hour", 86_400: "day"}.get(width_seconds, f"{width_seconds}s")
+
+
+async def series_extent(
+    session: AsyncSession,
+    building_id: uuid.UUID,
+    *,
+    kind: str,
+    start: datetime,
+    end: datetime,
+) -> tuple[datetime | None, datetime | None, int]:
+    """(first bucket, end of last bucket, approximate sample count) from the hourly rollup."""
+    result = await session.execute(
+        select(
+            func.min(EnergyRollupHourly.bucket),
+            func.max(EnergyRollupHourly.bucket),
+            func.coalesce(func.sum(EnergyRollupHourly.sample_count), 0),
+        )
+        .where(EnergyRollupHourly.building_id == building_id)
+        .where(EnergyRollupHourly.kind == kind)
+        .where(EnergyRollupHourly.bucket >= floor_bucket(start, "hour"))
+        .where(EnergyRollupHourly.bucket <= as_utc(end))
+    )
+    first, last, count = result.one()
+    if first is None:
+        return None, None, 0
+    return first, last + _BUCKET_WIDTH["hour"], int(count)
+
+
+async def bucketed_series(
+    session: AsyncSession,
+    building_id: uuid.UUID,
+    *,
+    kind: str,
+    start: datetime,
+    end: datetime,
+    width_seconds: int,
+) -> list[Row]:
+    """Aggregate [start, end] into epoch-aligned buckets of width_seconds inside the database.
+
+    Reads the daily rollup when the width is a whole number of days, the hourly
+    rollup for whole hours, and the raw table otherwise. Rows expose the same
+    attributes as the rollup models (bucket, value_sum/min/max, sample_count).
+    """
+    if width_seconds % 86_400 == 0:
+        model = EnergyRollupDaily
+    elif width_seconds % 3_600 == 0:
+        model = EnergyRollupHourly
+    else:
+        model = None
+
+    width = literal_column(str(int(width_seconds)))
+    if model is None:
+        ts = EnergyReading.timestamp
+        aggregates = (
+            func.sum(EnergyReading.value),
+            func.min(EnergyReading.value),
+            func.max(EnergyReading.value),
+            func.count(),
+        )
+        source, building_col, kind_col = EnergyReading, EnergyReading.building_id, EnergyReading.kind
+        lower = start
+    else:
+        ts = model.bucket
+        aggregates = (
+            func.sum(model.value_sum),
+            func.min(model.value_min),
+            func.max(model.value_max),
+            func.sum(model.sample_count),
+        )
+        source, building_col, kind_col = model, model.building_id, model.kind
+        lower = floor_bucket(start, "day" if model is EnergyRollupDaily else "hour")
+
+    bucket = func.to_timestamp(func.floor(extract("epoch", ts) / width) * width)
+    result = await session.execute(
+        select(
+            building_col.label("building_id"),
+            kind_col.label("kind"),
+            bucket.label("bucket"),
+            aggregates[0].label("value_sum"),
+            aggregates[1].label("value_min"),
+            aggregates[2].label("value_max"),
+            aggregates[3].label("sample_count"),
+        )
+        .select_from(source)
+        .where(building_col == building_id)
+        .where(kind_col == kind)
+        .where(ts >= lower)
+        .where(ts <= end)
+        .group_by(building_col, kind_col, bucket)
+        .order_by(bucket)
+    )
+    return list(result.all())
+
+
 async def today_summary(
     session: AsyncSession, building_id: uuid.UUID
 ) -> dict[str, list[float]]:
-    """Return 24-element arrays for generation, load, irradiance for the trailing 24h."""
+    """Return 24-element arrays (indexed by UTC hour) for generation, load, irradiance.
+
+    Covers the trailing 24 hourly buckets ending with the current hour, read
+    from the hourly rollup in a single query.
+    """
     end = datetime.now(timezone.utc)
-    start = end - timedelta(hours=24)
-    out: dict[str, list[float]] = {"generation_kwh": [], "load_kwh": [], "irradiance_w_m2": []}
+    start = floor_bucket(end, "hour") - timedelta(hours=23)
     kind_map = {"generation": "generation_kwh", "load": "load_kwh", "irradiance": "irradiance_w_m2"}
-    for kind, key in kind_map.items():
-        rows = await series(session, building_id, kind=kind, start=start, end=end)
-        # Bucket by hour (last 24)
-        bucket: dict[int, float] = {}
-        for r in rows:
-            hour = r.timestamp.hour if r.timestamp else 0
-            bucket[hour] = bucket.get(hour, 0.0) + float(r.value)
-        out[key] = [bucket.get(h, 0.0) for h in range(24)]
-    return out
+    buckets: dict[str, dict[int, float]] = {key: {} for key in kind_map.values()}
+    result = await session.execute(
+        select(EnergyRollupHourly.kind, EnergyRollupHourly.bucket, EnergyRollupHourly.value_sum)
+        .where(EnergyRollupHourly.building_id == building_id)
+        .where(EnergyRollupHourly.kind.in_(kind_map))
+        .where(EnergyRollupHourly.bucket >= start)
+        .where(EnergyRollupHourly.bucket <= end)
+    )
+    for kind, bucket, value_sum in result.all():
+        buckets[kind_map[kind]][as_utc(bucket).hour] = float(value_sum)
+    return {key: [hours.get(h, 0.0) for h in range(24)] for key, hours in buckets.items()}
 
 
 async def latest_reading(
     session: AsyncSession, building_id: uuid.UUID, kind: str
-) -> EnergyReading | None:
+) -> Row | None:
     result = await session.execute(
-        select(EnergyReading)
+        _reading_select()
         .where(EnergyReading.building_id == building_id)
         .where(EnergyReading.kind == kind)
         .order_by(desc(EnergyReading.timestamp))
         .limit(1)
     )
-    return result.scalar_one_or_none()
+    return result.first()
+
+
+async def period_energy(
+    session: AsyncSession,
+    building_ids: Sequence[uuid.UUID],
+    *,
+    start: datetime,
+    end: datetime,
+) -> dict[uuid.UUID, dict]:
+    """Metered kWh per building over [start, end), from raw readings, in one query.
+
+    Generation and load are summed per UTC hour first; E_sold is the solar
+    consumed in the hour it was produced, Σ min(generation, load), and E_waste
+    is the rest of generation. Readings only store kWh in and out, so battery
+    shifting is not credited. data_source is measured/synthetic/mixed by the
+    sources seen. Buildings without readings in the window are absent.
+    """
+    if not building_ids:
+        return {}
+    hour = _date_trunc("hour", EnergyReading.timestamp).label("hour")
+    is_generation = EnergyReading.kind == "generation"
+    hourly = (
+        select(
+            EnergyReading.building_id.label("building_id"),
+            hour,
+            func.coalesce(func.sum(EnergyReading.value).filter(is_generation), 0).label("gen"),
+            func.coalesce(func.sum(EnergyReading.value).filter(EnergyReading.kind == "load"), 0).label("load"),
+            func.bool_or(EnergyReading.source == "measured").label("measured"),
+            func.bool_or(EnergyReading.source == "synthetic").label("synthetic"),
+        )
+        .where(EnergyReading.building_id.in_(building_ids))
+        .where(EnergyReading.kind.in_(("generation", "load")))
+        .where(EnergyReading.timestamp >= as_utc(start))
+        .where(EnergyReading.timestamp < as_utc(end))
+        .group_by(EnergyReading.building_id, hour)
+        .subquery()
+    )
+    result = await session.execute(
+        select(
+            hourly.c.building_id,
+            func.sum(hourly.c.gen),
+            func.sum(hourly.c.load),
+            func.sum(func.least(hourly.c.gen, hourly.c.load)),
+            func.bool_or(hourly.c.measured),
+            func.bool_or(hourly.c.synthetic),
+            func.count(),
+        ).group_by(hourly.c.building_id)
+    )
+    out: dict[uuid.UUID, dict] = {}
+    for building_id, gen, load, sold, measured, synthetic, hours in result.all():
+        out[building_id] = {
+            "E_gen": float(gen),
+            "E_load": float(load),
+            "E_sold": float(sold),
+            "E_waste": max(0.0, float(gen) - float(sold)),
+            "dataSource": "mixed" if measured and synthetic else "measured" if measured else "synthetic",
+            "hours": int(hours),
+        }
+    return out
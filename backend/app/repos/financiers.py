@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Sequence
 from decimal import Decimal
 
 from sqlalchemy import select
@@ -20,6 +21,17 @@ async def list_for_financier(
     return list(result.scalars().all())
 
 
+async def list_for_buildings(
+    session: AsyncSession, building_ids: Sequence[uuid.UUID]
+) -> list[FinancierPosition]:
+    if not building_ids:
+        return []
+    result = await session.execute(
+        select(FinancierPosition).where(FinancierPosition.building_id.in_(building_ids))
+    )
+    return list(result.scalars().all())
+
+
 async def upsert_pledge(
     session: AsyncSession,
     *,
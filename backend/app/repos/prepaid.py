@@ -43,6 +43,23 @@ async def confirmed_total(session: AsyncSession, building_id: uuid.UUID) -> Deci
     return Decimal(str(total)) if total is not None else Decimal(0)
 
 
+async def confirmed_totals(
+    session: AsyncSession, building_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, Decimal]:
+    """Confirmed pledge totals for many buildings in one GROUP BY; missing buildings map to 0."""
+    if not building_ids:
+        return {}
+    result = await session.execute(
+        select(PrepaidCommitment.building_id, func.sum(PrepaidCommitment.amount_kes))
+        .where(PrepaidCommitment.building_id.in_(building_ids))
+        .where(PrepaidCommitment.status == "confirmed")
+        .group_by(PrepaidCommitment.building_id)
+    )
+    totals = {bid: Decimal(0) for bid in building_ids}
+    totals.update({bid: Decimal(str(total)) for bid, total in result.all()})
+    return totals
+
+
 async def history(
     session: AsyncSession, building_id: uuid.UUID, *, limit: int = 100
 ) -> list[PrepaidCommitment]:
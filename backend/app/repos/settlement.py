@@ -2,17 +2,19 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Sequence
 from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.settlement import SettlementPeriod
 
 
-async def create_period(
+async def upsert_period(
     session: AsyncSession,
     *,
     building_id: uuid.UUID,
@@ -26,21 +28,57 @@ async def create_period(
     simulation: bool = True,
     data_source: str = "synthetic",
 ) -> SettlementPeriod:
-    period = SettlementPeriod(
-        building_id=building_id,
-        period_start=period_start,
-        period_end=period_end,
-        e_gen=e_gen,
-        e_sold=e_sold,
-        e_waste=e_waste,
-        revenue_kes=revenue_kes,
-        payouts=payouts,
-        simulation=simulation,
-        data_source=data_source,
+    """Create or overwrite the period for (building_id, period_start, period_end).
+
+    Postgres ON CONFLICT on settlement_period_key — a re-run keeps the row id
+    (and so its ledger reference) and replaces the figures.
+    """
+    values = {
+        "e_gen": e_gen,
+        "e_sold": e_sold,
+        "e_waste": e_waste,
+        "revenue_kes": revenue_kes,
+        "payouts": payouts,
+        "simulation": simulation,
+        "data_source": data_source,
+    }
+    stmt = (
+        insert(SettlementPeriod)
+        .values(building_id=building_id, period_start=period_start, period_end=period_end, **values)
+        .on_conflict_do_update(constraint="settlement_period_key", set_=values)
+        .returning(SettlementPeriod)
+        .execution_options(populate_existing=True)
     )
-    session.add(period)
-    await session.flush()
-    return period
+    result = await session.execute(stmt)
+    return result.scalar_one()
+
+
+async def lock_periods(session: AsyncSession, building_ids: Sequence[uuid.UUID]) -> None:
+    """Serialize period writes per building until the transaction ends.
+
+    Transaction-scoped advisory locks, taken in id order so shards and single
+    runs that share a building cannot deadlock.
+    """
+    for building_id in sorted(building_ids):
+        await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"settlement_periods:{building_id}"))))
+
+
+async def find_overlapping(
+    session: AsyncSession, building_id: uuid.UUID, *, period_start: datetime, period_end: datetime
+) -> SettlementPeriod | None:
+    """A stored period of the building whose window overlaps [period_start, period_end), other than that exact window."""
+    result = await session.execute(
+        select(SettlementPeriod)
+        .where(SettlementPeriod.building_id == building_id)
+        .where(SettlementPeriod.period_start < period_end)
+        .where(SettlementPeriod.period_end > period_start)
+        .where(
+            (SettlementPeriod.period_start != period_start) | (SettlementPeriod.period_end != period_end)
+        )
+        .order_by(SettlementPeriod.period_start)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
 
 
 async def latest(
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Sequence
 from datetime import datetime, timezone
 
 from sqlalchemy import select, update
@@ -19,6 +20,18 @@ async def get_by_id(session: AsyncSession, user_id: uuid.UUID) -> User | None:
     return await session.get(User, user_id)
 
 
+async def list_for_buildings(
+    session: AsyncSession, building_ids: Sequence[uuid.UUID], *, roles: Sequence[str]
+) -> list[User]:
+    """Users attached to any of building_ids whose role is in roles."""
+    if not building_ids:
+        return []
+    result = await session.execute(
+        select(User).where(User.building_id.in_(building_ids)).where(User.role.in_(roles))
+    )
+    return list(result.scalars().all())
+
+
 async def create(
     session: AsyncSession,
     *,
@@ -2,9 +2,11 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Sequence
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import desc, func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.wallet import WalletTransaction
@@ -29,6 +31,33 @@ async def record(
     return tx
 
 
+async def record_many(session: AsyncSession, rows: Sequence[dict[str, Any]]) -> int:
+    """Append rows (user_id, kind, amount_kes, reference) in one INSERT; returns the count."""
+    if not rows:
+        return 0
+    await session.execute(insert(WalletTransaction).values(list(rows)))
+    return len(rows)
+
+
+async def totals_by_reference(
+    session: AsyncSession, references: Sequence[str]
+) -> dict[tuple[str, uuid.UUID, str], Decimal]:
+    """Sum of amounts per (reference, user_id, kind) for the given references."""
+    if not references:
+        return {}
+    result = await session.execute(
+        select(
+            WalletTransaction.reference,
+            WalletTransaction.user_id,
+            WalletTransaction.kind,
+            func.sum(WalletTransaction.amount_kes),
+        )
+        .where(WalletTransaction.reference.in_(references))
+        .group_by(WalletTransaction.reference, WalletTransaction.user_id, WalletTransaction.kind)
+    )
+    return {(reference, user_id, kind): Decimal(str(total)) for reference, user_id, kind, total in result.all()}
+
+
 async def list_for_user(
     session: AsyncSession, user_id: uuid.UUID, *, limit: int = 100
 ) -> list[WalletTransaction]:
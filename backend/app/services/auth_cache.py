@@ -0,0 +1,136 @@
+"""Auth fast path — short-TTL user cache and coalesced last_seen_at writes.
+
+get_current_user runs on every authenticated request. Two things keep it
+read-only:
+
+* UserCache keeps a detached User snapshot per token ``sub`` for a few
+  seconds, in an LRU bounded by ``auth_user_cache_max_entries``. Callers re-attach it to their session with
+  ``session.merge(user, load=False)``, which needs no query. Writers that
+  change a user (role, onboarding, building) invalidate the entry. Changes
+  made by other processes (scripts.grant_admin) show up within the TTL.
+* LastSeenTracker records "seen at" in memory and writes every pending user
+  in one batched UPDATE. The flush runs in a background task once per
+  interval, and again at shutdown. last_seen_at is therefore accurate to
+  the flush interval.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+
+from ..config import get_settings
+from ..db.session import SessionLocal
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[uuid.UUID, tuple[float, User]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: uuid.UUID) -> User | None:
+        """Detached snapshot for user_id, or None when absent/expired. Never mutate it."""
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > self._clock():
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[user_id]
+        self.misses += 1
+        return None
+
+    def put(self, user: User) -> None:
+        """Cache a detached (expunged) User; drops expired entries at the cold end, then the LRU overflow."""
+        now = self._clock()
+        self._entries[user.id] = (now + self.ttl_seconds, user)
+        self._entries.move_to_end(user.id)
+        while self._entries:
+            _, (expires, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            self._entries.popitem(last=False)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class LastSeenTracker:
+    def __init__(self, *, flush_interval_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.flush_interval_seconds = flush_interval_seconds
+        self._clock = clock
+        self._pending: dict[uuid.UUID, datetime] = {}
+        self._last_flush = clock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def mark(self, user_id: uuid.UUID) -> None:
+        """Record a sighting; schedules a background flush when the interval has elapsed."""
+        self._pending[user_id] = datetime.now(timezone.utc)
+        if self._clock() - self._last_flush >= self.flush_interval_seconds and (
+            self._task is None or self._task.done()
+        ):
+            self._last_flush = self._clock()
+            self._task = asyncio.get_running_loop().create_task(self._flush_logged())
+
+    async def flush(self) -> int:
+        """Write every pending last_seen_at in one executemany UPDATE; returns rows written."""
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with SessionLocal() as session:
+                await session.execute(
+                    update(User),
+                    [{"id": user_id, "last_seen_at": seen} for user_id, seen in batch.items()],
+                )
+                await session.commit()
+        except Exception:
+            # Put the batch back (newer sightings win) so the next flush retries it.
+            for user_id, seen in batch.items():
+                self._pending.setdefault(user_id, seen)
+            raise
+        return len(batch)
+
+    async def _flush_logged(self) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("last_seen flush failed; will retry next interval")
+
+
+user_cache = UserCache(
+    ttl_seconds=get_settings().auth_user_cache_ttl_seconds,
+    max_entries=get_settings().auth_user_cache_max_entries,
+)
+last_seen_tracker = LastSeenTracker(flush_interval_seconds=get_settings().last_seen_flush_seconds)
@@ -1,5 +1,7 @@
 """Cross-cutting audits — mirrors packages/shared/src/consistency.ts."""
 
+from .ownership import calculate_ownership_payouts
+from .portfolio import portfolio_row, project_portfolio
 from .projector import project_building
 from .settlement import validate_settlement_rates
 
@@ -8,44 +10,82 @@ def _near(a: float, b: float, tolerance: float = 0.05) -> bool:
     return abs(a - b) <= tolerance
 
 
-def audit_project_consistency(project: dict) -> dict:
-    projected = project_building(project)
+def _audit(
+    project: dict,
+    energy: dict,
+    settlement: dict,
+    provider_payouts: list[dict],
+    financier_payouts: list[dict],
+    prepaid_coverage: float,
+    drs_demand_coverage: float,
+) -> dict:
     issues: list[str] = []
     rates = validate_settlement_rates(project["settlementRates"])
 
     if not rates["isBalanced"]:
         issues.append(f"Settlement rates must total 100%; received {rates['total'] * 100}%.")
 
-    energy = projected["energy"]
     energy_balance = energy["E_sold"] + energy["E_waste"] + max(0, energy["E_gen"] - energy["E_sold"] - energy["E_waste"])
 
     if energy_balance - energy["E_gen"] > 0.1:
         issues.append("Energy outputs exceed generated energy.")
 
-    settlement = projected["settlement"]
     settlement_total = settlement["allocatedTotal"] + settlement["unallocated"]
 
     if not _near(settlement_total, settlement["revenue"]):
         issues.append("Settlement waterfall does not reconcile to revenue.")
 
-    provider_total = sum(p["payout"] for p in projected["providerPayouts"])
+    provider_total = sum(p["payout"] for p in provider_payouts)
     if not _near(provider_total, settlement["providerPool"]):
         issues.append("Provider ownership payouts do not reconcile to provider pool.")
 
-    financier_total = sum(p["payout"] for p in projected["financierPayouts"])
+    financier_total = sum(p["payout"] for p in financier_payouts)
     if not _near(financier_total, settlement["financierPool"]):
         issues.append("Financier ownership payouts do not reconcile to financier pool.")
 
-    if projected["roleViews"]["owner"]["prepaidCoverage"] > 1:
+    if prepaid_coverage > 1:
         issues.append("Prepaid coverage display should be capped at 100%.")
 
-    demand_expected = round(projected["energy"]["utilization"] * 100, 1)
-    if projected["drs"]["components"]["demandCoverage"] != demand_expected:
+    demand_expected = round(energy["utilization"] * 100, 1)
+    if drs_demand_coverage != demand_expected:
         issues.append("DRS demand coverage should follow calculated utilization.")
 
     return {"projectId": project["id"], "ok": len(issues) == 0, "issues": issues}
 
 
+def audit_project_consistency(project: dict) -> dict:
+    projected = project_building(project)
+    return _audit(
+        project,
+        projected["energy"],
+        projected["settlement"],
+        projected["providerPayouts"],
+        projected["financierPayouts"],
+        projected["roleViews"]["owner"]["prepaidCoverage"],
+        projected["drs"]["components"]["demandCoverage"],
+    )
+
+
 def audit_all_demo_projects(projects: list[dict]) -> dict:
-    results = [audit_project_consistency(p) for p in projects]
+    """Audit every project from one columnar project_portfolio pass.
+
+    Checks the same values as audit_project_consistency: the drs group's
+    demandCoverage is the DRS component project_building reports.
+    """
+    portfolio = project_portfolio(projects, fields=("energy", "settlement", "drs"))
+    results = []
+    for i, project in enumerate(projects):
+        row = portfolio_row(portfolio, i)
+        settlement = row["settlement"]
+        results.append(
+            _audit(
+                project,
+                row["energy"],
+                settlement,
+                calculate_ownership_payouts(settlement["providerPool"], project["providerOwnership"]),
+                calculate_ownership_payouts(settlement["financierPool"], project["financierOwnership"]),
+                settlement["prepaidCoverage"],
+                row["drs"]["demandCoverage"],
+            )
+        )
     return {"ok": all(r["ok"] for r in results), "results": results}
@@ -1,368 +1,494 @@
-"""DRS gate model — mirrors packages/shared/src/drs.ts; see docs/DRS_FORMULA.md."""
+"""DRS gate model — mirrors packages/shared/src/drs.ts; see docs/DRS_FORMULA.md.
 
+The gates, checklist items and warnings are declared once below as rule
+tables (APARTMENT_RULES, HOMEOWNER_RULES, WARNING_RULES). Each rule's
+condition is a small predicate tree (Flag, Number, All, Any, ...; defined in
+rule_tables.py and shared with lbrs.py) that encodes the input fallbacks,
+e.g. ``hasResidentDemandSignal`` falling back to ``hasPrepaidFunds``. Every
+predicate compiles two ways:
 
-def clamp_score(value: float) -> float:
-    return max(0.0, min(100.0, float(value)))
+* ``scalar(inp)`` — plain Python on one input dict (calculate_drs);
+* ``column(cols)`` — a NumPy boolean/float mask over a batch (evaluate_drs).
 
+evaluate_drs pulls each input key out of the batch once and evaluates
+every rule as a mask. It returns a DrsBatch with score/decision columns;
+``DrsBatch.result(i)`` rebuilds exactly what calculate_drs returns for row i.
 
-def round1(value: float) -> float:
-    return round(value + 1e-12, 1)
+Each predicate also knows the input ``keys`` it reads, so recalculate_drs
+can take a stored result and re-evaluate only the rules touched by the keys
+that changed. drs_outcome/drs_from_outcome convert a result to and from the
+compact form services/drs_store.py persists.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from .rule_tables import (
+    MISSING,
+    All,
+    AtLeast,
+    Any,
+    Below,
+    ChecklistItem,
+    Columns,
+    Flag,
+    Gate,
+    Not,
+    NotFalse,
+    Number,
+    Predicate,
+    RuleTable,
+    WarningRule,
+    decision,
+    round1,
+    round1_array,
+)
 
 
 def _site_kind(inp: dict) -> str:
     return inp.get("siteKind") or "apartment"
 
 
-def _electrician_score(inp: dict) -> float:
-    elec = inp.get("electricianReadiness", inp.get("installerReadiness", 0))
-    return clamp_score(elec)
+# --- Shared conditions ------------------------------------------------------
 
+LEAD = Flag("hasCertifiedLeadElectrician")
+QUOTE = Flag("hasVerifiedSupplierQuote")
+DEMAND_SIGNAL = Flag("hasResidentDemandSignal", fallback=Flag("hasPrepaidFunds"))
+UTILIZATION = Number("projectedUtilization")
+UTILIZATION_OK = Not(Below(UTILIZATION, 0.6))
+ELECTRICIAN = Number("electricianReadiness", fallback=Number("installerReadiness"), clamp=True)
+ELECTRICIAN_READY = All(LEAD, AtLeast(ELECTRICIAN, 50))
+OPS_TRUSTED = All(Flag("monitoringConnectivityResolved"), Flag("settlementDataTrusted"))
 
-def _weighted_display_score(inp: dict, elec: float) -> float:
-    return round1(
-        clamp_score(inp.get("demandCoverage", 0)) * 0.35
-        + clamp_score(inp.get("prepaidCommitment", 0)) * 0.2
-        + clamp_score(inp.get("loadProfile", 0)) * 0.15
-        + clamp_score(inp.get("installationReadiness", 0)) * 0.1
-        + elec * 0.1
-        + clamp_score(inp.get("capitalAlignment", 0)) * 0.1,
-    )
+COMPONENTS: dict[str, Number] = {
+    "demandCoverage": Number("demandCoverage", clamp=True),
+    "prepaidCommitment": Number("prepaidCommitment", clamp=True),
+    "loadProfile": Number("loadProfile", clamp=True),
+    "installationReadiness": Number("installationReadiness", clamp=True),
+    "electricianReadiness": ELECTRICIAN,
+    "installerReadiness": ELECTRICIAN,
+    "capitalAlignment": Number("capitalAlignment", clamp=True),
+}
+SCORE_WEIGHTS = (
+    ("demandCoverage", 0.35),
+    ("prepaidCommitment", 0.2),
+    ("loadProfile", 0.15),
+    ("installationReadiness", 0.1),
+    ("electricianReadiness", 0.1),
+    ("capitalAlignment", 0.1),
+)
 
+WARNING_RULES = (
+    WarningRule("Utilization in watch band (60–75%).", All(AtLeast(UTILIZATION, 0.6), Below(UTILIZATION, 0.75))),
+    WarningRule(
+        "Load profile confidence is moderate — improve estimates before scaling.",
+        Below(COMPONENTS["loadProfile"], 70),
+    ),
+)
 
-def _apartment_failures(inp: dict) -> list[dict]:
-    failures: list[dict] = []
-    demand_signal = inp.get("hasResidentDemandSignal", inp.get("hasPrepaidFunds"))
-    site_inspection = inp.get("siteInspectionComplete", True)
-    capacity_plan = inp.get("capacityPlanApproved", True)
-    stakeholders = inp.get(
-        "stakeholdersVetted",
-        inp.get("hasCertifiedLeadElectrician") and inp.get("hasVerifiedSupplierQuote"),
-    )
-    electrician_paid = inp.get("electricianLaborPaymentResolved", True)
-    contracts = inp.get("contractsAndComplianceReady", True)
-
-    if not inp.get("ownerPermissionsComplete"):
-        failures.append(
-            {
-                "code": "OWNER_AUTH",
-                "message": "Owner authorization and site access permissions incomplete.",
-                "responsibleRole": "building_owner",
-            }
-        )
-    if not stakeholders:
-        failures.append(
-            {
-                "code": "STAKEHOLDER_VET",
-                "message": "Stakeholder availability and vetting incomplete (electrician / provider / capital).",
-                "responsibleRole": "admin",
-            }
-        )
-    if not site_inspection:
-        failures.append(
-            {
-                "code": "SITE_INSPECTION",
-                "message": "Site inspection not complete (meter bank, roof, cable routes, Solar DB/ATS space).",
-                "responsibleRole": "electrician",
-            }
-        )
-    if not capacity_plan:
-        failures.append(
-            {
-                "code": "CAPACITY_PLAN",
-                "message": "Capacity plan not approved (phasing, reserve margin, max apartments).",
-                "responsibleRole": "admin",
-            }
-        )
-    if float(inp.get("projectedUtilization", 0)) < 0.6:
-        failures.append(
-            {
-                "code": "DEMAND_LOW",
-                "message": "Demand / utilization forecast below 60% — deployment economically unsafe.",
-                "responsibleRole": "resident",
-            }
-        )
-    if not demand_signal:
-        failures.append(
-            {
-                "code": "DEMAND_SIGNAL",
-                "message": "Resident demand evidence insufficient (pledges and/or prepaid load signals).",
-                "responsibleRole": "resident",
-            }
-        )
-    if not inp.get("hasVerifiedSupplierQuote"):
-        failures.append(
-            {
-                "code": "HARDWARE_PKG",
-                "message": "Hardware package / verified BOM or quote not ready.",
-                "responsibleRole": "provider",
-            }
-        )
-    if not electrician_paid:
-        failures.append(
-            {
-                "code": "ELEC_PAYMENT",
-                "message": "Electrician payment or labor-as-capital terms not resolved.",
-                "responsibleRole": "financier",
-            }
-        )
-    if not contracts:
-        failures.append(
-            {
-                "code": "CONTRACTS",
-                "message": "Contracts, waterfall, and compliance review incomplete.",
-                "responsibleRole": "admin",
-            }
-        )
-    if not inp.get("hasCertifiedLeadElectrician"):
-        failures.append(
-            {
-                "code": "ELEC_LEAD",
-                "message": "No certified lead electrician assigned.",
-                "responsibleRole": "electrician",
-            }
-        )
-    if not inp.get("solarApartmentCapacityFitVerified"):
-        failures.append(
-            {
-                "code": "SOLAR_CAPACITY",
-                "message": "Solar/battery capacity vs participating apartments not verified (dedicated solar path).",
-                "responsibleRole": "electrician",
-            }
-        )
-    if not inp.get("apartmentAtsMeterMappingVerified"):
-        failures.append(
-            {
-                "code": "ATS_MAP",
-                "message": "Apartment ATS + PAYG meter mapping incomplete.",
-                "responsibleRole": "electrician",
-            }
-        )
-    if not inp.get("atsKplcSwitchingVerified"):
-        failures.append(
-            {
-                "code": "ATS_KPLC",
-                "message": "ATS ↔ KPLC fallback architecture not verified.",
-                "responsibleRole": "electrician",
-            }
-        )
-    if not inp.get("monitoringConnectivityResolved"):
-        failures.append(
-            {
-                "code": "MONITORING",
-                "message": "Monitoring connectivity unresolved.",
-                "responsibleRole": "provider",
-            }
-        )
-    if not inp.get("settlementDataTrusted"):
-        failures.append(
-            {
-                "code": "SETTLEMENT_DATA",
-                "message": "Settlement data cannot be trusted — pause or conservative mode.",
-                "responsibleRole": "admin",
-            }
-        )
-    return failures
+# --- Apartment (multi-unit) sites -------------------------------------------
 
+APARTMENT_RULES = RuleTable(
+    gates=(
+        Gate(
+            "OWNER_AUTH",
+            "Owner authorization and site access permissions incomplete.",
+            "building_owner",
+            Flag("ownerPermissionsComplete"),
+        ),
+        Gate(
+            "STAKEHOLDER_VET",
+            "Stakeholder availability and vetting incomplete (electrician / provider / capital).",
+            "admin",
+            Flag("stakeholdersVetted", fallback=All(LEAD, QUOTE)),
+        ),
+        Gate(
+            "SITE_INSPECTION",
+            "Site inspection not complete (meter bank, roof, cable routes, Solar DB/ATS space).",
+            "electrician",
+            Flag("siteInspectionComplete", default=True),
+        ),
+        Gate(
+            "CAPACITY_PLAN",
+            "Capacity plan not approved (phasing, reserve margin, max apartments).",
+            "admin",
+            Flag("capacityPlanApproved", default=True),
+        ),
+        Gate(
+            "DEMAND_LOW",
+            "Demand / utilization forecast below 60% — deployment economically unsafe.",
+            "resident",
+            UTILIZATION_OK,
+        ),
+        Gate(
+            "DEMAND_SIGNAL",
+            "Resident demand evidence insufficient (pledges and/or prepaid load signals).",
+            "resident",
+            DEMAND_SIGNAL,
+        ),
+        Gate("HARDWARE_PKG", "Hardware package / verified BOM or quote not ready.", "provider", QUOTE),
+        Gate(
+            "ELEC_PAYMENT",
+            "Electrician payment or labor-as-capital terms not resolved.",
+            "financier",
+            Flag("electricianLaborPaymentResolved", default=True),
+        ),
+        Gate(
+            "CONTRACTS",
+            "Contracts, waterfall, and compliance review incomplete.",
+            "admin",
+            Flag("contractsAndComplianceReady", default=True),
+        ),
+        Gate("ELEC_LEAD", "No certified lead electrician assigned.", "electrician", LEAD),
+        Gate(
+            "SOLAR_CAPACITY",
+            "Solar/battery capacity vs participating apartments not verified (dedicated solar path).",
+            "electrician",
+            Flag("solarApartmentCapacityFitVerified"),
+        ),
+        Gate(
+            "ATS_MAP",
+            "Apartment ATS + PAYG meter mapping incomplete.",
+            "electrician",
+            Flag("apartmentAtsMeterMappingVerified"),
+        ),
+        Gate(
+            "ATS_KPLC",
+            "ATS ↔ KPLC fallback architecture not verified.",
+            "electrician",
+            Flag("atsKplcSwitchingVerified"),
+        ),
+        Gate("MONITORING", "Monitoring connectivity unresolved.", "provider", Flag("monitoringConnectivityResolved")),
+        Gate(
+            "SETTLEMENT_DATA",
+            "Settlement data cannot be trusted — pause or conservative mode.",
+            "admin",
+            Flag("settlementDataTrusted"),
+        ),
+    ),
+    checklist=(
+        ChecklistItem("owner", "Owner authorization", 10, True, "Owner authorization and access", Flag("ownerPermissionsComplete")),
+        ChecklistItem(
+            "stake",
+            "Stakeholders",
+            15,
+            True,
+            "Stakeholder availability and vetting",
+            Flag("stakeholdersVetted", fallback=All(LEAD, QUOTE), none_is_missing=True),
+        ),
+        ChecklistItem("inspect", "Inspection", 15, True, "Site inspection complete", NotFalse("siteInspectionComplete")),
+        ChecklistItem("capplan", "Capacity", 15, True, "Capacity plan approved", NotFalse("capacityPlanApproved")),
+        ChecklistItem(
+            "demand",
+            "Demand",
+            15,
+            True,
+            "Demand proof / pledges / utilization",
+            All(AtLeast(UTILIZATION, 0.6), DEMAND_SIGNAL),
+        ),
+        ChecklistItem("hw", "Hardware", 15, True, "Hardware package and logistics", QUOTE),
+        ChecklistItem(
+            "elecpay", "Labor", 10, True, "Electrician payment / labor-capital", NotFalse("electricianLaborPaymentResolved")
+        ),
+        ChecklistItem("legal", "Contracts", 5, True, "Contracts and compliance", NotFalse("contractsAndComplianceReady")),
+        ChecklistItem(
+            "ats",
+            "Architecture",
+            0,
+            True,
+            "Dedicated solar path + ATS mapping",
+            All(
+                Flag("apartmentAtsMeterMappingVerified"),
+                Flag("atsKplcSwitchingVerified"),
+                Flag("solarApartmentCapacityFitVerified"),
+            ),
+        ),
+        ChecklistItem("elec", "Electrician", 0, True, "Certified electrician readiness", ELECTRICIAN_READY),
+        ChecklistItem("mon", "Ops", 0, True, "Monitoring and settlement trust", OPS_TRUSTED),
+    ),
+)
 
-def _homeowner_failures(inp: dict) -> list[dict]:
-    failures: list[dict] = []
-    property_ok = inp.get("propertyAuthorityComplete") or False
-    site_ok = inp.get("siteFeasibilityComplete") or False
-    load_ok = inp.get("loadProfileSizingComplete") or False
-    stakeholders = bool(inp.get("stakeholdersVetted")) or (
-        bool(inp.get("hasCertifiedLeadElectrician")) and bool(inp.get("hasVerifiedSupplierQuote"))
-    )
-    capital_ok = inp.get("capitalAndLaborResolved") or False
-    hardware_ok = inp.get("hardwareProcurementComplete") or inp.get("hasVerifiedSupplierQuote")
-    legal_ok = inp.get("legalUtilityDisciplineComplete") or False
-    contracts = inp.get("contractsAndComplianceReady", True)
-    demand_signal = inp.get("hasResidentDemandSignal", inp.get("hasPrepaidFunds"))
-
-    if not property_ok:
-        failures.append({"code": "PROP_AUTH", "message": "Property authority not verified.", "responsibleRole": "homeowner"})
-    if not site_ok:
-        failures.append({"code": "SITE_FEAS", "message": "Site feasibility incomplete.", "responsibleRole": "electrician"})
-    if not load_ok:
-        failures.append(
-            {"code": "LOAD_SIZE", "message": "Load profile and sizing discipline incomplete.", "responsibleRole": "homeowner"}
-        )
-    if not stakeholders:
-        failures.append({"code": "STAKE_READY", "message": "Stakeholder readiness incomplete.", "responsibleRole": "admin"})
-    if not capital_ok:
-        failures.append(
-            {
-                "code": "CAPITAL_LABOR",
-                "message": "Capital stack and electrician payment not resolved.",
-                "responsibleRole": "financier",
-            }
-        )
-    if not hardware_ok:
-        failures.append({"code": "HW_PROC", "message": "Hardware procurement path incomplete.", "responsibleRole": "provider"})
-    if not legal_ok:
-        failures.append(
-            {
-                "code": "LEGAL_UTIL",
-                "message": "Legal / utility / export discipline incomplete.",
-                "responsibleRole": "electrician",
-            }
-        )
-    if not contracts:
-        failures.append({"code": "CONTRACTS", "message": "Contracts and compliance incomplete.", "responsibleRole": "admin"})
-    if not inp.get("hasCertifiedLeadElectrician"):
-        failures.append(
-            {"code": "ELEC_LEAD", "message": "No certified lead electrician assigned.", "responsibleRole": "electrician"}
-        )
-    if float(inp.get("projectedUtilization", 0)) < 0.6:
-        failures.append(
-            {
-                "code": "DEMAND_LOW",
-                "message": "Utilization forecast below credible threshold.",
-                "responsibleRole": "homeowner",
-            }
-        )
-    if not demand_signal:
-        failures.append(
-            {
-                "code": "DEMAND_SIG",
-                "message": "Homeowner commitment / demand signal insufficient.",
-                "responsibleRole": "homeowner",
-            }
-        )
-    if not inp.get("monitoringConnectivityResolved"):
-        failures.append(
-            {"code": "MONITORING", "message": "Monitoring connectivity unresolved.", "responsibleRole": "provider"}
-        )
-    if not inp.get("settlementDataTrusted"):
-        failures.append({"code": "SETTLEMENT_DATA", "message": "Settlement data cannot be trusted.", "responsibleRole": "admin"})
-    return failures
-
-
-def _warnings(inp: dict) -> list[str]:
-    w: list[str] = []
-    u = float(inp.get("projectedUtilization", 0))
-    if 0.6 <= u < 0.75:
-        w.append("Utilization in watch band (60–75%).")
-    if clamp_score(inp.get("loadProfile", 0)) < 70:
-        w.append("Load profile confidence is moderate — improve estimates before scaling.")
-    return w
-
-
-def _build_apartment_checklist(inp: dict, elec: float) -> list[dict]:
-    demand_signal = inp.get("hasResidentDemandSignal", inp.get("hasPrepaidFunds"))
-    stakeholders_done = inp.get("stakeholdersVetted")
-    if stakeholders_done is None:
-        stakeholders_done = bool(inp.get("hasCertifiedLeadElectrician") and inp.get("hasVerifiedSupplierQuote"))
-    return [
-        {"id": "owner", "category": "Owner authorization", "displayWeight": 10, "critical": True, "complete": bool(inp.get("ownerPermissionsComplete")), "label": "Owner authorization and access"},
-        {"id": "stake", "category": "Stakeholders", "displayWeight": 15, "critical": True, "complete": bool(stakeholders_done), "label": "Stakeholder availability and vetting"},
-        {"id": "inspect", "category": "Inspection", "displayWeight": 15, "critical": True, "complete": inp.get("siteInspectionComplete") is not False, "label": "Site inspection complete"},
-        {"id": "capplan", "category": "Capacity", "displayWeight": 15, "critical": True, "complete": inp.get("capacityPlanApproved") is not False, "label": "Capacity plan approved"},
-        {
-            "id": "demand",
-            "category": "Demand",
-            "displayWeight": 15,
-            "critical": True,
-            "complete": float(inp.get("projectedUtilization", 0)) >= 0.6 and bool(demand_signal),
-            "label": "Demand proof / pledges / utilization",
-        },
-        {"id": "hw", "category": "Hardware", "displayWeight": 15, "critical": True, "complete": bool(inp.get("hasVerifiedSupplierQuote")), "label": "Hardware package and logistics"},
-        {"id": "elecpay", "category": "Labor", "displayWeight": 10, "critical": True, "complete": inp.get("electricianLaborPaymentResolved") is not False, "label": "Electrician payment / labor-capital"},
-        {"id": "legal", "category": "Contracts", "displayWeight": 5, "critical": True, "complete": inp.get("contractsAndComplianceReady") is not False, "label": "Contracts and compliance"},
-        {
-            "id": "ats",
-            "category": "Architecture",
-            "displayWeight": 0,
-            "critical": True,
-            "complete": bool(inp.get("apartmentAtsMeterMappingVerified") and inp.get("atsKplcSwitchingVerified") and inp.get("solarApartmentCapacityFitVerified")),
-            "label": "Dedicated solar path + ATS mapping",
-        },
-        {"id": "elec", "category": "Electrician", "displayWeight": 0, "critical": True, "complete": bool(inp.get("hasCertifiedLeadElectrician") and elec >= 50), "label": "Certified electrician readiness"},
-        {
-            "id": "mon",
-            "category": "Ops",
-            "displayWeight": 0,
-            "critical": True,
-            "complete": bool(inp.get("monitoringConnectivityResolved") and inp.get("settlementDataTrusted")),
-            "label": "Monitoring and settlement trust",
-        },
-    ]
+# --- Homeowner (single-family / small compound) sites -----------------------
 
+HOMEOWNER_STAKEHOLDERS = Any(Flag("stakeholdersVetted"), All(LEAD, QUOTE))
 
-def _build_homeowner_checklist(inp: dict, elec: float) -> list[dict]:
-    demand_signal = inp.get("hasResidentDemandSignal", inp.get("hasPrepaidFunds"))
-    hw = inp.get("hardwareProcurementComplete")
-    if hw is None:
-        hw = inp.get("hasVerifiedSupplierQuote")
-    return [
-        {"id": "prop", "category": "Authority", "displayWeight": 12, "critical": True, "complete": bool(inp.get("propertyAuthorityComplete") or False), "label": "Property authority"},
-        {"id": "site", "category": "Feasibility", "displayWeight": 12, "critical": True, "complete": bool(inp.get("siteFeasibilityComplete") or False), "label": "Site feasibility"},
-        {"id": "load", "category": "Load", "displayWeight": 12, "critical": True, "complete": bool(inp.get("loadProfileSizingComplete") or False), "label": "Load profile and sizing"},
-        {
-            "id": "stake",
-            "category": "Stakeholders",
-            "displayWeight": 12,
-            "critical": True,
-            "complete": bool(inp.get("stakeholdersVetted"))
-            or (bool(inp.get("hasCertifiedLeadElectrician")) and bool(inp.get("hasVerifiedSupplierQuote"))),
-            "label": "Stakeholder readiness",
-        },
-        {"id": "cap", "category": "Capital", "displayWeight": 12, "critical": True, "complete": bool(inp.get("capitalAndLaborResolved") or False), "label": "Capital and electrician payment"},
-        {"id": "hw", "category": "Hardware", "displayWeight": 12, "critical": True, "complete": bool(hw), "label": "Hardware procurement"},
-        {"id": "legal", "category": "Utility", "displayWeight": 12, "critical": True, "complete": bool(inp.get("legalUtilityDisciplineComplete") or False), "label": "Legal and utility discipline"},
-        {
-            "id": "ready",
-            "category": "Activation",
-            "displayWeight": 8,
-            "critical": False,
-            "complete": bool(demand_signal) and float(inp.get("projectedUtilization", 0)) >= 0.6,
-            "label": "Homeowner consumption readiness (pre-activation)",
-        },
-        {"id": "elec", "category": "Electrician", "displayWeight": 8, "critical": True, "complete": bool(inp.get("hasCertifiedLeadElectrician") and elec >= 50), "label": "Certified electrician"},
-        {
-            "id": "mon",
-            "category": "Ops",
-            "displayWeight": 0,
-            "critical": True,
-            "complete": bool(inp.get("monitoringConnectivityResolved") and inp.get("settlementDataTrusted")),
-            "label": "Monitoring and settlement trust",
-        },
-    ]
+HOMEOWNER_RULES = RuleTable(
+    gates=(
+        Gate("PROP_AUTH", "Property authority not verified.", "homeowner", Flag("propertyAuthorityComplete")),
+        Gate("SITE_FEAS", "Site feasibility incomplete.", "electrician", Flag("siteFeasibilityComplete")),
+        Gate("LOAD_SIZE", "Load profile and sizing discipline incomplete.", "homeowner", Flag("loadProfileSizingComplete")),
+        Gate("STAKE_READY", "Stakeholder readiness incomplete.", "admin", HOMEOWNER_STAKEHOLDERS),
+        Gate(
+            "CAPITAL_LABOR",
+            "Capital stack and electrician payment not resolved.",
+            "financier",
+            Flag("capitalAndLaborResolved"),
+        ),
+        Gate(
+            "HW_PROC",
+            "Hardware procurement path incomplete.",
+            "provider",
+            Any(Flag("hardwareProcurementComplete"), QUOTE),
+        ),
+        Gate(
+            "LEGAL_UTIL",
+            "Legal / utility / export discipline incomplete.",
+            "electrician",
+            Flag("legalUtilityDisciplineComplete"),
+        ),
+        Gate("CONTRACTS", "Contracts and compliance incomplete.", "admin", Flag("contractsAndComplianceReady", default=True)),
+        Gate("ELEC_LEAD", "No certified lead electrician assigned.", "electrician", LEAD),
+        Gate("DEMAND_LOW", "Utilization forecast below credible threshold.", "homeowner", UTILIZATION_OK),
+        Gate("DEMAND_SIG", "Homeowner commitment / demand signal insufficient.", "homeowner", DEMAND_SIGNAL),
+        Gate("MONITORING", "Monitoring connectivity unresolved.", "provider", Flag("monitoringConnectivityResolved")),
+        Gate("SETTLEMENT_DATA", "Settlement data cannot be trusted.", "admin", Flag("settlementDataTrusted")),
+    ),
+    checklist=(
+        ChecklistItem("prop", "Authority", 12, True, "Property authority", Flag("propertyAuthorityComplete")),
+        ChecklistItem("site", "Feasibility", 12, True, "Site feasibility", Flag("siteFeasibilityComplete")),
+        ChecklistItem("load", "Load", 12, True, "Load profile and sizing", Flag("loadProfileSizingComplete")),
+        ChecklistItem("stake", "Stakeholders", 12, True, "Stakeholder readiness", HOMEOWNER_STAKEHOLDERS),
+        ChecklistItem("cap", "Capital", 12, True, "Capital and electrician payment", Flag("capitalAndLaborResolved")),
+        ChecklistItem(
+            "hw",
+            "Hardware",
+            12,
+            True,
+            "Hardware procurement",
+            Flag("hardwareProcurementComplete", fallback=QUOTE, none_is_missing=True),
+        ),
+        ChecklistItem("legal", "Utility", 12, True, "Legal and utility discipline", Flag("legalUtilityDisciplineComplete")),
+        ChecklistItem(
+            "ready",
+            "Activation",
+            8,
+            False,
+            "Homeowner consumption readiness (pre-activation)",
+            All(DEMAND_SIGNAL, AtLeast(UTILIZATION, 0.6)),
+        ),
+        ChecklistItem("elec", "Electrician", 8, True, "Certified electrician", ELECTRICIAN_READY),
+        ChecklistItem("mon", "Ops", 0, True, "Monitoring and settlement trust", OPS_TRUSTED),
+    ),
+)
 
 
-def calculate_drs(inp: dict) -> dict:
-    elec = _electrician_score(inp)
-    sk = _site_kind(inp)
-    critical_failures = _homeowner_failures(inp) if sk == "homeowner" else _apartment_failures(inp)
-    warnings = _warnings(inp)
-    checklist = _build_homeowner_checklist(inp, elec) if sk == "homeowner" else _build_apartment_checklist(inp, elec)
-    score = min(100.0, _weighted_display_score(inp, elec))
-    components = {
-        "demandCoverage": clamp_score(inp.get("demandCoverage", 0)),
-        "prepaidCommitment": clamp_score(inp.get("prepaidCommitment", 0)),
-        "loadProfile": clamp_score(inp.get("loadProfile", 0)),
-        "installationReadiness": clamp_score(inp.get("installationReadiness", 0)),
-        "electricianReadiness": elec,
-        "installerReadiness": elec,
-        "capitalAlignment": clamp_score(inp.get("capitalAlignment", 0)),
-    }
-    if critical_failures:
-        decision = "blocked"
-    elif warnings:
-        decision = "review"
-    else:
-        decision = "deployment_ready"
-    reasons = [f["message"] for f in critical_failures] + warnings
+def _rules_for(site_kind: str) -> RuleTable:
+    return HOMEOWNER_RULES if site_kind == "homeowner" else APARTMENT_RULES
+
+
+def _assemble(
+    rules: RuleTable,
+    score: float,
+    failed: Sequence[bool],
+    warned: Sequence[bool],
+    complete: Sequence[bool],
+    components: dict,
+) -> dict:
+    critical_failures = [gate.failure() for gate, f in zip(rules.gates, failed) if f]
+    warnings = [rule.message for rule, w in zip(WARNING_RULES, warned) if w]
     return {
         "score": score,
-        "decision": decision,
-        "reasons": reasons,
+        "decision": decision(bool(critical_failures), bool(warnings)),
+        "reasons": [f["message"] for f in critical_failures] + warnings,
         "criticalFailures": critical_failures,
         "warnings": warnings,
-        "checklist": checklist,
+        "checklist": [item.entry(c) for item, c in zip(rules.checklist, complete)],
         "components": components,
     }
 
 
+def _score(components: Mapping[str, float]) -> float:
+    return min(100.0, round1(sum(components[name] * weight for name, weight in SCORE_WEIGHTS)))
+
+
+def calculate_drs(inp: dict) -> dict:
+    rules = _rules_for(_site_kind(inp))
+    components = {name: value.scalar(inp) for name, value in COMPONENTS.items()}
+    return _assemble(
+        rules,
+        _score(components),
+        [not passes(inp) for passes in rules.gate_checks],
+        [rule.applies.scalar(inp) for rule in WARNING_RULES],
+        [complete(inp) for complete in rules.checklist_checks],
+        components,
+    )
+
+
+def changed_inputs(before: Mapping, after: Mapping) -> list[str]:
+    """Input keys added, removed or changed between two input dicts, sorted.
+
+    Values of different types count as changed (``0`` vs ``False`` reads
+    differently for NotFalse rules).
+    """
+    changed = []
+    for key in before.keys() | after.keys():
+        old, new = before.get(key, MISSING), after.get(key, MISSING)
+        if type(old) is not type(new) or old != new:
+            changed.append(key)
+    return sorted(changed)
+
+
+def recalculate_drs(previous_inputs: Mapping, previous: dict, inputs: dict) -> dict:
+    """calculate_drs(inputs), re-evaluating only the rules that read a changed key.
+
+    ``previous`` is calculate_drs(previous_inputs), possibly JSON round-tripped
+    and with extra keys such as ``label``. Gates, warnings, checklist items and
+    components whose inputs are unchanged are carried over from it; the score
+    is re-weighted from the components. A siteKind change swaps the rule table
+    and recomputes everything.
+    """
+    rules = _rules_for(_site_kind(inputs))
+    if rules is not _rules_for(_site_kind(previous_inputs)):
+        return calculate_drs(inputs)
+    changed = frozenset(changed_inputs(previous_inputs, inputs))
+
+    failed_codes = {failure["code"] for failure in previous["criticalFailures"]}
+    failed = [
+        not gate.passes.scalar(inputs) if gate.passes.keys & changed else gate.code in failed_codes
+        for gate in rules.gates
+    ]
+    previous_warnings = set(previous["warnings"])
+    warned = [
+        rule.applies.scalar(inputs) if rule.applies.keys & changed else rule.message in previous_warnings
+        for rule in WARNING_RULES
+    ]
+    complete = [
+        item.complete.scalar(inputs) if item.complete.keys & changed else entry["complete"]
+        for item, entry in zip(rules.checklist, previous["checklist"])
+    ]
+    components = {
+        name: value.scalar(inputs) if value.keys & changed else previous["components"][name]
+        for name, value in COMPONENTS.items()
+    }
+    return _assemble(rules, _score(components), failed, warned, complete, components)
+
+
+def drs_outcome(result: dict) -> dict:
+    """calculate_drs output reduced to its rule outcomes — codes, bits and numbers, no messages."""
+    warnings = set(result["warnings"])
+    return {
+        "score": result["score"],
+        "failed": [failure["code"] for failure in result["criticalFailures"]],
+        "warned": [rule.message in warnings for rule in WARNING_RULES],
+        "complete": [entry["complete"] for entry in result["checklist"]],
+        "components": result["components"],
+    }
+
+
+def drs_from_outcome(inp: Mapping, outcome: dict) -> dict:
+    """Rebuild calculate_drs(inp) from drs_outcome(calculate_drs(inp))."""
+    rules = _rules_for(_site_kind(inp))
+    failed_codes = set(outcome["failed"])
+    return _assemble(
+        rules,
+        outcome["score"],
+        [gate.code in failed_codes for gate in rules.gates],
+        outcome["warned"],
+        outcome["complete"],
+        outcome["components"],
+    )
+
+
+@dataclass
+class DrsBatch:
+    """evaluate_drs output: one row per input, rule outcomes as boolean masks."""
+
+    homeowner: np.ndarray  # (N,) bool — which rule table applies
+    score: np.ndarray  # (N,) float
+    components: dict[str, np.ndarray]
+    warned: np.ndarray  # (N, len(WARNING_RULES))
+    failed: dict[RuleTable, np.ndarray]  # table → (N, len(gates)); only rows of that kind are meaningful
+    complete: dict[RuleTable, np.ndarray]  # table → (N, len(checklist))
+    blocked: np.ndarray  # (N,) bool
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    @property
+    def decisions(self) -> list[str]:
+        codes = np.where(self.blocked, 0, np.where(self.warned.any(axis=1), 1, 2))
+        names = ("blocked", "review", "deployment_ready")
+        return [names[c] for c in codes.tolist()]
+
+    @property
+    def reasons(self) -> list[list[str]]:
+        """Failure messages then warnings per row, built once per distinct outcome pattern."""
+        out: list[list[str] | None] = [None] * len(self)
+        for rules, rows in self._groups():
+            if not rows.size:
+                continue
+            outcome = np.concatenate([self.failed[rules][rows], self.warned[rows]], axis=1)
+            # Pack each row's outcome into one integer so distinct patterns are a 1-D unique.
+            codes = outcome.astype(np.uint64) @ (np.uint64(1) << np.arange(outcome.shape[1], dtype=np.uint64))
+            patterns, first, which = np.unique(codes, return_index=True, return_inverse=True)
+            messages = [g.message for g in rules.gates] + [w.message for w in WARNING_RULES]
+            texts = [[m for m, hit in zip(messages, outcome[i].tolist()) if hit] for i in first.tolist()]
+            for row, p in zip(rows.tolist(), which.reshape(-1).tolist()):
+                out[row] = list(texts[p])
+        return out  # type: ignore[return-value]
+
+    def result(self, index: int) -> dict:
+        """Row ``index`` in calculate_drs's output shape."""
+        rules = HOMEOWNER_RULES if self.homeowner[index] else APARTMENT_RULES
+        return _assemble(
+            rules,
+            float(self.score[index]),
+            self.failed[rules][index].tolist(),
+            self.warned[index].tolist(),
+            self.complete[rules][index].tolist(),
+            {name: float(values[index]) for name, values in self.components.items()},
+        )
+
+    def _groups(self) -> list[tuple[RuleTable, np.ndarray]]:
+        return [
+            (APARTMENT_RULES, np.flatnonzero(~self.homeowner)),
+            (HOMEOWNER_RULES, np.flatnonzero(self.homeowner)),
+        ]
+
+
+def evaluate_drs(inputs: Sequence[dict] = (), columns: Mapping[str, Sequence] | None = None) -> DrsBatch:
+    """Evaluate calculate_drs over a batch of buildings as boolean masks.
+
+    ``inputs`` are calculate_drs input dicts. ``columns`` maps input keys to one
+    value per building (e.g. NumPy arrays from a portfolio projection) and wins
+    over the dicts; a supplied column counts as present for every building.
+    With ``columns`` alone no dict is touched — the fastest path for sweeps.
+    """
+    cols = Columns(inputs, columns)
+    homeowner = cols.raw("siteKind") == "homeowner"
+    if homeowner.dtype != bool:
+        homeowner = homeowner.astype(bool)
+
+    components = {name: cols.eval(value) for name, value in COMPONENTS.items()}
+    weighted = components[SCORE_WEIGHTS[0][0]] * SCORE_WEIGHTS[0][1]
+    for name, weight in SCORE_WEIGHTS[1:]:
+        weighted = weighted + components[name] * weight
+    score = np.minimum(100.0, round1_array(weighted))
+
+    def mask(predicates: Sequence[Predicate]) -> np.ndarray:
+        out = np.empty((cols.n, len(predicates)), dtype=bool)
+        for j, predicate in enumerate(predicates):
+            out[:, j] = cols.eval(predicate)
+        return out
+
+    warned = mask([rule.applies for rule in WARNING_RULES])
+    failed = {rules: ~mask([g.passes for g in rules.gates]) for rules in (APARTMENT_RULES, HOMEOWNER_RULES)}
+    complete = {rules: mask([c.complete for c in rules.checklist]) for rules in (APARTMENT_RULES, HOMEOWNER_RULES)}
+    blocked = np.where(homeowner, failed[HOMEOWNER_RULES].any(axis=1), failed[APARTMENT_RULES].any(axis=1))
+    return DrsBatch(
+        homeowner=homeowner,
+        score=score,
+        components=components,
+        warned=warned,
+        failed=failed,
+        complete=complete,
+        blocked=blocked,
+    )
+
+
 def get_drs_label(decision: str) -> str:
     if decision == "deployment_ready":
         return "Deployment-ready (all critical gates)"
@@ -0,0 +1,158 @@
+"""DRS snapshot store — the current DRS per building, kept up to date incrementally.
+
+A building's DRS only moves when one of its calculate_drs inputs moves: a
+pledge changes prepaidCommitment, a stage or kind edit changes the resolved
+template, an electrician flips a gate via POST /drs/{id}/update. The store
+keeps the inputs and their rule outcome in drs_snapshots, so:
+
+* reads are a primary-key lookup, checked against ``source_key`` — a
+  fingerprint of everything resolve_project_dict_for_drs reads plus the
+  pledge total. A write committed by another worker, or one that never
+  called refresh, shows up as a mismatch and is folded in on that read;
+* writes diff the new inputs against the stored ones and hand the changed
+  keys to recalculate_drs, which re-evaluates only the gates, warnings,
+  checklist items and score components that read them;
+* a drs_transitions row is appended only when the score or the decision
+  moves, so history stays compact;
+* the served payload is memoized per building in projection_cache, keyed by
+  the snapshot's (source_key, version); writers invalidate it after commit.
+
+Gate overrides are stored with the snapshot and applied over the resolved
+template's ``drs`` flags before the derived inputs (coverage, utilization,
+site kind) are filled in, exactly as project_building does.
+"""
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.building import Building
+from ..models.drs import DrsSnapshot
+from ..repos import drs as drs_repo
+from ..repos import prepaid as prepaid_repo
+from .building_drs import resolve_project_dict_for_drs
+from .drs import calculate_drs, changed_inputs, drs_from_outcome, drs_outcome, get_drs_label, recalculate_drs
+from .projection_cache import projection_cache
+from .projector import project_drs_input
+
+
+def source_key(building: Building, prepaid_committed_kes: float) -> str:
+    """Everything resolve_project_dict_for_drs reads from the building, plus the pledge total."""
+    return json.dumps(
+        [
+            building.updated_at.isoformat() if building.updated_at else None,
+            building.stage,
+            building.kind,
+            building.unit_count,
+            building.name,
+            building.address,
+            float(prepaid_committed_kes),
+        ]
+    )
+
+
+def _inputs(building: Building, prepaid_committed_kes: float, overrides: dict[str, Any]) -> dict[str, Any]:
+    project = resolve_project_dict_for_drs(building, prepaid_committed_kes)
+    project["drs"].update(overrides)
+    return project_drs_input(project)
+
+
+def result(snapshot: DrsSnapshot) -> dict[str, Any]:
+    """The stored DRS in calculate_drs's shape plus ``label``, as GET /drs/{id} serves it."""
+    out = drs_from_outcome(snapshot.inputs, snapshot.outcome)
+    return {**out, "label": get_drs_label(out["decision"])}
+
+
+def cached_result(snapshot: DrsSnapshot) -> dict[str, Any]:
+    """result(snapshot) through the projection cache; the returned dict is shared, do not mutate."""
+    return projection_cache.get_or_compute(
+        snapshot.building_id, (snapshot.source_key, snapshot.version), lambda: result(snapshot)
+    )
+
+
+async def current(session: AsyncSession, building: Building) -> DrsSnapshot:
+    """The building's snapshot, refreshed first if its inputs moved since it was stored.
+
+    Flushes but does not commit; callers commit when the snapshot was written.
+    """
+    pledged = float(await prepaid_repo.confirmed_total(session, building.id))
+    snapshot = await drs_repo.get_snapshot(session, building.id)
+    if snapshot is not None and snapshot.source_key == source_key(building, pledged):
+        return snapshot
+    projection_cache.record_refresh()
+    return await refresh(session, building, prepaid_committed_kes=pledged)
+
+
+async def refresh(
+    session: AsyncSession,
+    building: Building,
+    *,
+    prepaid_committed_kes: float | None = None,
+    overrides: dict[str, Any] | None = None,
+) -> DrsSnapshot:
+    """Re-derive the building's DRS inputs and store what changed.
+
+    ``overrides`` are merged over the gate overrides already stored. Runs
+    under a row lock on the snapshot; flushes but does not commit.
+    """
+    if prepaid_committed_kes is None:
+        prepaid_committed_kes = float(await prepaid_repo.confirmed_total(session, building.id))
+    key = source_key(building, prepaid_committed_kes)
+
+    snapshot = await drs_repo.get_snapshot(session, building.id, for_update=True)
+    if snapshot is None:
+        merged = dict(overrides or {})
+        inputs = _inputs(building, prepaid_committed_kes, merged)
+        outcome = calculate_drs(inputs)
+        snapshot = await drs_repo.create_snapshot(
+            session,
+            building_id=building.id,
+            source_key=key,
+            inputs=inputs,
+            overrides=merged,
+            outcome=drs_outcome(outcome),
+        )
+        if snapshot is not None:
+            await drs_repo.add_transition(
+                session,
+                building_id=building.id,
+                version=1,
+                score=outcome["score"],
+                decision=outcome["decision"],
+                previous_score=None,
+                previous_decision=None,
+                changed_inputs=sorted(inputs),
+            )
+            return snapshot
+        # Another writer created it between our read and insert.
+        snapshot = await drs_repo.get_snapshot(session, building.id, for_update=True)
+
+    merged = {**snapshot.overrides, **(overrides or {})}
+    inputs = _inputs(building, prepaid_committed_kes, merged)
+    changed = changed_inputs(snapshot.inputs, inputs)
+    snapshot.source_key = key
+    if merged != snapshot.overrides:
+        snapshot.overrides = merged
+    if changed:
+        previous = drs_from_outcome(snapshot.inputs, snapshot.outcome)
+        outcome = recalculate_drs(snapshot.inputs, previous, inputs)
+        snapshot.version += 1
+        snapshot.inputs = inputs
+        snapshot.outcome = drs_outcome(outcome)
+        snapshot.updated_at = datetime.now(timezone.utc)
+        if (outcome["score"], outcome["decision"]) != (previous["score"], previous["decision"]):
+            await drs_repo.add_transition(
+                session,
+                building_id=building.id,
+                version=snapshot.version,
+                score=outcome["score"],
+                decision=outcome["decision"],
+                previous_score=previous["score"],
+                previous_decision=previous["decision"],
+                changed_inputs=changed,
+            )
+    await session.flush()
+    return snapshot
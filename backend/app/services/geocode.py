@@ -2,7 +2,11 @@
 
 Free public API, no key. Per Nominatim usage policy:
   - Set a descriptive User-Agent.
-  - Max 1 req/sec from a single source (we don't batch; pilot volume is fine).
+  - Max 1 req/sec from a single source: the shared pool sends one request at
+    a time to the Nominatim host, at least EMAPPA_NOMINATIM_MIN_INTERVAL_SECONDS
+    apart.
+  - Cache results: repeated lookups of an address are served from the shared
+    response cache (EMAPPA_GEOCODE_CACHE_TTL_SECONDS).
 
 For production, consider self-hosting Nominatim or paying Mapbox/Google.
 """
@@ -10,14 +14,20 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from urllib.parse import urlsplit
 
-import httpx
+from ..config import get_settings
+from .http_pool import http_pool
 
 logger = logging.getLogger(__name__)
 
 NOMINATIM_BASE = "https://nominatim.openstreetmap.org/search"
 USER_AGENT = "emappa-pilot/0.1 (Kenya energy coordination)"
 
+http_pool.limit_host(
+    urlsplit(NOMINATIM_BASE).netloc, concurrency=1, min_interval=get_settings().nominatim_min_interval_seconds
+)
+
 
 @dataclass
 class GeocodeResult:
@@ -39,10 +49,13 @@ async def geocode(query: str) -> GeocodeResult | None:
     }
     headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.get(NOMINATIM_BASE, params=params, headers=headers)
-            resp.raise_for_status()
-            data = resp.json()
+        data = await http_pool.get_json(
+            NOMINATIM_BASE,
+            params=params,
+            headers=headers,
+            timeout=10.0,
+            ttl=get_settings().geocode_cache_ttl_seconds,
+        )
         if not data:
             return None
         first = data[0]
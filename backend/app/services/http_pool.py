@@ -0,0 +1,219 @@
+"""Shared outbound HTTP — one pooled httpx client plus a response cache.
+
+The solar/geo adapters used to open a fresh AsyncClient per call, so every
+call paid for DNS, TCP and TLS and nothing was kept alive. HttpPool owns one
+lazily created AsyncClient for the whole process. Its keep-alive pool is
+bounded overall, and a per-host semaphore keeps one slow upstream from
+taking every connection. Hosts with a usage policy get their own limit via
+limit_host: fewer concurrent requests and a minimum interval between request
+starts (Nominatim: one at a time, one per second). main.lifespan closes it.
+
+get_json also takes a cache ``ttl`` (seconds; None = never expires, 0 = don't
+cache). Responses are keyed on URL + sorted params. Secrets such as
+``api_key`` are left out of the key, so a rotated key still hits the cache.
+Entries sit in an in-memory LRU. When ``http_cache_dir`` is set they are also
+written there as one JSON file per key, so immutable answers survive
+restarts. Only successful JSON responses are cached, and callers can pass
+``valid`` to keep a 200 whose body is unusable out of the cache; errors
+always go upstream again.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SECRET_PARAMS = frozenset({"api_key", "key", "apikey", "token"})
+
+
+def cache_key(url: str, params: Mapping[str, Any] | None) -> str:
+    public = sorted((k, str(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS)
+    return hashlib.sha256(json.dumps([url, public]).encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        directory: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None and self.directory is not None:
+            entry = await asyncio.to_thread(self._read_file, key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is not None and entry[0] > self._clock():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            self._entries.pop(key, None)
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, value: Any, ttl: float | None) -> None:
+        entry = (float("inf") if ttl is None else self._clock() + ttl, value)
+        self._remember(key, entry)
+        if self.directory is not None:
+            await asyncio.to_thread(self._write_file, key, entry)
+
+    def clear(self) -> None:
+        """Drop the in-memory entries; files on disk are left alone."""
+        self._entries.clear()
+
+    def _remember(self, key: str, entry: tuple[float, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.json"
+
+    def _read_file(self, key: str) -> tuple[float, Any] | None:
+        try:
+            raw = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        expires = raw["expires"]
+        return (float("inf") if expires is None else expires, raw["body"])
+
+    def _write_file(self, key: str, entry: tuple[float, Any]) -> None:
+        expires, body = entry
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(key).with_suffix(".tmp")
+        tmp.write_text(json.dumps({"expires": None if expires == float("inf") else expires, "body": body}))
+        tmp.replace(self._path(key))
+
+
+@dataclass
+class _HostGate:
+    """Concurrency slots for one host plus the earliest time the next request may start."""
+
+    slots: asyncio.Semaphore
+    min_interval: float = 0.0
+    next_start: float = 0.0
+
+    async def wait_turn(self, clock: Callable[[], float]) -> None:
+        if self.min_interval <= 0:
+            return
+        now = clock()
+        start = max(now, self.next_start)
+        self.next_start = start + self.min_interval  # reserved before sleeping, so waiters queue up
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class HttpPool:
+    def __init__(
+        self,
+        *,
+        max_connections: int,
+        max_per_host: int,
+        cache: ResponseCache,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._clock = clock
+        self._hosts: dict[str, _HostGate] = {}
+        self.upstream_calls = 0
+
+    def limit_host(self, host: str, *, concurrency: int, min_interval: float = 0.0) -> None:
+        """Cap requests to ``host`` (netloc) at ``concurrency`` in flight, starting ``min_interval`` s apart."""
+        self._hosts[host] = _HostGate(asyncio.Semaphore(concurrency), min_interval)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def get_json(
+        self,
+        url: str,
+        *,
+        params: Mapping[str, Any] | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float = 30.0,
+        ttl: float | None = 0,
+        valid: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """GET url and decode JSON, through the cache unless ``ttl == 0``. Raises on HTTP errors.
+
+        A body for which ``valid`` returns False is returned but not cached.
+        """
+        key = cache_key(url, params)
+        if ttl != 0:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+        host = urlsplit(url).netloc
+        gate = self._hosts.get(host)
+        if gate is None:
+            gate = self._hosts[host] = _HostGate(asyncio.Semaphore(self.max_per_host))
+        client = self.client  # built before the turn is reserved, so setup cannot eat into the interval
+        async with gate.slots:
+            await gate.wait_turn(self._clock)
+            self.upstream_calls += 1
+            resp = await client.get(url, params=params, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        body = resp.json()
+        if ttl != 0 and (valid is None or valid(body)):
+            await self.cache.put(key, body, ttl)
+        return body
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _from_settings() -> HttpPool:
+    settings = get_settings()
+    return HttpPool(
+        max_connections=settings.http_max_connections,
+        max_per_host=settings.http_max_connections_per_host,
+        cache=ResponseCache(
+            max_entries=settings.http_cache_max_entries,
+            directory=settings.http_cache_dir or None,
+        ),
+    )
+
+
+http_pool = _from_settings()
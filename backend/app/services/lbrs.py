@@ -1,139 +1,273 @@
-"""LBRS — mirrors packages/shared/src/lbrs.ts; see docs/LBRS_FORMULA.md."""
+"""LBRS — mirrors packages/shared/src/lbrs.ts; see docs/LBRS_FORMULA.md.
 
+The go-live tests are declared once as rule tables (APARTMENT_LBRS,
+HOMEOWNER_LBRS) built from the same predicates and RuleTable as the DRS gates
+(rule_tables.py), so one definition serves both calculate_lbrs (one building)
+and evaluate_lbrs (a batch as boolean masks). lbrs_sweep runs the batch over
+the installing/live buildings of a portfolio and returns the go-live board
+numbers — per-gate pass counts and a blocker histogram — from one call.
+"""
+from __future__ import annotations
 
-def round1(value: float) -> float:
-    return round(value + 1e-12, 1)
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+from .rule_tables import All, Columns, Flag, Gate, Predicate, RuleTable, decision, round1, round1_array
+
+LIVE_TEST_KEYS = (
+    "asBuiltBomVerified",
+    "electricalSafetyComplete",
+    "solarBusIsolationVerified",
+    "inverterBatteryTestsComplete",
+    "atsSwitchingPerApartmentComplete",
+    "homeSwitchingFallbackComplete",
+    "meterMappingDataReliable",
+    "tokenSettlementDryRunPassed",
+    "backendTokenControlDryRunPassed",
+    "residentOwnerLaunchReadinessComplete",
+)
+SWEEP_STAGES = ("install", "live")
+_HOMEOWNER_KINDS = ("single_family", "small_compound")
 
 
 def _site_kind(inp: dict) -> str:
     return inp.get("siteKind") or "apartment"
 
 
-def _collect_lbrs_critical_failures(inp: dict) -> list[dict]:
-    f: list[dict] = []
-    if not inp.get("asBuiltBomVerified"):
-        f.append({"code": "AS_BUILT", "message": "As-built / BOM verification incomplete.", "responsibleRole": "electrician"})
-    if not inp.get("electricalSafetyComplete"):
-        f.append({"code": "ELEC_SAFE", "message": "Electrical safety tests incomplete.", "responsibleRole": "electrician"})
-    if not inp.get("solarBusIsolationVerified"):
-        f.append(
-            {"code": "ISO", "message": "Solar bus isolation / no unsafe backfeed not verified.", "responsibleRole": "electrician"}
-        )
-    if not inp.get("inverterBatteryTestsComplete"):
-        f.append(
-            {"code": "INV_BAT", "message": "Inverter and battery commissioning tests incomplete.", "responsibleRole": "electrician"}
-        )
-    sk = _site_kind(inp)
-    if sk == "apartment":
-        if not inp.get("atsSwitchingPerApartmentComplete"):
-            f.append(
-                {"code": "ATS_APT", "message": "ATS switching tests per apartment incomplete.", "responsibleRole": "electrician"}
-            )
-    else:
-        if not inp.get("homeSwitchingFallbackComplete"):
-            f.append(
-                {
-                    "code": "ATS_HOME",
-                    "message": "Home changeover / ATS and grid fallback tests incomplete.",
-                    "responsibleRole": "electrician",
-                }
-            )
-    if not inp.get("meterMappingDataReliable"):
-        f.append({"code": "METER_MAP", "message": "Meter mapping and data reliability not verified.", "responsibleRole": "electrician"})
-    if not inp.get("tokenSettlementDryRunPassed"):
-        f.append({"code": "TOKEN_DRY", "message": "Token control / settlement dry run failed.", "responsibleRole": "admin"})
-    if not inp.get("backendTokenControlDryRunPassed"):
-        f.append(
-            {
-                "code": "BACKEND_DRY",
-                "message": "Backend / token / settlement integration dry run incomplete.",
-                "responsibleRole": "admin",
-            }
-        )
-    if not inp.get("residentOwnerLaunchReadinessComplete"):
-        f.append(
-            {
-                "code": "LAUNCH",
-                "message": "Resident/owner launch readiness incomplete.",
-                "responsibleRole": "building_owner",
-            }
-        )
-    return f
+@dataclass(frozen=True)
+class LiveTest:
+    """Checklist row of the go-live board; every LBRS test is critical."""
 
+    id: str
+    test_name: str
+    display_weight: int
+    label: str
+    complete: Predicate
 
-def _checklist(inp: dict) -> list[dict]:
-    sk = _site_kind(inp)
-    ats_item = (
-        {
-            "id": "ats",
-            "testName": "ATS apt",
-            "displayWeight": 15,
+    def entry(self, complete: bool) -> dict:
+        return {
+            "id": self.id,
+            "testName": self.test_name,
+            "displayWeight": self.display_weight,
             "critical": True,
-            "complete": bool(inp.get("atsSwitchingPerApartmentComplete")),
-            "label": "ATS switching per apartment",
-        }
-        if sk == "apartment"
-        else {
-            "id": "ats",
-            "testName": "ATS home",
-            "displayWeight": 15,
-            "critical": True,
-            "complete": bool(inp.get("homeSwitchingFallbackComplete")),
-            "label": "Switching / fallback tests",
+            "complete": complete,
+            "label": self.label,
         }
+
+
+def _gate(code: str, message: str, key: str, responsible_role: str = "electrician") -> Gate:
+    return Gate(code, message, responsible_role, Flag(key))
+
+
+def _table(ats_gate: Gate, ats_test: LiveTest) -> RuleTable:
+    return RuleTable(
+        gates=(
+            _gate("AS_BUILT", "As-built / BOM verification incomplete.", "asBuiltBomVerified"),
+            _gate("ELEC_SAFE", "Electrical safety tests incomplete.", "electricalSafetyComplete"),
+            _gate("ISO", "Solar bus isolation / no unsafe backfeed not verified.", "solarBusIsolationVerified"),
+            _gate("INV_BAT", "Inverter and battery commissioning tests incomplete.", "inverterBatteryTestsComplete"),
+            ats_gate,
+            _gate("METER_MAP", "Meter mapping and data reliability not verified.", "meterMappingDataReliable"),
+            _gate("TOKEN_DRY", "Token control / settlement dry run failed.", "tokenSettlementDryRunPassed", "admin"),
+            _gate(
+                "BACKEND_DRY",
+                "Backend / token / settlement integration dry run incomplete.",
+                "backendTokenControlDryRunPassed",
+                "admin",
+            ),
+            _gate(
+                "LAUNCH",
+                "Resident/owner launch readiness incomplete.",
+                "residentOwnerLaunchReadinessComplete",
+                "building_owner",
+            ),
+        ),
+        checklist=(
+            LiveTest("asbuilt", "As-built/BOM", 10, "As-built / BOM verification", Flag("asBuiltBomVerified")),
+            LiveTest("safe", "Electrical safety", 20, "Electrical safety tests", Flag("electricalSafetyComplete")),
+            LiveTest("iso", "Isolation", 15, "Solar bus isolation / no backfeed", Flag("solarBusIsolationVerified")),
+            LiveTest("inv", "Inverter/battery", 10, "Inverter + battery tests", Flag("inverterBatteryTestsComplete")),
+            ats_test,
+            LiveTest("meter", "Meters", 10, "Meter mapping + data reliability", Flag("meterMappingDataReliable")),
+            LiveTest(
+                "dry",
+                "Dry run",
+                10,
+                "Backend/token/settlement dry run",
+                All(Flag("tokenSettlementDryRunPassed"), Flag("backendTokenControlDryRunPassed")),
+            ),
+            LiveTest(
+                "launch", "Launch", 10, "Resident/owner launch readiness", Flag("residentOwnerLaunchReadinessComplete")
+            ),
+        ),
     )
-    return [
-        {"id": "asbuilt", "testName": "As-built/BOM", "displayWeight": 10, "critical": True, "complete": bool(inp.get("asBuiltBomVerified")), "label": "As-built / BOM verification"},
-        {"id": "safe", "testName": "Electrical safety", "displayWeight": 20, "critical": True, "complete": bool(inp.get("electricalSafetyComplete")), "label": "Electrical safety tests"},
-        {"id": "iso", "testName": "Isolation", "displayWeight": 15, "critical": True, "complete": bool(inp.get("solarBusIsolationVerified")), "label": "Solar bus isolation / no backfeed"},
-        {"id": "inv", "testName": "Inverter/battery", "displayWeight": 10, "critical": True, "complete": bool(inp.get("inverterBatteryTestsComplete")), "label": "Inverter + battery tests"},
-        ats_item,
-        {"id": "meter", "testName": "Meters", "displayWeight": 10, "critical": True, "complete": bool(inp.get("meterMappingDataReliable")), "label": "Meter mapping + data reliability"},
-        {
-            "id": "dry",
-            "testName": "Dry run",
-            "displayWeight": 10,
-            "critical": True,
-            "complete": bool(inp.get("tokenSettlementDryRunPassed") and inp.get("backendTokenControlDryRunPassed")),
-            "label": "Backend/token/settlement dry run",
-        },
-        {
-            "id": "launch",
-            "testName": "Launch",
-            "displayWeight": 10,
-            "critical": True,
-            "complete": bool(inp.get("residentOwnerLaunchReadinessComplete")),
-            "label": "Resident/owner launch readiness",
-        },
-    ]
 
 
-def _display_score(items: list[dict]) -> float:
-    crit = [i for i in items if i.get("critical")]
-    num = sum(i["displayWeight"] for i in crit if i.get("complete"))
-    den = sum(i["displayWeight"] for i in crit)
+APARTMENT_LBRS = _table(
+    _gate("ATS_APT", "ATS switching tests per apartment incomplete.", "atsSwitchingPerApartmentComplete"),
+    LiveTest("ats", "ATS apt", 15, "ATS switching per apartment", Flag("atsSwitchingPerApartmentComplete")),
+)
+HOMEOWNER_LBRS = _table(
+    _gate("ATS_HOME", "Home changeover / ATS and grid fallback tests incomplete.", "homeSwitchingFallbackComplete"),
+    LiveTest("ats", "ATS home", 15, "Switching / fallback tests", Flag("homeSwitchingFallbackComplete")),
+)
+_TABLES = (APARTMENT_LBRS, HOMEOWNER_LBRS)
+
+
+def _rules_for(site_kind: str) -> RuleTable:
+    return HOMEOWNER_LBRS if site_kind == "homeowner" else APARTMENT_LBRS
+
+
+def _weights(rules: RuleTable) -> np.ndarray:
+    return np.array([item.display_weight for item in rules.checklist], dtype=np.float64)
+
+
+def _display_score(rules: RuleTable, complete: Sequence[bool]) -> float:
+    num = sum(item.display_weight for item, c in zip(rules.checklist, complete) if c)
+    den = sum(item.display_weight for item in rules.checklist)
     return round1((num / den) * 100) if den > 0 else 0.0
 
 
-def calculate_lbrs(inp: dict) -> dict:
-    items = _checklist(inp)
-    fails = _collect_lbrs_critical_failures(inp)
+def _assemble(rules: RuleTable, failed: Sequence[bool], complete: Sequence[bool]) -> dict:
+    fails = [gate.failure() for gate, f in zip(rules.gates, failed) if f]
     warnings: list[str] = []
-    score = _display_score(items)
-    if fails:
-        decision = "blocked"
-    elif warnings:
-        decision = "review"
-    else:
-        decision = "deployment_ready"
-    reasons = [c["message"] for c in fails] + warnings
     return {
-        "score": score,
-        "decision": decision,
-        "reasons": reasons,
+        "score": _display_score(rules, complete),
+        "decision": decision(bool(fails), bool(warnings)),
+        "reasons": [f["message"] for f in fails] + warnings,
         "criticalFailures": fails,
         "warnings": warnings,
-        "checklist": items,
+        "checklist": [item.entry(c) for item, c in zip(rules.checklist, complete)],
+    }
+
+
+def calculate_lbrs(inp: dict) -> dict:
+    rules = _rules_for(_site_kind(inp))
+    return _assemble(
+        rules,
+        [not passes(inp) for passes in rules.gate_checks],
+        [complete(inp) for complete in rules.checklist_checks],
+    )
+
+
+def _default_input(site_kind: str, live: bool) -> Mapping[str, object]:
+    return MappingProxyType({"siteKind": site_kind, **{key: live for key in LIVE_TEST_KEYS}})
+
+
+_DEFAULT_INPUTS = {
+    (site_kind, live): _default_input(site_kind, live) for site_kind in ("apartment", "homeowner") for live in (False, True)
+}
+
+
+def default_lbrs_input(project: dict) -> Mapping[str, object]:
+    """The project's own ``lbrs`` input, else the shared read-only default for its kind and stage.
+
+    Until commissioning is recorded every test is assumed done for live
+    buildings and pending for everything else.
+    """
+    if project.get("lbrs"):
+        return project["lbrs"]
+    site_kind = "homeowner" if project.get("buildingKind") in _HOMEOWNER_KINDS else "apartment"
+    return _DEFAULT_INPUTS[(site_kind, project.get("stage") == "live")]
+
+
+@dataclass
+class LbrsBatch:
+    """evaluate_lbrs output: one row per building, gate and test outcomes as boolean masks."""
+
+    homeowner: np.ndarray  # (N,) bool — which rule table applies
+    score: np.ndarray  # (N,) float
+    failed: dict[RuleTable, np.ndarray]  # table → (N, len(gates)); only rows of that kind are meaningful
+    complete: dict[RuleTable, np.ndarray]  # table → (N, len(checklist))
+    blocked: np.ndarray  # (N,) bool
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    @property
+    def decisions(self) -> list[str]:
+        return ["blocked" if b else "deployment_ready" for b in self.blocked.tolist()]
+
+    @property
+    def blocker_counts(self) -> np.ndarray:
+        """(N,) number of failed gates per building."""
+        return np.where(
+            self.homeowner,
+            self.failed[HOMEOWNER_LBRS].sum(axis=1),
+            self.failed[APARTMENT_LBRS].sum(axis=1),
+        )
+
+    def gate_pass_counts(self) -> dict[str, dict[str, int]]:
+        """Per gate code: buildings it applies to and how many of them pass."""
+        counts: dict[str, dict[str, int]] = {}
+        for rules, rows in self._groups():
+            passed = (~self.failed[rules][rows]).sum(axis=0).tolist()
+            for gate, n_passed in zip(rules.gates, passed):
+                entry = counts.setdefault(gate.code, {"applicable": 0, "passed": 0})
+                entry["applicable"] += int(rows.size)
+                entry["passed"] += n_passed
+        return counts
+
+    def blocker_histogram(self) -> list[int]:
+        """Index k = number of buildings with exactly k failed gates."""
+        return np.bincount(self.blocker_counts, minlength=1).tolist()
+
+    def result(self, index: int) -> dict:
+        """Row ``index`` in calculate_lbrs's output shape."""
+        rules = HOMEOWNER_LBRS if self.homeowner[index] else APARTMENT_LBRS
+        return _assemble(rules, self.failed[rules][index].tolist(), self.complete[rules][index].tolist())
+
+    def _groups(self) -> list[tuple[RuleTable, np.ndarray]]:
+        return [
+            (APARTMENT_LBRS, np.flatnonzero(~self.homeowner)),
+            (HOMEOWNER_LBRS, np.flatnonzero(self.homeowner)),
+        ]
+
+
+def evaluate_lbrs(inputs: Sequence[Mapping] = (), columns: Mapping[str, Sequence] | None = None) -> LbrsBatch:
+    """calculate_lbrs over a batch as boolean masks; ``columns`` work as in evaluate_drs."""
+    cols = Columns(inputs, columns)
+    homeowner = cols.raw("siteKind") == "homeowner"
+    if homeowner.dtype != bool:
+        homeowner = homeowner.astype(bool)
+
+    def mask(predicates: Sequence[Predicate]) -> np.ndarray:
+        out = np.empty((cols.n, len(predicates)), dtype=bool)
+        for j, predicate in enumerate(predicates):
+            out[:, j] = cols.eval(predicate)
+        return out
+
+    failed = {rules: ~mask([gate.passes for gate in rules.gates]) for rules in _TABLES}
+    complete = {rules: mask([item.complete for item in rules.checklist]) for rules in _TABLES}
+    score = np.empty(cols.n)
+    for rules in _TABLES:
+        weights = _weights(rules)
+        rows = homeowner if rules is HOMEOWNER_LBRS else ~homeowner
+        score[rows] = round1_array(complete[rules][rows] @ weights / weights.sum() * 100)
+    blocked = np.where(homeowner, failed[HOMEOWNER_LBRS].any(axis=1), failed[APARTMENT_LBRS].any(axis=1))
+    return LbrsBatch(homeowner=homeowner, score=score, failed=failed, complete=complete, blocked=blocked)
+
+
+def lbrs_sweep(projects: Sequence[dict], stages: Sequence[str] = SWEEP_STAGES) -> dict:
+    """Go-live board for the projects in ``stages`` (installing and live by default).
+
+    Returns the swept ids with their decision and score, how many are
+    live-ready, per-gate pass counts and the blocker histogram, all as plain
+    Python values.
+    """
+    swept = [p for p in projects if p.get("stage") in stages]
+    batch = evaluate_lbrs([default_lbrs_input(p) for p in swept])
+    return {
+        "ids": [p["id"] for p in swept],
+        "decision": batch.decisions,
+        "score": batch.score.tolist(),
+        "buildings": len(batch),
+        "liveReady": int(len(batch) - batch.blocked.sum()),
+        "gatePassCounts": batch.gate_pass_counts(),
+        "blockerHistogram": batch.blocker_histogram(),
     }
 
 
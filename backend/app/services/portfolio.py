@@ -0,0 +1,185 @@
+"""Columnar portfolio projection — project_building's numeric core for N buildings at once.
+
+project_building builds the full nested view for one project (DRS, LBRS,
+payouts, eight role views). Portfolio callers (cockpit tables, audits,
+benchmarks) usually need a few numbers per building. project_portfolio pulls
+the inputs into NumPy columns once, then computes energy → settlement →
+payback as whole-array arithmetic. Only the groups named in ``fields`` are
+materialized in the result.
+
+Each group is a dict of column → array (or list for text columns), aligned
+with ``result["ids"]``. Values match project_building to the cent.
+portfolio_row turns one index back into plain dicts.
+
+The DRS gate rules run through evaluate_drs: the derived inputs (coverage,
+commitment, utilization, site kind) go in as columns and the gate flags are read
+from each project's ``drs`` dict once per key. The drs group's demandCoverage and
+prepaidCommitment are evaluate_drs's own components, i.e. the values
+project_building reports under ``drs["components"]``.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from .drs import evaluate_drs, get_drs_label
+from .energy import round2
+
+PORTFOLIO_FIELDS = ("energy", "settlement", "drs", "payback")
+PAYBACK_TARGET_MULTIPLE = 1.5
+_HOMEOWNER_KINDS = ("single_family", "small_compound")
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """round2 element-wise. np.rint is exact away from .xx5 ties; near-ties go through round2()."""
+    scaled = (values + 1e-12) * 100
+    out = np.rint(scaled) / 100
+    with np.errstate(invalid="ignore"):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        out[near_tie] = [round2(v) for v in values[near_tie].tolist()]
+    return out
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _column(rows: Sequence[dict], key: str) -> np.ndarray:
+    return np.fromiter((row[key] for row in rows), dtype=np.float64, count=len(rows))
+
+
+def _energy(inputs: Sequence[dict]) -> dict[str, np.ndarray]:
+    """calculate_energy over columns."""
+    daily_generation = _column(inputs, "arrayKw") * _column(inputs, "peakSunHours") * _column(inputs, "systemEfficiency")
+    monthly_demand = _column(inputs, "monthlyDemandKwh")
+    daily_demand = monthly_demand / 30
+    daily_daytime_demand = daily_demand * _column(inputs, "daytimeDemandFraction")
+    daily_night_demand = daily_demand - daily_daytime_demand
+    direct_daily = np.minimum(daily_generation, daily_daytime_demand)
+    excess_daily = np.maximum(0, daily_generation - direct_daily)
+    usable_battery = _column(inputs, "batteryKwh") * _column(inputs, "batteryDepthOfDischarge")
+    charged_daily = np.minimum(excess_daily, usable_battery)
+    battery_used_daily = np.minimum(charged_daily * _column(inputs, "batteryRoundTripEfficiency"), daily_night_demand)
+
+    e_gen = _round2(daily_generation * 30)
+    e_direct = _round2(direct_daily * 30)
+    e_charge = _round2(charged_daily * 30)
+    e_battery_used = _round2(battery_used_daily * 30)
+    e_sold = _round2(np.minimum(np.minimum(_round2(e_direct + e_battery_used), monthly_demand), e_gen))
+    e_waste = _round2(np.maximum(0, e_gen - e_direct - e_charge))
+    return {
+        "E_gen": e_gen,
+        "E_direct": e_direct,
+        "E_charge": e_charge,
+        "E_battery_used": e_battery_used,
+        "E_sold": e_sold,
+        "E_waste": e_waste,
+        "E_grid": _round2(np.maximum(0, monthly_demand - e_sold)),
+        "utilization": _round2(_ratio(e_sold, e_gen)),
+        "wasteRate": _round2(_ratio(e_waste, e_gen)),
+        "coverage": _round2(_ratio(e_sold, monthly_demand)),
+    }
+
+
+def _settlement(projects: Sequence[dict], e_sold: np.ndarray) -> dict:
+    """calculate_settlement over columns, plus the per-building savings and prepaid coverage."""
+    price = _column(projects, "solarPriceKes")
+    rates = [p["settlementRates"] for p in projects]
+    revenue = _round2(e_sold * price)
+    shares = {
+        key: revenue * _column(rates, rate)
+        for key, rate in (
+            ("reserve", "reserve"),
+            ("providerPool", "providers"),
+            ("financierPool", "financiers"),
+            ("ownerRoyalty", "owner"),
+            ("emappaFee", "emappa"),
+        )
+    }
+    allocated = sum(shares.values())
+    scale = np.where((allocated > revenue) & (allocated > 0), _ratio(revenue, allocated), 1.0)
+    out = {"revenue": revenue}
+    out.update({key: _round2(share * scale) for key, share in shares.items()})
+    allocated_total = _round2(sum(out[key] for key in shares))
+    out["unallocated"] = _round2(revenue - allocated_total)
+    out["allocatedTotal"] = allocated_total
+    out["shortfallKes"] = _round2(np.maximum(0.0, allocated - revenue))
+    out["phase"] = [p.get("settlementPhase") or "recovery" for p in projects]
+    out["savingsKes"] = _round2(np.maximum(0, (_column(projects, "gridPriceKes") - price) * e_sold))
+    out["prepaidCoverage"] = np.minimum(1, _ratio(_column(projects, "prepaidCommittedKes"), revenue))
+    return out
+
+
+def _payback(projects: Sequence[dict], monthly_payout: np.ndarray) -> dict[str, np.ndarray]:
+    """calculate_payback over columns; non-recovering buildings get inf."""
+    investment = np.maximum(_column(projects, "fundedKes"), 1)
+    recovering = monthly_payout > 0
+    principal = np.divide(investment, monthly_payout, out=np.full_like(investment, np.inf), where=recovering)
+    target = principal * PAYBACK_TARGET_MULTIPLE
+    return {
+        "principalMonths": _round2(principal),
+        "targetMonths": _round2(target),
+        "yearsToPrincipal": _round2(principal / 12),
+        "yearsToTarget": _round2(target / 12),
+        "notCurrentlyRecovering": ~recovering,
+    }
+
+
+def _drs(projects: Sequence[dict], utilization: np.ndarray, prepaid_coverage: np.ndarray) -> dict:
+    demand_coverage = np.minimum(100, utilization * 100)
+    prepaid_commitment = np.minimum(100, prepaid_coverage * 100)
+    homeowner = np.fromiter((p.get("buildingKind") in _HOMEOWNER_KINDS for p in projects), dtype=bool, count=len(projects))
+    batch = evaluate_drs(
+        [project["drs"] for project in projects],
+        columns={
+            "siteKind": np.where(homeowner, "homeowner", "apartment"),
+            "demandCoverage": demand_coverage,
+            "prepaidCommitment": prepaid_commitment,
+            "projectedUtilization": utilization,
+        },
+    )
+    decisions = batch.decisions
+    return {
+        "score": batch.score,
+        "decision": decisions,
+        "label": [get_drs_label(d) for d in decisions],
+        "demandCoverage": batch.components["demandCoverage"],
+        "prepaidCommitment": batch.components["prepaidCommitment"],
+        "reasons": batch.reasons,
+    }
+
+
+def project_portfolio(projects: Sequence[dict], fields: Iterable[str] = PORTFOLIO_FIELDS) -> dict:
+    """Project many buildings at once; returns {"ids": [...], <field>: {column: values}} for each requested field."""
+    wanted = set(fields)
+    unknown = wanted - set(PORTFOLIO_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown portfolio fields: {sorted(unknown)}")
+
+    energy = _energy([p["energy"] for p in projects])
+    result: dict = {"ids": [p["id"] for p in projects]}
+    if "energy" in wanted:
+        result["energy"] = energy
+    if wanted & {"settlement", "drs", "payback"}:
+        settlement = _settlement(projects, energy["E_sold"])
+        if "settlement" in wanted:
+            result["settlement"] = settlement
+        if "payback" in wanted:
+            result["payback"] = _payback(projects, settlement["financierPool"])
+        if "drs" in wanted:
+            result["drs"] = _drs(projects, energy["utilization"], settlement["prepaidCoverage"])
+    return result
+
+
+def portfolio_row(portfolio: dict, index: int) -> dict:
+    """One building's slice of a project_portfolio result as plain Python values."""
+    row: dict = {"id": portfolio["ids"][index]}
+    for field in PORTFOLIO_FIELDS:
+        if field in portfolio:
+            row[field] = {
+                key: values[index].item() if isinstance(values, np.ndarray) else values[index]
+                for key, values in portfolio[field].items()
+            }
+    return row
@@ -0,0 +1,106 @@
+"""Projection cache — memoized GET /drs/{building_id} payloads per building.
+
+The snapshot store (drs_store.py) keeps each building's DRS inputs and rule
+outcome in drs_snapshots; serving it still means rebuilding the messages and
+checklist from the rule tables. Entries here are keyed by building id and
+fingerprinted by the snapshot's (source_key, version), so a pledge, roof or
+stage write, or a gate update committed by another worker process, is a miss
+and never a stale hit. Writers in this process also invalidate explicitly so
+memory is released right away.
+
+Eviction is LRU, bounded by max_entries, plus a TTL. The cache is per process
+and not shared between workers. Besides hits and misses it counts snapshot
+refreshes: reads whose stored inputs were stale and had to be re-derived.
+"""
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from ..config import get_settings
+
+
+@dataclass
+class _Entry:
+    fingerprint: Hashable
+    expires_at: float
+    value: dict[str, Any]
+
+
+class ProjectionCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[uuid.UUID, _Entry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.refreshes = 0
+
+    def get_or_compute(
+        self,
+        building_id: uuid.UUID,
+        fingerprint: Hashable,
+        compute: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Cached projection for building_id, or compute() when absent, expired or stale.
+
+        The returned dict is shared; callers must not mutate it.
+        """
+        now = self._clock()
+        entry = self._entries.get(building_id)
+        if entry is not None and entry.fingerprint == fingerprint and entry.expires_at > now:
+            self._entries.move_to_end(building_id)
+            self.hits += 1
+            return entry.value
+
+        self.misses += 1
+        value = compute()
+        self._entries[building_id] = _Entry(fingerprint, now + self.ttl_seconds, value)
+        self._entries.move_to_end(building_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def invalidate(self, building_id: uuid.UUID) -> None:
+        if self._entries.pop(building_id, None) is not None:
+            self.invalidations += 1
+
+    def record_refresh(self) -> None:
+        self.refreshes += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "refreshes": self.refreshes,
+        }
+
+
+projection_cache = ProjectionCache(
+    max_entries=get_settings().projection_cache_max_entries,
+    ttl_seconds=get_settings().projection_cache_ttl_seconds,
+)
@@ -1,42 +1,23 @@
 from .drs import calculate_drs, get_drs_label
 from .energy import calculate_energy, calculate_savings
-from .lbrs import calculate_lbrs, get_lbrs_label
+from .lbrs import calculate_lbrs, default_lbrs_input, get_lbrs_label
 from .ownership import calculate_ownership_payouts
 from .payback import calculate_payback
 from .settlement import calculate_settlement
 
 
-def _default_lbrs(project: dict) -> dict:
-    if project.get("lbrs"):
-        return project["lbrs"]
-    live = project.get("stage") == "live"
-    bk = project.get("buildingKind")
-    site_kind = "homeowner" if bk in ("single_family", "small_compound") else "apartment"
-    return {
-        "siteKind": site_kind,
-        "asBuiltBomVerified": live,
-        "electricalSafetyComplete": live,
-        "solarBusIsolationVerified": live,
-        "inverterBatteryTestsComplete": live,
-        "atsSwitchingPerApartmentComplete": live,
-        "homeSwitchingFallbackComplete": live,
-        "meterMappingDataReliable": live,
-        "tokenSettlementDryRunPassed": live,
-        "backendTokenControlDryRunPassed": live,
-        "residentOwnerLaunchReadinessComplete": live,
-    }
+def _settle(project: dict, energy: dict) -> dict:
+    settlement_phase = project.get("settlementPhase") or "recovery"
+    return calculate_settlement(energy["E_sold"], project["solarPriceKes"], project["settlementRates"], settlement_phase)
 
 
-def project_building(project: dict) -> dict:
-    energy = calculate_energy(project["energy"])
-    settlement_phase = project.get("settlementPhase") or "recovery"
-    settlement = calculate_settlement(energy["E_sold"], project["solarPriceKes"], project["settlementRates"], settlement_phase)
+def _drs_input(project: dict, energy: dict, settlement: dict) -> dict:
     prepaid_months_covered = project["prepaidCommittedKes"] / settlement["revenue"] if settlement["revenue"] > 0 else 0
     prepaid_coverage = min(1, prepaid_months_covered)
     drs = project["drs"]
     bk = project.get("buildingKind")
     site_kind = "homeowner" if bk in ("single_family", "small_compound") else "apartment"
-    drs_input = {
+    return {
         **drs,
         "siteKind": site_kind,
         "demandCoverage": min(100, energy["utilization"] * 100),
@@ -44,8 +25,23 @@ def project_building(project: dict) -> dict:
         "projectedUtilization": energy["utilization"],
         "hasResidentDemandSignal": drs.get("hasResidentDemandSignal", drs.get("hasPrepaidFunds")),
     }
-    drs_out = calculate_drs(drs_input)
-    lbrs = calculate_lbrs(_default_lbrs(project))
+
+
+def project_drs_input(project: dict) -> dict:
+    """The calculate_drs input project_building derives, without the rest of the projection."""
+    energy = calculate_energy(project["energy"])
+    return _drs_input(project, energy, _settle(project, energy))
+
+
+def project_building(project: dict) -> dict:
+    energy = calculate_energy(project["energy"])
+    settlement = _settle(project, energy)
+    prepaid_months_covered = project["prepaidCommittedKes"] / settlement["revenue"] if settlement["revenue"] > 0 else 0
+    prepaid_coverage = min(1, prepaid_months_covered)
+    drs = project["drs"]
+    bk = project.get("buildingKind")
+    drs_out = calculate_drs(_drs_input(project, energy, settlement))
+    lbrs = calculate_lbrs(default_lbrs_input(project))
     provider_payouts = calculate_ownership_payouts(settlement["providerPool"], project["providerOwnership"])
     financier_payouts = calculate_ownership_payouts(settlement["financierPool"], project["financierOwnership"])
     savings_kes = calculate_savings(energy["E_sold"], project["gridPriceKes"], project["solarPriceKes"])
@@ -0,0 +1,372 @@
+"""Rule tables — the predicate model shared by the DRS gates (drs.py) and the
+LBRS go-live tests (lbrs.py).
+
+A rule's condition is a small predicate tree (Flag, Number, All, Any, ...)
+that encodes the input fallbacks. Every predicate compiles two ways:
+
+* ``scalar(inp)`` — plain Python on one input dict;
+* ``column(cols)`` — a NumPy boolean/float mask over a batch held in Columns.
+
+Each predicate also knows the input ``keys`` it reads, so callers can
+re-evaluate only the rules a changed key touches. Gate, ChecklistItem,
+WarningRule and RuleTable group predicates into the tables drs.py and lbrs.py
+declare; decision maps blocked/warned to the shared decision codes and
+round1/round1_array round scores the same way on both paths.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from functools import cached_property
+
+import numpy as np
+
+
+def clamp_score(value: float) -> float:
+    return max(0.0, min(100.0, float(value)))
+
+
+def round1(value: float) -> float:
+    return round(value + 1e-12, 1)
+
+
+def round1_array(values: np.ndarray) -> np.ndarray:
+    """round1 element-wise. np.rint is exact away from .x5 ties; near-ties go through round()."""
+    scaled = (values + 1e-12) * 10
+    out = np.rint(scaled) / 10
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        out[near_tie] = [round1(v) for v in values[near_tie].tolist()]
+    return out
+
+
+class _Missing:
+    """Marks an absent key in a batch column; falsy like ``dict.get`` returning None."""
+
+    def __bool__(self) -> bool:
+        return False
+
+
+MISSING = _Missing()
+
+
+def decision(blocked: bool, warned: bool) -> str:
+    if blocked:
+        return "blocked"
+    if warned:
+        return "review"
+    return "deployment_ready"
+
+
+class Columns:
+    """Input batch as lazily extracted per-key columns, with predicate results memoized."""
+
+    def __init__(self, rows: Sequence[dict], overrides: Mapping[str, Sequence] | None = None) -> None:
+        self.rows = rows
+        self._raw: dict[str, np.ndarray] = {key: np.asarray(values) for key, values in (overrides or {}).items()}
+        self.n = len(rows) if rows or not self._raw else len(next(iter(self._raw.values())))
+        if any(len(values) != self.n for values in self._raw.values()):
+            raise ValueError("columns must all have one value per building")
+        self._memo: dict[object, np.ndarray] = {}
+
+    def raw(self, key: str) -> np.ndarray:
+        """Values for ``key``; object dtype (absent → MISSING) unless supplied as a column."""
+        values = self._raw.get(key)
+        if values is None:
+            if self.rows:
+                values = np.fromiter((row.get(key, MISSING) for row in self.rows), dtype=object, count=self.n)
+            else:
+                values = np.full(self.n, MISSING, dtype=object)
+            self._raw[key] = values
+        return values
+
+    def eval(self, predicate: Predicate) -> np.ndarray:
+        out = self._memo.get(predicate)
+        if out is None:
+            out = self._memo[predicate] = predicate.column(self)
+        return out
+
+
+class Predicate:
+    @cached_property
+    def scalar(self) -> Callable[[dict], object]:
+        """This rule as a closure over one input dict, built on first use."""
+        return self._compile()
+
+    @cached_property
+    def keys(self) -> frozenset[str]:
+        """Input keys this rule reads, fallbacks included."""
+        return frozenset(self._keys())
+
+    def _compile(self) -> Callable[[dict], object]:
+        raise NotImplementedError
+
+    def _keys(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def column(self, cols: Columns) -> np.ndarray:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class Flag(Predicate):
+    """``bool(inp.get(key, default))``; when the key is absent (or None with
+    ``none_is_missing``) and a ``fallback`` is given, that predicate decides instead."""
+
+    key: str
+    default: bool = False
+    fallback: Predicate | None = None
+    none_is_missing: bool = False
+
+    def _compile(self) -> Callable[[dict], bool]:
+        key, default, none_is_missing = self.key, self.default, self.none_is_missing
+        if self.fallback is None and not none_is_missing:
+            return lambda inp: bool(inp.get(key, default))
+        fallback = self.fallback.scalar if self.fallback is not None else (lambda inp: default)
+
+        def flag(inp: dict) -> bool:
+            value = inp.get(key, MISSING)
+            if value is MISSING or (none_is_missing and value is None):
+                return fallback(inp)
+            return bool(value)
+
+        return flag
+
+    def _keys(self) -> Iterable[str]:
+        return {self.key} | (self.fallback.keys if self.fallback is not None else set())
+
+    def column(self, cols: Columns) -> np.ndarray:
+        raw = cols.raw(self.key)
+        if raw.dtype != object:
+            return raw.astype(bool)
+        missing = raw == MISSING
+        if self.none_is_missing:
+            missing |= np.equal(raw, None)
+        if not missing.any():
+            return raw.astype(bool)
+        out = np.array(cols.eval(self.fallback)) if self.fallback is not None else np.full(cols.n, self.default)
+        present = ~missing
+        out[present] = raw[present].astype(bool)
+        return out
+
+
+@dataclass(frozen=True)
+class NotFalse(Predicate):
+    """``inp.get(key) is not False`` — absent and None both count as complete."""
+
+    key: str
+
+    def _compile(self) -> Callable[[dict], bool]:
+        key = self.key
+        return lambda inp: inp.get(key) is not False
+
+    def _keys(self) -> Iterable[str]:
+        return (self.key,)
+
+    def column(self, cols: Columns) -> np.ndarray:
+        raw = cols.raw(self.key)
+        if raw.dtype == bool:
+            return raw
+        out = np.ones(cols.n, dtype=bool)
+        if raw.dtype == object:
+            present = np.flatnonzero(raw != MISSING)
+            out[present] = np.fromiter((value is not False for value in raw[present]), dtype=bool, count=present.size)
+        return out
+
+
+@dataclass(frozen=True)
+class Number(Predicate):
+    """``float(inp.get(key, default))`` with an optional fallback key and 0–100 clamp."""
+
+    key: str
+    default: float = 0
+    fallback: Number | None = None
+    clamp: bool = False
+
+    def _compile(self) -> Callable[[dict], float]:
+        key, default = self.key, self.default
+        if self.fallback is None:
+            get = lambda inp: inp.get(key, default)  # noqa: E731
+        else:
+            fallback = self.fallback.scalar
+
+            def get(inp: dict):
+                value = inp.get(key, MISSING)
+                return fallback(inp) if value is MISSING else value
+
+        if not self.clamp:
+            return lambda inp: float(get(inp))
+
+        def clamped(inp: dict) -> float:
+            # clamp_score inlined: max(0.0, min(100.0, value))
+            value = float(get(inp))
+            value = value if value < 100.0 else 100.0
+            return value if value > 0.0 else 0.0
+
+        return clamped
+
+    def _keys(self) -> Iterable[str]:
+        return {self.key} | (self.fallback.keys if self.fallback is not None else set())
+
+    def column(self, cols: Columns) -> np.ndarray:
+        raw = cols.raw(self.key)
+        if raw.dtype == object:
+            missing = raw == MISSING
+            if missing.any():
+                fill = cols.eval(self.fallback) if self.fallback is not None else self.default
+                raw = np.where(missing, fill, raw)
+        values = raw.astype(np.float64)
+        if not self.clamp:
+            return values
+        # Same as clamp_score element-wise, NaN → 100 included.
+        return np.where(values < 100.0, np.where(values > 0.0, values, 0.0), 100.0)
+
+
+@dataclass(frozen=True)
+class Below(Predicate):
+    value: Number
+    threshold: float
+
+    def _compile(self) -> Callable[[dict], bool]:
+        value, threshold = self.value.scalar, self.threshold
+        return lambda inp: value(inp) < threshold
+
+    def _keys(self) -> Iterable[str]:
+        return self.value.keys
+
+    def column(self, cols: Columns) -> np.ndarray:
+        return cols.eval(self.value) < self.threshold
+
+
+@dataclass(frozen=True)
+class AtLeast(Predicate):
+    value: Number
+    threshold: float
+
+    def _compile(self) -> Callable[[dict], bool]:
+        value, threshold = self.value.scalar, self.threshold
+        return lambda inp: value(inp) >= threshold
+
+    def _keys(self) -> Iterable[str]:
+        return self.value.keys
+
+    def column(self, cols: Columns) -> np.ndarray:
+        return cols.eval(self.value) >= self.threshold
+
+
+@dataclass(frozen=True)
+class Not(Predicate):
+    term: Predicate
+
+    def _compile(self) -> Callable[[dict], bool]:
+        term = self.term.scalar
+        return lambda inp: not term(inp)
+
+    def _keys(self) -> Iterable[str]:
+        return self.term.keys
+
+    def column(self, cols: Columns) -> np.ndarray:
+        return ~cols.eval(self.term)
+
+
+@dataclass(frozen=True)
+class All(Predicate):
+    terms: tuple[Predicate, ...]
+
+    def __init__(self, *terms: Predicate) -> None:
+        object.__setattr__(self, "terms", terms)
+
+    def _compile(self) -> Callable[[dict], bool]:
+        terms = [term.scalar for term in self.terms]
+
+        def all_of(inp: dict) -> bool:
+            for term in terms:
+                if not term(inp):
+                    return False
+            return True
+
+        return all_of
+
+    def _keys(self) -> Iterable[str]:
+        return frozenset().union(*(term.keys for term in self.terms))
+
+    def column(self, cols: Columns) -> np.ndarray:
+        return np.logical_and.reduce([cols.eval(term) for term in self.terms])
+
+
+@dataclass(frozen=True)
+class Any(Predicate):
+    terms: tuple[Predicate, ...]
+
+    def __init__(self, *terms: Predicate) -> None:
+        object.__setattr__(self, "terms", terms)
+
+    def _compile(self) -> Callable[[dict], bool]:
+        terms = [term.scalar for term in self.terms]
+
+        def any_of(inp: dict) -> bool:
+            for term in terms:
+                if term(inp):
+                    return True
+            return False
+
+        return any_of
+
+    def _keys(self) -> Iterable[str]:
+        return frozenset().union(*(term.keys for term in self.terms))
+
+    def column(self, cols: Columns) -> np.ndarray:
+        return np.logical_or.reduce([cols.eval(term) for term in self.terms])
+
+
+@dataclass(frozen=True)
+class Gate:
+    """Critical gate: a failure is reported wherever ``passes`` is false."""
+
+    code: str
+    message: str
+    responsible_role: str
+    passes: Predicate
+
+    def failure(self) -> dict:
+        return {"code": self.code, "message": self.message, "responsibleRole": self.responsible_role}
+
+
+@dataclass(frozen=True)
+class ChecklistItem:
+    id: str
+    category: str
+    display_weight: int
+    critical: bool
+    label: str
+    complete: Predicate
+
+    def entry(self, complete: bool) -> dict:
+        return {
+            "id": self.id,
+            "category": self.category,
+            "displayWeight": self.display_weight,
+            "critical": self.critical,
+            "complete": complete,
+            "label": self.label,
+        }
+
+
+@dataclass(frozen=True)
+class WarningRule:
+    message: str
+    applies: Predicate
+
+
+@dataclass(frozen=True, eq=False)
+class RuleTable:
+    gates: tuple[Gate, ...]
+    checklist: tuple[ChecklistItem, ...]
+
+    @cached_property
+    def gate_checks(self) -> tuple[Callable[[dict], bool], ...]:
+        return tuple(gate.passes.scalar for gate in self.gates)
+
+    @cached_property
+    def checklist_checks(self) -> tuple[Callable[[dict], bool], ...]:
+        return tuple(item.complete.scalar for item in self.checklist)
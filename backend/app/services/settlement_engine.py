@@ -0,0 +1,262 @@
+"""Settlement engine — settles a building for one period from its metered energy.
+
+A run is a pure function of three things: the period's readings, the
+building's settlement terms and its stakeholders.
+  1. energy: repos.energy.period_energy aggregates energy_readings over exactly
+     [period_start, period_end) — E_sold is solar consumed in the hour it was
+     produced;
+  2. money: calculate_settlement applies the project's settlementRates and
+     phase to E_sold × solarPriceKes;
+  3. period: the settlement_periods row is upserted on (building, window), so
+     re-running a period rewrites it in place and keeps its id. A window that
+     overlaps a different stored window of the building is rejected
+     (period_overlaps): it would monetize the same readings twice. The check
+     runs under a per-building advisory lock;
+  4. ledger: stakeholder payouts are posted to wallet_transactions under
+     ``settlement:<period id>``. The ledger is append-only: a re-run reads what
+     is already posted for the reference and appends only the differences
+     (one bulk INSERT), so the sum per stakeholder always equals the latest
+     run and an unchanged re-run writes nothing.
+
+Stakeholders with accounts: financiers (FinancierPosition, pro rata to
+committed capital) share the financier pool as ``capital_return``; the
+building's owner/homeowner accounts share the owner royalty as ``royalty``.
+Provider, reserve and e.mappa amounts are recorded on the period only.
+"""
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime
+from decimal import ROUND_DOWN, Decimal
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.building import Building
+from ..models.settlement import SettlementPeriod
+from ..repos import energy as energy_repo
+from ..repos import financiers as financiers_repo
+from ..repos import settlement as settlement_repo
+from ..repos import users as users_repo
+from ..repos import wallet as wallet_repo
+from .building_drs import resolve_project_dict_for_drs
+from .energy import round2
+from .settlement import calculate_settlement, validate_settlement_rates
+
+PAYOUT_POOLS = (
+    ("reserve", "reserve"),
+    ("provider", "providerPool"),
+    ("financier", "financierPool"),
+    ("owner", "ownerRoyalty"),
+    ("emappa", "emappaFee"),
+)
+OWNER_ROLES = ("building_owner", "homeowner")
+_CENT = Decimal("0.01")
+
+
+class SettlementError(Exception):
+    """A period that cannot be settled; ``code`` is the API error detail."""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+def ledger_reference(period_id: uuid.UUID) -> str:
+    return f"settlement:{period_id}"
+
+
+def _kes(value: float) -> Decimal:
+    return Decimal(str(round2(value)))
+
+
+def settlement_terms(building: Building, checked: dict[tuple, bool] | None = None) -> dict[str, Any]:
+    """Price, rates and phase for the building; raises if the rates do not balance.
+
+    ``checked`` memoises the balance check per distinct rate set across a batch.
+    """
+    # Settlement reads only the commercial terms, not the pledge-derived fields.
+    project = resolve_project_dict_for_drs(building, 0.0)
+    rates = project["settlementRates"]
+    key = tuple(sorted(rates.items()))
+    if checked is None or key not in checked:
+        balanced = validate_settlement_rates(rates)["isBalanced"]
+        if checked is not None:
+            checked[key] = balanced
+    else:
+        balanced = checked[key]
+    if not balanced:
+        raise SettlementError("unbalanced_settlement_rates")
+    return {
+        "solarPriceKes": project["solarPriceKes"],
+        "settlementRates": project["settlementRates"],
+        "settlementPhase": project.get("settlementPhase") or "recovery",
+    }
+
+
+def settle_energy(terms: Mapping[str, Any], energy: Mapping[str, Any]) -> dict:
+    """calculate_settlement for the period's metered E_sold."""
+    return calculate_settlement(
+        round2(energy["E_sold"]), terms["solarPriceKes"], terms["settlementRates"], terms["settlementPhase"]
+    )
+
+
+def split_pool(amount: Decimal, weights: Sequence[tuple[uuid.UUID, Decimal]]) -> list[tuple[uuid.UUID, Decimal]]:
+    """``amount`` pro rata to ``weights`` in whole cents; leftover cents go to the largest remainders."""
+    total = sum((w for _, w in weights), Decimal(0))
+    if amount <= 0 or total <= 0:
+        return []
+    exact = [(user_id, amount * w / total) for user_id, w in weights]
+    shares = [share.quantize(_CENT, rounding=ROUND_DOWN) for _, share in exact]
+    leftover = int((amount.quantize(_CENT) - sum(shares)) / _CENT)
+    by_remainder = sorted(range(len(exact)), key=lambda i: exact[i][1] - shares[i], reverse=True)
+    for i in by_remainder[:leftover]:
+        shares[i] += _CENT
+    return [(user_id, share) for (user_id, _), share in zip(exact, shares) if share > 0]
+
+
+def stakeholder_payouts(
+    settlement: Mapping[str, Any],
+    financiers: Sequence[tuple[uuid.UUID, Decimal]],
+    owners: Sequence[uuid.UUID],
+) -> list[dict[str, Any]]:
+    """Per-account payouts: financier pool by committed capital, owner royalty split evenly."""
+    payouts = [
+        {"userId": user_id, "role": "financier", "kind": "capital_return", "amountKes": amount}
+        for user_id, amount in split_pool(_kes(settlement["financierPool"]), financiers)
+    ]
+    payouts += [
+        {"userId": user_id, "role": "owner", "kind": "royalty", "amountKes": amount}
+        for user_id, amount in split_pool(_kes(settlement["ownerRoyalty"]), [(u, Decimal(1)) for u in owners])
+    ]
+    return payouts
+
+
+def ledger_rows(
+    reference: str,
+    payouts: Iterable[Mapping[str, Any]],
+    posted: Mapping[tuple[str, uuid.UUID, str], Decimal],
+) -> list[dict[str, Any]]:
+    """wallet_transactions rows that bring what is posted under ``reference`` to ``payouts``."""
+    target: dict[tuple[uuid.UUID, str], Decimal] = {}
+    for payout in payouts:
+        key = (payout["userId"], payout["kind"])
+        target[key] = target.get(key, Decimal(0)) + payout["amountKes"]
+    for (ref, user_id, kind) in posted:
+        if ref == reference:
+            target.setdefault((user_id, kind), Decimal(0))
+    rows = []
+    for (user_id, kind), amount in target.items():
+        delta = amount - posted.get((reference, user_id, kind), Decimal(0))
+        if delta:
+            rows.append({"user_id": user_id, "kind": kind, "amount_kes": delta, "reference": reference})
+    return rows
+
+
+def _payouts_json(settlement: Mapping[str, Any], payouts: Sequence[Mapping[str, Any]]) -> dict[str, Any]:
+    return {
+        **{key: settlement[pool] for key, pool in PAYOUT_POOLS},
+        "unallocated": settlement["unallocated"],
+        "shortfallKes": settlement["shortfallKes"],
+        "phase": settlement["phase"],
+        "stakeholders": [
+            {"userId": str(p["userId"]), "role": p["role"], "amountKes": float(p["amountKes"])} for p in payouts
+        ],
+    }
+
+
+async def stakeholders(
+    session: AsyncSession, building_ids: Sequence[uuid.UUID]
+) -> dict[uuid.UUID, dict[str, list]]:
+    """Financier weights and owner accounts per building, two queries for all of them."""
+    out: dict[uuid.UUID, dict[str, list]] = {bid: {"financiers": [], "owners": []} for bid in building_ids}
+    for position in await financiers_repo.list_for_buildings(session, building_ids):
+        out[position.building_id]["financiers"].append((position.financier_user_id, Decimal(position.committed_kes)))
+    for user in await users_repo.list_for_buildings(session, building_ids, roles=OWNER_ROLES):
+        out[user.building_id]["owners"].append(user.id)
+    return out
+
+
+async def claim_window(
+    session: AsyncSession, building_id: uuid.UUID, period_start: datetime, period_end: datetime
+) -> None:
+    """Raise period_overlaps unless the window is new or exactly an existing one.
+
+    Callers hold repos.settlement.lock_periods for the building.
+    """
+    if await settlement_repo.find_overlapping(
+        session, building_id, period_start=period_start, period_end=period_end
+    ):
+        raise SettlementError("period_overlaps")
+
+
+async def record_period(
+    session: AsyncSession,
+    *,
+    building_id: uuid.UUID,
+    period_start: datetime,
+    period_end: datetime,
+    energy: Mapping[str, Any],
+    settlement: Mapping[str, Any],
+    payouts: Sequence[Mapping[str, Any]],
+) -> SettlementPeriod:
+    """Upsert the period row; the ledger is posted separately by post_ledger."""
+    return await settlement_repo.upsert_period(
+        session,
+        building_id=building_id,
+        period_start=period_start,
+        period_end=period_end,
+        e_gen=_kes(energy["E_gen"]),
+        e_sold=_kes(energy["E_sold"]),
+        e_waste=_kes(energy["E_waste"]),
+        revenue_kes=_kes(settlement["revenue"]),
+        payouts=_payouts_json(settlement, payouts),
+        simulation=True,
+        data_source=energy["dataSource"],
+    )
+
+
+async def post_ledger(
+    session: AsyncSession, settled: Sequence[tuple[uuid.UUID, Sequence[Mapping[str, Any]]]]
+) -> int:
+    """Bring the ledger of each (period id, payouts) up to date: one read, one bulk INSERT."""
+    references = [ledger_reference(period_id) for period_id, _ in settled]
+    posted = await wallet_repo.totals_by_reference(session, references)
+    rows = [
+        row
+        for reference, (_, payouts) in zip(references, settled)
+        for row in ledger_rows(reference, payouts, posted)
+    ]
+    return await wallet_repo.record_many(session, rows)
+
+
+async def settle_period(
+    session: AsyncSession, building: Building, period_start: datetime, period_end: datetime
+) -> SettlementPeriod:
+    """Settle one building for [period_start, period_end). Flushes; the caller commits."""
+    period_start, period_end = energy_repo.as_utc(period_start), energy_repo.as_utc(period_end)
+    if period_end <= period_start:
+        raise SettlementError("invalid_period")
+    await settlement_repo.lock_periods(session, [building.id])
+    await claim_window(session, building.id, period_start, period_end)
+    energy = (await energy_repo.period_energy(session, [building.id], start=period_start, end=period_end)).get(
+        building.id
+    )
+    if energy is None or energy["E_gen"] <= 0:
+        raise SettlementError("no_readings_in_period")
+
+    settlement = settle_energy(settlement_terms(building), energy)
+    holders = (await stakeholders(session, [building.id]))[building.id]
+    payouts = stakeholder_payouts(settlement, holders["financiers"], holders["owners"])
+    period = await record_period(
+        session,
+        building_id=building.id,
+        period_start=period_start,
+        period_end=period_end,
+        energy=energy,
+        settlement=settlement,
+        payouts=payouts,
+    )
+    await post_ledger(session, [(period.id, payouts)])
+    return period
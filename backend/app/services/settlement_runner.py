@@ -1,26 +1,202 @@
-from datetime import datetime, timezone
-from .energy import calculate_energy
-from .ownership import calculate_ownership_payouts
-from .settlement import calculate_settlement, validate_settlement_rates
-
-
-def run_settlement(store, building_id: str, period_start, period_end) -> dict:
-    project = store.get_project(building_id)
-    if project is None:
-        raise KeyError(building_id)
-    if project["stage"] != "live":
-        raise ValueError("Settlement can only run for live buildings")
-    if project["prepaidCommittedKes"] <= 0:
-        raise ValueError("No prepaid balance available for settlement")
-    if not validate_settlement_rates(project["settlementRates"])["isBalanced"]:
-        raise ValueError("Settlement rates must sum to 1.0")
-    energy = calculate_energy(project["energy"])
-    settlement = calculate_settlement(
-        energy["E_sold"],
-        project["solarPriceKes"],
-        project["settlementRates"],
-        project.get("settlementPhase") or "recovery",
+"""Portfolio settlement runner — settles every live building for one period.
+
+The month-end job behind POST /settlement/run-all and scripts/settle_portfolio.
+Buildings are cut into shards of ``shard_size``; at most ``workers`` shards
+run at once, each in its own session and transaction:
+  1. the shard's per-building period locks, then one period_energy query for
+     the whole shard (repos/energy);
+  2. one stakeholder lookup for the whole shard (financiers + owner accounts);
+  3. per building: calculate_settlement on the pre-resolved terms and an
+     upsert of its settlement_periods row;
+  4. one ledger read and one bulk INSERT for the shard, then commit.
+Terms (price, rates, phase) are resolved once per building before sharding
+and the rate balance check runs once per distinct rate set.
+
+A building that cannot be settled (no readings, unbalanced rates, a window
+overlapping one of its stored periods) is reported as failed and the rest of
+its shard carries on; an unexpected error rolls back its shard only, is logged
+with its traceback and reported as "<ExceptionType>: <message>" for each of
+the shard's buildings, with ``seconds`` null since none of them finished on
+its own. Runs are idempotent per period like settle_period.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import get_settings
+from ..db.session import SessionLocal
+from ..repos import buildings as buildings_repo
+from ..repos import energy as energy_repo
+from ..repos import settlement as settlement_repo
+from .energy import round2
+from .settlement_engine import (
+    SettlementError,
+    claim_window,
+    post_ledger,
+    record_period,
+    settle_energy,
+    settlement_terms,
+    stakeholder_payouts,
+    stakeholders,
+)
+
+logger = logging.getLogger(__name__)
+
+RUN_STAGES = ("live",)
+
+
+def _entry(building_id: uuid.UUID, started: float | None, **fields: Any) -> dict[str, Any]:
+    """One report row; ``started`` None means no per-building time (seconds is null)."""
+    return {
+        "buildingId": str(building_id),
+        "periodId": None,
+        "revenueKes": 0.0,
+        "error": None,
+        **fields,
+        "seconds": None if started is None else round(time.perf_counter() - started, 4),
+    }
+
+
+async def _settle_shard(
+    session_factory: async_sessionmaker[AsyncSession],
+    slots: asyncio.Semaphore,
+    index: int,
+    shard: Sequence[tuple[uuid.UUID, dict[str, Any]]],
+    period_start: datetime,
+    period_end: datetime,
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    async with slots, session_factory() as session:
+        started = time.perf_counter()
+        ids = [building_id for building_id, _ in shard]
+        results: list[dict[str, Any]] = []
+        settled: list[tuple[uuid.UUID, list[dict[str, Any]]]] = []
+        try:
+            await settlement_repo.lock_periods(session, ids)
+            energy = await energy_repo.period_energy(session, ids, start=period_start, end=period_end)
+            holders = await stakeholders(session, ids)
+            query_seconds = time.perf_counter() - started
+            for building_id, terms in shard:
+                building_started = time.perf_counter()
+                try:
+                    await claim_window(session, building_id, period_start, period_end)
+                except SettlementError as exc:
+                    results.append(_entry(building_id, building_started, status="failed", error=exc.code))
+                    continue
+                period_energy = energy.get(building_id)
+                if period_energy is None or period_energy["E_gen"] <= 0:
+                    results.append(_entry(building_id, building_started, status="failed", error="no_readings_in_period"))
+                    continue
+                settlement = settle_energy(terms, period_energy)
+                payouts = stakeholder_payouts(
+                    settlement, holders[building_id]["financiers"], holders[building_id]["owners"]
+                )
+                period = await record_period(
+                    session,
+                    building_id=building_id,
+                    period_start=period_start,
+                    period_end=period_end,
+                    energy=period_energy,
+                    settlement=settlement,
+                    payouts=payouts,
+                )
+                settled.append((period.id, payouts))
+                results.append(
+                    _entry(
+                        building_id,
+                        building_started,
+                        status="settled",
+                        periodId=str(period.id),
+                        revenueKes=settlement["revenue"],
+                    )
+                )
+            ledger_rows = await post_ledger(session, settled)
+            await session.commit()
+        except Exception as exc:
+            await session.rollback()
+            logger.exception("settlement shard %d (%d buildings) failed; rolled back", index, len(shard))
+            error = f"{type(exc).__name__}: {exc}"
+            # The shard's time is in its shard report; no building finished on its own.
+            results = [_entry(building_id, None, status="failed", error=error) for building_id in ids]
+            ledger_rows, query_seconds = 0, 0.0
+        shard_report = {
+            "index": index,
+            "buildings": len(shard),
+            "querySeconds": round(query_seconds, 4),
+            "ledgerRows": ledger_rows,
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        return shard_report, results
+
+
+async def run_portfolio_settlement(
+    period_start: datetime,
+    period_end: datetime,
+    *,
+    workers: int | None = None,
+    shard_size: int | None = None,
+    stages: Sequence[str] = RUN_STAGES,
+    session_factory: async_sessionmaker[AsyncSession] = SessionLocal,
+) -> dict[str, Any]:
+    """Settle every building in ``stages`` for [period_start, period_end) and return the run report.
+
+    The report carries per-building status, period id, revenue and seconds,
+    per-shard timings, the failures and the overall buildings/second.
+    """
+    settings = get_settings()
+    workers = max(1, workers or settings.settlement_workers)
+    shard_size = max(1, shard_size or settings.settlement_shard_size)
+    period_start, period_end = energy_repo.as_utc(period_start), energy_repo.as_utc(period_end)
+    if period_end <= period_start:
+        raise SettlementError("invalid_period")
+
+    started = time.perf_counter()
+    async with session_factory() as session:
+        buildings = await buildings_repo.list_by_stage(session, stages)
+
+    checked: dict[tuple, bool] = {}
+    runnable: list[tuple[uuid.UUID, dict[str, Any]]] = []
+    results: list[dict[str, Any]] = []
+    for building in buildings:
+        resolve_started = time.perf_counter()
+        try:
+            runnable.append((building.id, settlement_terms(building, checked)))
+        except SettlementError as exc:
+            results.append(_entry(building.id, resolve_started, status="failed", error=exc.code))
+
+    slots = asyncio.Semaphore(workers)
+    shards = [runnable[i : i + shard_size] for i in range(0, len(runnable), shard_size)]
+    outcomes = await asyncio.gather(
+        *(
+            _settle_shard(session_factory, slots, index, shard, period_start, period_end)
+            for index, shard in enumerate(shards)
+        )
     )
-    record = {"id": f"settlement-{building_id}-{period_start.isoformat()}", "buildingId": building_id, "periodStart": period_start.isoformat(), "periodEnd": period_end.isoformat(), "eSoldKwh": energy["E_sold"], **settlement, "providerPayouts": calculate_ownership_payouts(settlement["providerPool"], project["providerOwnership"]), "financierPayouts": calculate_ownership_payouts(settlement["financierPool"], project["financierOwnership"]), "createdAt": datetime.now(timezone.utc).isoformat()}
-    store.add_settlement_record(record)
-    return record
+    for _, shard_results in outcomes:
+        results.extend(shard_results)
+    elapsed = time.perf_counter() - started
+
+    settled = [r for r in results if r["status"] == "settled"]
+    return {
+        "periodStart": period_start.isoformat(),
+        "periodEnd": period_end.isoformat(),
+        "stages": list(stages),
+        "workers": workers,
+        "shardSize": shard_size,
+        "buildings": len(results),
+        "settled": len(settled),
+        "failed": len(results) - len(settled),
+        "revenueKes": round2(sum(r["revenueKes"] for r in settled)),
+        "seconds": round(elapsed, 4),
+        "buildingsPerSecond": round(len(results) / elapsed, 1) if elapsed > 0 else 0.0,
+        "shards": [shard_report for shard_report, _ in outcomes],
+        "failures": [{"buildingId": r["buildingId"], "error": r["error"]} for r in results if r["status"] == "failed"],
+        "results": results,
+    }
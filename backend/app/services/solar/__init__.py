@@ -1,18 +1,23 @@
 """Solar data adapters — PVWatts (generation), NASA POWER (irradiance history),
 Open-Meteo (irradiance forecast), and load-profile generator (residents).
+PVProfileStore keeps PVWatts curves per kWp on disk so repeat sites never refetch.
 
 Each adapter is gated behind a small interface so a real meter feed can replace
 it post-pilot. See docs/PILOT_SCOPE.md §3.
 """
 from .pvwatts import PVWattsAdapter
+from .profile_store import PVProfileStore, pv_profile_store
 from .nasa_power import NasaPowerAdapter
 from .open_meteo import OpenMeteoAdapter
-from .load_profiles import generate_load_profile, RESIDENT_LOAD_ARCHETYPES
+from .load_profiles import generate_load_profile, generate_load_profiles, RESIDENT_LOAD_ARCHETYPES
 
 __all__ = [
     "PVWattsAdapter",
+    "PVProfileStore",
+    "pv_profile_store",
     "NasaPowerAdapter",
     "OpenMeteoAdapter",
     "generate_load_profile",
+    "generate_load_profiles",
     "RESIDENT_LOAD_ARCHETYPES",
 ]
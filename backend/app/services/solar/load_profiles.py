@@ -2,16 +2,26 @@
 
 Four archetypes from Simulation/files/customers.py, lifted into the backend.
 Each archetype has a 24-hour shape vector (sums to 1.0). Daily kWh totals are
-randomized at sigma=15% but seeded by resident_id+day so simulations are
+randomized at sigma=15%, seeded by resident_id + day so simulations are
 reproducible.
+
+The random draws are counter-based. Each (archetype, resident) pair is hashed
+once into a Philox key, and day d reads Philox block d. A day's value
+therefore depends only on (archetype, resident_id, day): batch size, order
+and day range never change it. generate_load_profiles builds a whole
+(residents × days × 24) array in one call; generate_load_profile is the
+one-resident, one-day view of it.
 """
 from __future__ import annotations
 
 import hashlib
 import math
-import random
+from collections.abc import Sequence
 from typing import TypedDict
 
+import numpy as np
+from numpy.typing import ArrayLike
+
 
 class LoadArchetype(TypedDict):
     name: str
@@ -67,19 +77,62 @@ RESIDENT_LOAD_ARCHETYPES: dict[str, LoadArchetype] = {
 }
 
 
+def _philox_key(archetype: str, resident_id: str) -> list[int]:
+    digest = hashlib.sha256(f"{archetype}:{resident_id}".encode()).digest()
+    return [int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:16], "little")]
+
+
+def _daily_normals(archetype: str, resident_id: str, days: np.ndarray) -> np.ndarray:
+    """One standard normal per day: Box–Muller over the first two words of Philox block ``day``."""
+    first, last = int(days.min()), int(days.max())
+    words = np.random.Philox(key=_philox_key(archetype, resident_id), counter=[first, 0, 0, 0]).random_raw(
+        4 * (last - first + 1)
+    )
+    blocks = words.reshape(-1, 4)[days - first]
+    u1 = ((blocks[:, 0] >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0**-53
+    u2 = (blocks[:, 1] >> np.uint64(11)).astype(np.float64) * 2.0**-53
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+def generate_load_profiles(
+    *,
+    archetypes: str | Sequence[str],
+    resident_ids: Sequence[str],
+    days: int | ArrayLike,
+    sigma: float = 0.15,
+) -> np.ndarray:
+    """Hourly kWh shaped (residents, days, 24), unrounded.
+
+    ``archetypes`` is one archetype for everyone or one per resident. ``days``
+    is a day count (0..days-1) or explicit non-negative day indices.
+    """
+    day_idx = np.arange(days) if isinstance(days, int) else np.asarray(days, dtype=np.int64)
+    names = [archetypes] * len(resident_ids) if isinstance(archetypes, str) else list(archetypes)
+    if len(names) != len(resident_ids):
+        raise ValueError("archetypes must be one name or one per resident")
+    out = np.zeros((len(resident_ids), day_idx.size, 24))
+    if day_idx.size == 0 or not names:
+        return out
+    if day_idx.min() < 0:
+        raise ValueError("day indices must be non-negative")
+
+    normals = np.stack([_daily_normals(a, r, day_idx) for a, r in zip(names, resident_ids)])
+    means = np.array([RESIDENT_LOAD_ARCHETYPES[a]["daily_kwh_mean"] for a in names])
+    shapes = np.array([RESIDENT_LOAD_ARCHETYPES[a]["shape"] for a in names]).reshape(len(names), 1, 24)
+    daily_total = np.maximum(means[:, None] * (1.0 + sigma * normals), 0.0)
+    np.multiply(daily_total[:, :, None], shapes, out=out)
+    return out
+
+
 def generate_load_profile(
     *, archetype: str, resident_id: str, day_index: int, sigma: float = 0.15
 ) -> list[float]:
     """Return 24 hourly kWh values for one day for one resident.
 
     Deterministic given (archetype, resident_id, day_index) — same inputs
-    produce same outputs. Used in seeding and any time we need a synthetic
-    load curve.
+    produce same outputs, and match the same row of generate_load_profiles.
     """
-    arc = RESIDENT_LOAD_ARCHETYPES[archetype]
-    seed_str = f"{archetype}:{resident_id}:{day_index}"
-    seed_int = int(hashlib.sha256(seed_str.encode()).hexdigest()[:16], 16)
-    rng = random.Random(seed_int)
-    daily_total = arc["daily_kwh_mean"] * (1.0 + rng.gauss(0, sigma))
-    daily_total = max(daily_total, 0.0)
-    return [round(daily_total * frac, 4) for frac in arc["shape"]]
+    profile = generate_load_profiles(
+        archetypes=archetype, resident_ids=[resident_id], days=[day_index], sigma=sigma
+    )[0, 0]
+    return [round(v, 4) for v in profile.tolist()]
@@ -4,16 +4,16 @@ from __future__ import annotations
 import logging
 from datetime import date
 
-import httpx
-
 from ...config import get_settings
+from ..http_pool import HttpPool, http_pool
 
 logger = logging.getLogger(__name__)
 
 
 class NasaPowerAdapter:
-    def __init__(self, base_url: str | None = None) -> None:
+    def __init__(self, base_url: str | None = None, http: HttpPool | None = None) -> None:
         self.base_url = base_url or get_settings().nasa_power_base
+        self.http = http or http_pool
 
     async def get_hourly_ghi(
         self,
@@ -34,10 +34,10 @@ class NasaPowerAdapter:
             "format": "JSON",
         }
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                resp = await client.get(self.base_url, params=params)
-                resp.raise_for_status()
-                payload = resp.json()
+            # Past irradiance is immutable; only windows reaching into the last few days
+            # can still be revised, so those are cached for a day instead of forever.
+            ttl = None if (date.today() - end).days > 7 else 86_400.0
+            payload = await self.http.get_json(self.base_url, params=params, timeout=60.0, ttl=ttl)
             series = (
                 payload.get("properties", {})
                 .get("parameter", {})
@@ -3,16 +3,16 @@ from __future__ import annotations
 
 import logging
 
-import httpx
-
 from ...config import get_settings
+from ..http_pool import HttpPool, http_pool
 
 logger = logging.getLogger(__name__)
 
 
 class OpenMeteoAdapter:
-    def __init__(self, base_url: str | None = None) -> None:
+    def __init__(self, base_url: str | None = None, http: HttpPool | None = None) -> None:
         self.base_url = base_url or get_settings().open_meteo_base
+        self.http = http or http_pool
 
     async def get_today_irradiance(self, *, lat: float, lon: float) -> list[float]:
         """Return 24 hourly W/m² values for today (local-day at the given lat/lon)."""
@@ -24,10 +24,9 @@ class OpenMeteoAdapter:
             "timezone": "auto",
         }
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                resp = await client.get(self.base_url, params=params)
-                resp.raise_for_status()
-                payload = resp.json()
+            payload = await self.http.get_json(
+                self.base_url, params=params, timeout=15.0, ttl=get_settings().open_meteo_cache_ttl_seconds
+            )
             radiation = payload.get("hourly", {}).get("shortwave_radiation", [])
             # Open-Meteo returns 24+ values per forecast_day; trim to 24
             return [float(v) for v in radiation[:24]]
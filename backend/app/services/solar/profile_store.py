@@ -0,0 +1,154 @@
+"""PVWatts profile store — per-kWp 8,760-hour generation curves on local disk.
+
+PVWatts AC output scales linearly with system_capacity, so one curve per
+site/orientation covers every array size. The store snaps lat/lon to a grid
+(EMAPPA_PV_PROFILE_GRID_DEG, default 0.05° ≈ 5.5 km), tilt to whole degrees
+and azimuth to 5°. It fetches the curve once at 1 kWp and saves it as a
+float32 ``.npy`` (35 KB). Later reads memory-map the file, so a warm store
+serves any ``kw`` with one multiply and no network call.
+
+PVWattsAdapter.get_hourly_kwh reads through the process-wide
+``pv_profile_store`` and fills it on a miss, fetching with the calling
+adapter's key and HTTP pool. A failed fetch is not stored. The caller gets
+the synthetic fallback for that call, and the next call tries NREL again.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from ...config import get_settings
+from .pvwatts import PVWattsAdapter
+from .synthetic import synthetic_hourly_kwh
+
+logger = logging.getLogger(__name__)
+
+HOURS = 8_760
+AZIMUTH_STEP_DEG = 5.0
+
+
+@dataclass(frozen=True)
+class ProfileKey:
+    lat: float
+    lon: float
+    tilt_deg: float
+    azimuth_deg: float
+
+    @classmethod
+    def snap(
+        cls, lat: float, lon: float, tilt_deg: float | None, azimuth_deg: float, *, grid_deg: float
+    ) -> ProfileKey:
+        def to_grid(value: float, step: float) -> float:
+            return round(round(value / step) * step, 6)
+
+        tilt = tilt_deg if tilt_deg is not None else abs(lat)
+        return cls(
+            lat=to_grid(lat, grid_deg),
+            lon=to_grid(lon, grid_deg),
+            tilt_deg=float(round(tilt)),
+            azimuth_deg=to_grid(azimuth_deg % 360, AZIMUTH_STEP_DEG),
+        )
+
+    @property
+    def filename(self) -> str:
+        return f"pvwatts-v8_{self.lat:+.3f}_{self.lon:+.3f}_t{self.tilt_deg:.0f}_a{self.azimuth_deg:.0f}.npy"
+
+
+class PVProfileStore:
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        grid_deg: float = 0.05,
+        adapter: PVWattsAdapter | None = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.grid_deg = grid_deg
+        self.adapter = adapter or PVWattsAdapter()
+        self._profiles: dict[ProfileKey, np.ndarray] = {}
+        self._locks: dict[ProfileKey, asyncio.Lock] = {}
+        self.fetches = 0
+
+    def key(self, lat: float, lon: float, tilt_deg: float | None = None, azimuth_deg: float = 180.0) -> ProfileKey:
+        return ProfileKey.snap(lat, lon, tilt_deg, azimuth_deg, grid_deg=self.grid_deg)
+
+    async def profile(
+        self,
+        *,
+        lat: float,
+        lon: float,
+        tilt_deg: float | None = None,
+        azimuth_deg: float = 180.0,
+        source: PVWattsAdapter | None = None,
+    ) -> np.ndarray | None:
+        """Read-only (8760,) float32 kWh per kWp for the snapped site, or None if NREL is unreachable.
+
+        A miss is fetched through ``source`` (default: the store's own adapter).
+        """
+        key = self.key(lat, lon, tilt_deg, azimuth_deg)
+        cached = self._profiles.get(key)
+        if cached is not None:
+            return cached
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if key in self._profiles:
+                return self._profiles[key]
+            path = self.directory / key.filename
+            loaded = await asyncio.to_thread(self._load, path)
+            if loaded is None:
+                loaded = await self._fetch(key, path, source or self.adapter)
+            if loaded is not None:
+                self._profiles[key] = loaded
+            return loaded
+
+    async def get_hourly_kwh(
+        self,
+        *,
+        lat: float,
+        lon: float,
+        kw: float,
+        tilt_deg: float | None = None,
+        azimuth_deg: float = 180.0,
+    ) -> np.ndarray:
+        """8760 hourly AC kWh (float64) for a ``kw`` array; synthetic fallback when no profile is available."""
+        per_kw = await self.profile(lat=lat, lon=lon, tilt_deg=tilt_deg, azimuth_deg=azimuth_deg)
+        if per_kw is None:
+            return synthetic_hourly_kwh(lat, kw)[0]
+        return per_kw.astype(np.float64) * kw
+
+    def _load(self, path: Path) -> np.ndarray | None:
+        try:
+            profile = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if profile.shape != (HOURS,) or profile.dtype != np.float32:
+            logger.warning("ignoring malformed PV profile %s", path)
+            return None
+        return profile
+
+    async def _fetch(self, key: ProfileKey, path: Path, adapter: PVWattsAdapter) -> np.ndarray | None:
+        self.fetches += 1
+        hourly = await adapter.fetch_hourly_kwh(
+            lat=key.lat, lon=key.lon, kw=1.0, tilt_deg=key.tilt_deg, azimuth_deg=key.azimuth_deg
+        )
+        if hourly is None or len(hourly) != HOURS:
+            return None
+        profile = np.asarray(hourly, dtype=np.float32)
+        await asyncio.to_thread(self._save, path, profile)
+        return self._load(path) if path.exists() else profile
+
+    def _save(self, path: Path, profile: np.ndarray) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp, profile)
+            tmp.replace(path)
+        except OSError:
+            logger.exception("could not persist PV profile %s; keeping it in memory only", path)
+
+
+pv_profile_store = PVProfileStore(get_settings().pv_profile_dir, grid_deg=get_settings().pv_profile_grid_deg)
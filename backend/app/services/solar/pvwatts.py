@@ -1,27 +1,40 @@
 """NREL PVWatts v8 adapter — hourly AC generation per array.
 
 Returns 8,760 hourly kWh values for a typical meteorological year (TMY) given
-location + array parameters. Falls back to a deterministic synthetic curve if
-the NREL API is unreachable so dev work is never blocked.
+location + array parameters. get_hourly_kwh is served from the per-kWp profile
+store (profile_store.py): the snapped site is fetched once at 1 kWp, kept as
+float32 on disk and scaled to ``kw``. fetch_hourly_kwh is the raw NREL call the
+store fills from. Falls back to a deterministic synthetic curve if the NREL
+API is unreachable so dev work is never blocked.
 """
 from __future__ import annotations
 
 import logging
-import math
-from typing import Any
-
-import httpx
+from typing import TYPE_CHECKING, Any
 
 from ...config import get_settings
+from ..http_pool import HttpPool, http_pool
+from .synthetic import synthetic_hourly_kwh
+
+if TYPE_CHECKING:
+    from .profile_store import PVProfileStore
 
 logger = logging.getLogger(__name__)
 
 
 class PVWattsAdapter:
-    def __init__(self, api_key: str | None = None, base_url: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        base_url: str | None = None,
+        http: HttpPool | None = None,
+        profiles: PVProfileStore | None = None,
+    ) -> None:
         settings = get_settings()
         self.api_key = api_key or settings.nrel_api_key
         self.base_url = base_url or settings.nrel_pvwatts_base
+        self.http = http or http_pool
+        self.profiles = profiles  # None = the process-wide pv_profile_store
 
     async def get_hourly_kwh(
         self,
@@ -32,7 +45,28 @@ class PVWattsAdapter:
         tilt_deg: float | None = None,
         azimuth_deg: float = 180.0,
     ) -> list[float]:
-        """Return 8760 hourly AC kWh values."""
+        """Return 8760 hourly AC kWh values: the snapped site's per-kWp profile × ``kw``.
+
+        A profile missing from the store is fetched through this adapter and stored.
+        """
+        profiles = self.profiles
+        if profiles is None:
+            from .profile_store import pv_profile_store as profiles
+        per_kw = await profiles.profile(lat=lat, lon=lon, tilt_deg=tilt_deg, azimuth_deg=azimuth_deg, source=self)
+        if per_kw is None:
+            return _synthetic_hourly(lat, kw)
+        return (per_kw.astype("float64") * kw).tolist()
+
+    async def fetch_hourly_kwh(
+        self,
+        *,
+        lat: float,
+        lon: float,
+        kw: float,
+        tilt_deg: float | None = None,
+        azimuth_deg: float = 180.0,
+    ) -> list[float] | None:
+        """8760 hourly AC kWh from NREL, or None when the API fails (no synthetic fallback)."""
         # Default tilt to latitude if not provided.
         tilt = tilt_deg if tilt_deg is not None else abs(lat)
 
@@ -50,44 +84,38 @@ class PVWattsAdapter:
             "dataset": "intl",          # international dataset (covers Kenya)
         }
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                resp = await client.get(self.base_url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
-            ac_wh = data.get("outputs", {}).get("ac", [])
-            if not ac_wh or len(ac_wh) < 8000:
+            # TMY output for a given site + array never changes: cache forever, but only
+            # a full year; error bodies and short arrays must not pin the fallback.
+            data = await self.http.get_json(
+                self.base_url, params=params, timeout=30.0, ttl=None, valid=_has_full_year
+            )
+            ac_wh = _ac_wh(data)
+            if not _has_full_year(data):
                 logger.warning(
                     "PVWatts returned %d hours; falling back to synthetic", len(ac_wh)
                 )
-                return _synthetic_hourly(lat, kw)
+                return None
             return [float(v) / 1000.0 for v in ac_wh]
         except Exception:
             logger.exception("PVWatts call failed; using synthetic fallback")
-            return _synthetic_hourly(lat, kw)
+            return None
+
+
+def _ac_wh(data: Any) -> list:
+    outputs = data.get("outputs") if isinstance(data, dict) else None
+    ac_wh = outputs.get("ac") if isinstance(outputs, dict) else None
+    return ac_wh if isinstance(ac_wh, list) else []
+
+
+def _has_full_year(data: Any) -> bool:
+    """True when a PVWatts body carries (close to) 8760 hourly AC values."""
+    return len(_ac_wh(data)) >= 8000
 
 
 def _synthetic_hourly(lat: float, kw: float) -> list[float]:
-    """Deterministic fallback curve: sine-of-sun-elevation approximation.
+    """Deterministic clear-sky fallback curve (see synthetic.synthetic_hourly_kwh).
 
-    Produces 8760 hours assuming year starts at hour 0 of Jan 1. The curve is
-    crude (no seasonal tilt, no clouds) but matches the order of magnitude an
-    8 kWp Kenyan rooftop produces (~12 MWh/year for typical sites).
+    8760 hours from hour 0 of Jan 1, local solar time, with seasonal and
+    latitude effects but no clouds.
     """
-    out: list[float] = []
-    # Very rough sun-elevation proxy by hour-of-day.
-    for hour in range(8760):
-        hod = hour % 24
-        # 0 at night (0-6, 18-24), peak at noon
-        if hod < 6 or hod >= 18:
-            out.append(0.0)
-            continue
-        # bell shape from 6 to 18
-        x = (hod - 6) / 12.0  # 0..1
-        intensity = math.sin(x * math.pi)  # peak at noon
-        # Scale by capacity. Kenya's NSRDB equivalent is ~5.5 kWh/kW/day baseline.
-        # Daily total target: kw * 5.5 kWh; integral of sin over [0,pi] = 2.
-        # So scale = kw * 5.5 / (12 hours * mean(sin)). mean(sin) over [0,pi] = 2/pi.
-        # Per-hour value at intensity i: i * (kw * 5.5 / (12 * (2/pi))) = i * kw * 5.5 * pi / 24
-        per_hour = intensity * kw * 5.5 * math.pi / 24.0
-        out.append(round(per_hour, 4))
-    return out
+    return [round(v, 4) for v in synthetic_hourly_kwh(lat, kw)[0].tolist()]
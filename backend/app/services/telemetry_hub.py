@@ -0,0 +1,220 @@
+"""Telemetry hub — per-building pub/sub fan-out for /ws/{building_id}.
+
+Publishers (the measured-reading ingest path) call ``await hub.publish(
+building_id, type, data)``. The frame is JSON-encoded once, handed to the
+backend, and the backend delivers it to every local subscriber of that
+building's topic:
+
+* InMemoryBackend delivers directly, for a single process.
+* PostgresNotifyBackend goes through pg_notify / LISTEN on one dedicated
+  asyncpg connection, so every API worker fans out every frame. Payloads are
+  capped at pg_notify's 8,000 bytes; delta frames are far below that.
+
+Each socket owns a bounded queue. Fan-out is a non-blocking put per
+subscriber. A consumer whose queue is full is dropped rather than allowed to
+slow the publisher: its queue is drained and replaced with a close sentinel.
+The hub keeps counters and a rolling window of publish → send latencies
+(metrics()).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Any, Protocol
+
+import numpy as np
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str, str, float], None]
+LATENCY_WINDOW = 4_096
+
+
+class HubBackend(Protocol):
+    async def start(self, deliver: Deliver) -> None: ...
+
+    async def publish(self, topic: str, frame: str, published_at: float) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class InMemoryBackend:
+    """Single-process backend: publish delivers straight to local subscribers."""
+
+    def __init__(self) -> None:
+        self._deliver: Deliver | None = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def publish(self, topic: str, frame: str, published_at: float) -> None:
+        assert self._deliver is not None
+        self._deliver(topic, frame, published_at)
+
+    async def close(self) -> None:
+        self._deliver = None
+
+
+class PostgresNotifyBackend:
+    """Cross-process backend over Postgres LISTEN/NOTIFY on a dedicated connection."""
+
+    channel = "emappa_telemetry"
+
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self._conn: Any = None
+
+    async def start(self, deliver: Deliver) -> None:
+        import asyncpg
+
+        def on_notify(_conn, _pid, _channel, payload: str) -> None:
+            envelope = json.loads(payload)
+            deliver(envelope["topic"], envelope["frame"], envelope["publishedAt"])
+
+        self._conn = await asyncpg.connect(self.dsn)
+        await self._conn.add_listener(self.channel, on_notify)
+
+    async def publish(self, topic: str, frame: str, published_at: float) -> None:
+        # time.time() rather than monotonic: the stamp crosses processes.
+        envelope = json.dumps({"topic": topic, "frame": frame, "publishedAt": published_at})
+        await self._conn.execute("SELECT pg_notify($1, $2)", self.channel, envelope)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+class Subscriber:
+    """One socket's view of a topic. ``None`` in the queue means "close: you were too slow"."""
+
+    def __init__(self, topic: str, queue_size: int) -> None:
+        self.topic = topic
+        self.queue: asyncio.Queue[tuple[float, str] | None] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+
+class TelemetryHub:
+    def __init__(
+        self,
+        *,
+        backend_factory: Callable[[], HubBackend] = InMemoryBackend,
+        queue_size: int = 64,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._backend_factory = backend_factory
+        self._backend: HubBackend | None = None
+        self._starting: asyncio.Lock | None = None
+        self.queue_size = queue_size
+        self._clock = clock
+        self._topics: dict[str, set[Subscriber]] = {}
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.published = 0
+        self.delivered = 0
+        self.sent = 0
+        self.dropped_consumers = 0
+
+    async def _ensure_started(self) -> HubBackend:
+        if self._backend is None:
+            self._starting = self._starting or asyncio.Lock()
+            async with self._starting:
+                if self._backend is None:
+                    backend = self._backend_factory()
+                    await backend.start(self._deliver)
+                    self._backend = backend
+        return self._backend
+
+    async def subscribe(self, topic: str) -> Subscriber:
+        await self._ensure_started()
+        sub = Subscriber(topic, self.queue_size)
+        self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subs = self._topics.get(sub.topic)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._topics[sub.topic]
+
+    async def publish(self, topic: str, type_: str, data: dict[str, Any]) -> None:
+        """Encode once and fan out {type, buildingId, data, timestamp} to the topic."""
+        frame = json.dumps(
+            {"type": type_, "buildingId": topic, "data": data, "timestamp": datetime.now(timezone.utc).isoformat()}
+        )
+        backend = await self._ensure_started()
+        self.published += 1
+        await backend.publish(topic, frame, self._clock())
+
+    def _deliver(self, topic: str, frame: str, published_at: float) -> None:
+        for sub in list(self._topics.get(topic, ())):
+            try:
+                sub.queue.put_nowait((published_at, frame))
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self._drop(sub)
+
+    def _drop(self, sub: Subscriber) -> None:
+        sub.dropped = True
+        self.dropped_consumers += 1
+        logger.info("dropping slow telemetry consumer on %s (queue of %d full)", sub.topic, self.queue_size)
+        self.unsubscribe(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    async def pump(self, sub: Subscriber, send_text: Callable[[str], Awaitable[None]]) -> None:
+        """Forward a subscriber's frames to its socket until dropped; records fan-out latency."""
+        while True:
+            item = await sub.queue.get()
+            if item is None:
+                return
+            published_at, frame = item
+            await send_text(frame)
+            self.sent += 1
+            self._latencies.append(self._clock() - published_at)
+
+    def metrics(self) -> dict[str, Any]:
+        latencies_ms = np.asarray(self._latencies, dtype=np.float64) * 1_000
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if latencies_ms.size else (0.0, 0.0, 0.0)
+        return {
+            "topics": len(self._topics),
+            "subscribers": sum(len(subs) for subs in self._topics.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "sent": self.sent,
+            "droppedConsumers": self.dropped_consumers,
+            "fanoutLatencyMs": {
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "max": round(float(latencies_ms.max()), 3) if latencies_ms.size else 0.0,
+                "samples": int(latencies_ms.size),
+            },
+        }
+
+    async def close(self) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+
+def _backend_factory() -> Callable[[], HubBackend]:
+    settings = get_settings()
+    if settings.telemetry_backend == "postgres":
+        dsn = settings.database_url.replace("+asyncpg", "")
+        return lambda: PostgresNotifyBackend(dsn)
+    return InMemoryBackend
+
+
+telemetry_hub = TelemetryHub(
+    backend_factory=_backend_factory(),
+    queue_size=get_settings().ws_client_queue_size,
+)
@@ -0,0 +1,72 @@
+"""energy_rollups — hourly + daily rollups of energy_readings
+
+Adds:
+  - energy_rollup_hourly / energy_rollup_daily — one row per
+    (building_id, kind, bucket) with sum/min/max/count of the raw readings.
+    Buckets are UTC-aligned (date_trunc(..., 'UTC')).
+    Maintained incrementally by repos.energy.bulk_insert_readings: only the
+    buckets touched by a batch are recomputed and upserted.
+  - Backfills both tables from the existing energy_readings rows.
+
+Revision ID: 0003_energy_rollups
+Revises: 0002_onboarding_extensions
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0003_energy_rollups"
+down_revision: str | Sequence[str] | None = "0002_onboarding_extensions"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _create_rollup_table(name: str) -> None:
+    op.create_table(
+        name,
+        sa.Column("building_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("buildings.id"), nullable=False),
+        sa.Column("kind", sa.Text(), nullable=False),
+        sa.Column("bucket", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("value_sum", sa.Double(), nullable=False),
+        sa.Column("value_min", sa.Double(), nullable=False),
+        sa.Column("value_max", sa.Double(), nullable=False),
+        sa.Column("sample_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("building_id", "kind", "bucket", name=f"{name}_pkey"),
+    )
+
+
+def upgrade() -> None:
+    _create_rollup_table("energy_rollup_hourly")
+    _create_rollup_table("energy_rollup_daily")
+
+    op.execute(
+        """
+        INSERT INTO energy_rollup_hourly
+            (building_id, kind, bucket, value_sum, value_min, value_max, sample_count)
+        SELECT building_id, kind, date_trunc('hour', "timestamp", 'UTC'),
+               sum(value), min(value), max(value), count(*)
+        FROM energy_readings
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO energy_rollup_daily
+            (building_id, kind, bucket, value_sum, value_min, value_max, sample_count)
+        SELECT building_id, kind, date_trunc('day', bucket, 'UTC'),
+               sum(value_sum), min(value_min), max(value_max), sum(sample_count)
+        FROM energy_rollup_hourly
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("energy_rollup_daily")
+    op.drop_table("energy_rollup_hourly")
@@ -0,0 +1,52 @@
+"""energy_readings_unique — one reading per (building, kind, timestamp)
+
+Measured meter/inverter feeds retry and re-send, so ingest de-duplicates with
+ON CONFLICT, which needs a unique index. Existing duplicates (if any) are
+collapsed to the most recently inserted row first. The unique index replaces
+idx_energy_building_kind_time, which it fully covers.
+
+Revision ID: 0004_energy_readings_unique
+Revises: 0003_energy_rollups
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004_energy_readings_unique"
+down_revision: str | Sequence[str] | None = "0003_energy_rollups"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM energy_readings a
+        USING energy_readings b
+        WHERE a.building_id = b.building_id
+          AND a.kind = b.kind
+          AND a."timestamp" = b."timestamp"
+          AND a.id < b.id
+        """
+    )
+    op.create_index(
+        "uq_energy_building_kind_time",
+        "energy_readings",
+        ["building_id", "kind", sa.text("timestamp DESC")],
+        unique=True,
+    )
+    op.drop_index("idx_energy_building_kind_time", table_name="energy_readings")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "idx_energy_building_kind_time",
+        "energy_readings",
+        ["building_id", "kind", sa.text("timestamp DESC")],
+    )
+    op.drop_index("uq_energy_building_kind_time", table_name="energy_readings")
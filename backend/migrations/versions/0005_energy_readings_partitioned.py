@@ -0,0 +1,166 @@
+"""energy_readings_partitioned — monthly range partitions, compact row layout
+
+Replaces energy_readings with a table partitioned by RANGE ("timestamp"), one
+child per UTC month (energy_readings_YYYY_MM), and shrinks each row:
+  - id bigserial dropped; pk is (building_id, kind, timestamp), which also
+    serves the ON CONFLICT de-duplication added in 0004.
+  - value numeric → double precision.
+  - kind / source text → smallint codes (app.models.energy.KIND_CODES /
+    SOURCE_CODES); energy_rollup_hourly/daily.kind follow suit.
+  - provenance text → provenance_id into the new energy_provenances dictionary.
+  - unit dropped; it is implied by kind (repos.energy.KIND_UNITS).
+
+energy_readings_ensure_partitions(lo, hi) creates any missing monthly
+partitions covering [lo, hi]; the repo calls it before every insert. Old months
+can be detached (kept as a plain table for archiving) or dropped without
+rewriting anything else; the rollups keep their history.
+
+Revision ID: 0005_energy_readings_partitioned
+Revises: 0004_energy_readings_unique
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0005_energy_readings_partitioned"
+down_revision: str | Sequence[str] | None = "0004_energy_readings_unique"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+_KIND_TO_CODE = "CASE {col} WHEN 'generation' THEN 1 WHEN 'load' THEN 2 WHEN 'irradiance' THEN 3 END"
+_CODE_TO_KIND = "CASE {col} WHEN 1 THEN 'generation' WHEN 2 THEN 'load' WHEN 3 THEN 'irradiance' END"
+_ROLLUP_TABLES = ("energy_rollup_hourly", "energy_rollup_daily")
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE energy_readings RENAME TO energy_readings_legacy")
+    op.execute("ALTER INDEX energy_readings_pkey RENAME TO energy_readings_legacy_pkey")
+    op.execute("ALTER INDEX uq_energy_building_kind_time RENAME TO uq_energy_legacy_building_kind_time")
+
+    op.execute(
+        """
+        CREATE TABLE energy_provenances (
+            id integer GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+            label text NOT NULL UNIQUE
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE energy_readings (
+            building_id uuid NOT NULL REFERENCES buildings(id),
+            "timestamp" timestamptz NOT NULL,
+            kind smallint NOT NULL,
+            value double precision NOT NULL,
+            source smallint NOT NULL,
+            provenance_id integer NOT NULL REFERENCES energy_provenances(id),
+            CONSTRAINT energy_readings_pkey PRIMARY KEY (building_id, kind, "timestamp"),
+            CONSTRAINT energy_kind_check CHECK (kind BETWEEN 1 AND 3),
+            CONSTRAINT energy_source_check CHECK (source IN (1, 2))
+        ) PARTITION BY RANGE ("timestamp")
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION energy_readings_ensure_partitions(lo timestamptz, hi timestamptz)
+        RETURNS integer LANGUAGE plpgsql AS $$
+        DECLARE
+            month_start timestamp := date_trunc('month', lo AT TIME ZONE 'UTC');
+            part text;
+            created integer := 0;
+        BEGIN
+            WHILE month_start <= hi AT TIME ZONE 'UTC' LOOP
+                part := 'energy_readings_' || to_char(month_start, 'YYYY_MM');
+                IF to_regclass(part) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF energy_readings FOR VALUES FROM (%L) TO (%L)',
+                        part,
+                        month_start AT TIME ZONE 'UTC',
+                        (month_start + interval '1 month') AT TIME ZONE 'UTC'
+                    );
+                    created := created + 1;
+                END IF;
+                month_start := month_start + interval '1 month';
+            END LOOP;
+            RETURN created;
+        END
+        $$
+        """
+    )
+
+    op.execute(
+        "INSERT INTO energy_provenances (label) "
+        "SELECT DISTINCT provenance FROM energy_readings_legacy ORDER BY 1"
+    )
+    op.execute(
+        'SELECT energy_readings_ensure_partitions(min("timestamp"), max("timestamp")) '
+        "FROM energy_readings_legacy"
+    )
+    op.execute(
+        f"""
+        INSERT INTO energy_readings (building_id, "timestamp", kind, value, source, provenance_id)
+        SELECT l.building_id, l."timestamp", {_KIND_TO_CODE.format(col="l.kind")},
+               l.value::double precision,
+               CASE l.source WHEN 'synthetic' THEN 1 WHEN 'measured' THEN 2 END,
+               p.id
+        FROM energy_readings_legacy l
+        JOIN energy_provenances p ON p.label = l.provenance
+        """
+    )
+    op.execute("DROP TABLE energy_readings_legacy")
+
+    for table in _ROLLUP_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN kind TYPE smallint "
+            f"USING {_KIND_TO_CODE.format(col='kind')}"
+        )
+
+
+def downgrade() -> None:
+    for table in _ROLLUP_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN kind TYPE text "
+            f"USING {_CODE_TO_KIND.format(col='kind')}"
+        )
+
+    op.execute("ALTER TABLE energy_readings RENAME TO energy_readings_partitioned")
+    op.execute("ALTER INDEX energy_readings_pkey RENAME TO energy_readings_partitioned_pkey")
+    op.execute(
+        """
+        CREATE TABLE energy_readings (
+            id bigserial PRIMARY KEY,
+            building_id uuid NOT NULL REFERENCES buildings(id),
+            "timestamp" timestamptz NOT NULL,
+            kind text NOT NULL,
+            value numeric NOT NULL,
+            unit text NOT NULL,
+            source text NOT NULL,
+            provenance text NOT NULL,
+            CONSTRAINT energy_kind_check CHECK (kind IN ('generation','load','irradiance')),
+            CONSTRAINT energy_source_check CHECK (source IN ('synthetic','measured'))
+        )
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO energy_readings (building_id, "timestamp", kind, value, unit, source, provenance)
+        SELECT r.building_id, r."timestamp", {_CODE_TO_KIND.format(col="r.kind")}, r.value,
+               CASE r.kind WHEN 3 THEN 'W/m2' ELSE 'kWh' END,
+               CASE r.source WHEN 1 THEN 'synthetic' ELSE 'measured' END,
+               p.label
+        FROM energy_readings_partitioned r
+        JOIN energy_provenances p ON p.id = r.provenance_id
+        ORDER BY r."timestamp"
+        """
+    )
+    op.execute(
+        'CREATE UNIQUE INDEX uq_energy_building_kind_time ON energy_readings (building_id, kind, "timestamp" DESC)'
+    )
+    op.execute("DROP TABLE energy_readings_partitioned")
+    op.execute("DROP FUNCTION energy_readings_ensure_partitions(timestamptz, timestamptz)")
+    op.execute("DROP TABLE energy_provenances")
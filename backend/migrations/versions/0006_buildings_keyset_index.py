@@ -0,0 +1,29 @@
+"""buildings_keyset_index — index for (created_at, id) keyset pagination
+
+/projects and /discover page through buildings ordered by (created_at, id)
+with a row-value cursor; this index serves both the order and the
+"(created_at, id) > cursor" seek.
+
+Revision ID: 0006_buildings_keyset_index
+Revises: 0005_energy_readings_partitioned
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0006_buildings_keyset_index"
+down_revision: str | Sequence[str] | None = "0005_energy_readings_partitioned"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_buildings_created_id", "buildings", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_buildings_created_id", table_name="buildings")
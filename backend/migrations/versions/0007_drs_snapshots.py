@@ -0,0 +1,62 @@
+"""drs_snapshots — stored DRS per building + score/decision transitions
+
+Adds:
+  - drs_snapshots — one row per building with the calculate_drs inputs, their
+    rule outcome (gate codes, bits, components), gate overrides from POST /drs/{id}/update and the
+    resolver fingerprint the inputs came from. GET /drs/{id} is a primary
+    key read while the fingerprint still matches.
+  - drs_transitions — append-only; one row per write that moved the score or
+    the decision, with the input keys that changed. Indexed on
+    (building_id, id) for newest-first history reads.
+
+Snapshots are created lazily on the first read or write, so no backfill.
+
+Revision ID: 0007_drs_snapshots
+Revises: 0006_buildings_keyset_index
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "0007_drs_snapshots"
+down_revision: str | Sequence[str] | None = "0006_buildings_keyset_index"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "drs_snapshots",
+        sa.Column("building_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("buildings.id"), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("source_key", sa.Text(), nullable=False),
+        sa.Column("inputs", postgresql.JSONB(), nullable=False),
+        sa.Column("overrides", postgresql.JSONB(), nullable=False, server_default="{}"),
+        sa.Column("outcome", postgresql.JSONB(), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "drs_transitions",
+        sa.Column("id", sa.BigInteger(), sa.Identity(), primary_key=True),
+        sa.Column("building_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("buildings.id"), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Double(), nullable=False),
+        sa.Column("decision", sa.Text(), nullable=False),
+        sa.Column("previous_score", sa.Double(), nullable=True),
+        sa.Column("previous_decision", sa.Text(), nullable=True),
+        sa.Column("changed_inputs", postgresql.ARRAY(sa.Text()), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("idx_drs_transitions_building_id", "drs_transitions", ["building_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_drs_transitions_building_id", table_name="drs_transitions")
+    op.drop_table("drs_transitions")
+    op.drop_table("drs_snapshots")
@@ -0,0 +1,47 @@
+"""settlement_period_key — one settlement period per (building, window)
+
+POST /settlement/run upserts on (building_id, period_start, period_end), so
+re-running a period updates it in place instead of appending a duplicate.
+Existing duplicates are collapsed to their newest row first.
+
+Settlement payouts are posted to wallet_transactions under the reference
+"settlement:<period id>"; the reference index lets a re-run read what was
+already posted for a period and write only the difference.
+
+Revision ID: 0008_settlement_period_key
+Revises: 0007_drs_snapshots
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0008_settlement_period_key"
+down_revision: str | Sequence[str] | None = "0007_drs_snapshots"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM settlement_periods p
+        USING settlement_periods newer
+        WHERE newer.building_id = p.building_id
+          AND newer.period_start = p.period_start
+          AND newer.period_end = p.period_end
+          AND (newer.created_at, newer.id) > (p.created_at, p.id)
+        """
+    )
+    op.create_unique_constraint(
+        "settlement_period_key", "settlement_periods", ["building_id", "period_start", "period_end"]
+    )
+    op.create_index("idx_wallet_reference", "wallet_transactions", ["reference"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_wallet_reference", table_name="wallet_transactions")
+    op.drop_constraint("settlement_period_key", "settlement_periods", type_="unique")
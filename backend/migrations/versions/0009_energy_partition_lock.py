@@ -0,0 +1,72 @@
+"""energy_partition_lock — serialize on-demand creation of energy_readings months
+
+energy_readings_ensure_partitions (0005) checked to_regclass and then ran
+CREATE TABLE ... PARTITION OF as two steps, so two ingest transactions that
+both saw a new month raced and the loser aborted its whole batch with
+"relation already exists". A missing month is now created under a
+transaction-scoped advisory lock and re-checked once the lock is held, with
+duplicate_table swallowed as a backstop. Months that already exist are still
+found without taking the lock.
+
+Revision ID: 0009_energy_partition_lock
+Revises: 0008_settlement_period_key
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "0009_energy_partition_lock"
+down_revision: str | Sequence[str] | None = "0008_settlement_period_key"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+_CREATE = """
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF energy_readings FOR VALUES FROM (%L) TO (%L)',
+                part,
+                month_start AT TIME ZONE 'UTC',
+                (month_start + interval '1 month') AT TIME ZONE 'UTC'
+            );
+            created := created + 1;"""
+
+_FUNCTION = """
+CREATE OR REPLACE FUNCTION energy_readings_ensure_partitions(lo timestamptz, hi timestamptz)
+RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+    month_start timestamp := date_trunc('month', lo AT TIME ZONE 'UTC');
+    part text;
+    created integer := 0;
+BEGIN
+    WHILE month_start <= hi AT TIME ZONE 'UTC' LOOP
+        part := 'energy_readings_' || to_char(month_start, 'YYYY_MM');
+        IF to_regclass(part) IS NULL THEN{create}
+        END IF;
+        month_start := month_start + interval '1 month';
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+# Held until commit: a second creator waits here, then finds the month on the
+# re-check. duplicate_table still covers a creator that got in before the lock.
+_LOCKED_CREATE = """
+            PERFORM pg_advisory_xact_lock(hashtext('energy_readings_ensure_partitions'));
+            IF to_regclass(part) IS NULL THEN
+                BEGIN""" + _CREATE.replace("\n", "\n        ") + """
+                EXCEPTION WHEN duplicate_table THEN
+                    NULL;
+                END;
+            END IF;"""
+
+
+def upgrade() -> None:
+    op.execute(_FUNCTION.format(create=_LOCKED_CREATE))
+
+
+def downgrade() -> None:
+    op.execute(_FUNCTION.format(create=_CREATE))
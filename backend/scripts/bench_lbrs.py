@@ -0,0 +1,91 @@
+"""bench_lbrs — time lbrs_sweep against a calculate_lbrs loop.
+
+Builds N synthetic projects (mixed kinds and stages, some with recorded
+commissioning results), then times the go-live sweep next to the
+per-building loop that tallies the same gate pass counts and blocker
+histogram, and checks both agree.
+
+Usage:
+    python -m scripts.bench_lbrs
+    python -m scripts.bench_lbrs --sizes 1000 10000 100000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from typing import Iterable
+
+from app.services.lbrs import (
+    APARTMENT_LBRS,
+    HOMEOWNER_LBRS,
+    LIVE_TEST_KEYS,
+    SWEEP_STAGES,
+    calculate_lbrs,
+    default_lbrs_input,
+    lbrs_sweep,
+)
+
+_KINDS = ("apartment", "single_family")
+_STAGES = ("review", "funding", "install", "live")
+
+
+def _synthetic_projects(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        project = {"id": f"bench-{i}", "buildingKind": rng.choice(_KINDS), "stage": rng.choice(_STAGES)}
+        if project["stage"] == "install" and rng.random() < 0.7:
+            site_kind = "homeowner" if project["buildingKind"] == "single_family" else "apartment"
+            project["lbrs"] = {"siteKind": site_kind, **{key: rng.random() < 0.85 for key in LIVE_TEST_KEYS}}
+        projects.append(project)
+    return projects
+
+
+def _loop_sweep(projects: list[dict]) -> dict:
+    passed: Counter = Counter()
+    applicable: Counter = Counter()
+    blockers: Counter = Counter()
+    for project in projects:
+        if project.get("stage") not in SWEEP_STAGES:
+            continue
+        inp = default_lbrs_input(project)
+        out = calculate_lbrs(inp)
+        failed = {f["code"] for f in out["criticalFailures"]}
+        rules = HOMEOWNER_LBRS if inp.get("siteKind") == "homeowner" else APARTMENT_LBRS
+        for gate in rules.gates:
+            applicable[gate.code] += 1
+            passed[gate.code] += gate.code not in failed
+        blockers[len(failed)] += 1
+    return {
+        "gatePassCounts": {code: {"applicable": applicable[code], "passed": passed[code]} for code in applicable},
+        "blockerHistogram": [blockers[k] for k in range(max(blockers, default=0) + 1)],
+    }
+
+
+def _seconds(fn):
+    started = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - started, out
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_lbrs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'buildings':>10} {'swept':>8} {'loop':>10} {'sweep':>10} {'speedup':>8}")
+    for n in args.sizes:
+        projects = _synthetic_projects(n)
+        loop_s, expected = _seconds(lambda: _loop_sweep(projects))
+        sweep_s, sweep = _seconds(lambda: lbrs_sweep(projects))
+        assert sweep["gatePassCounts"] == expected["gatePassCounts"]
+        assert sweep["blockerHistogram"] == expected["blockerHistogram"]
+        print(f"{n:>10} {sweep['buildings']:>8} {loop_s:>9.3f}s {sweep_s:>9.3f}s {loop_s / sweep_s:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""bench_portfolio — time project_portfolio against a project_building loop.
+
+Builds N synthetic projects by jittering the demo projects, then times the
+columnar path for several field sets next to the per-project loop.
+
+Usage:
+    python -m scripts.bench_portfolio
+    python -m scripts.bench_portfolio --sizes 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Iterable
+
+from app.data.demo import DEMO_PROJECTS
+from app.services.portfolio import project_portfolio
+from app.services.projector import project_building
+
+
+def _synthetic_projects(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        base = DEMO_PROJECTS[i % len(DEMO_PROJECTS)]
+        energy = {
+            **base["energy"],
+            "arrayKw": round(base["energy"]["arrayKw"] * rng.uniform(0.5, 2.0), 1),
+            "monthlyDemandKwh": round(base["energy"]["monthlyDemandKwh"] * rng.uniform(0.5, 2.0)),
+        }
+        projects.append({**base, "id": f"{base['id']}-{i}", "energy": energy})
+    return projects
+
+
+def _seconds(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench_portfolio")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'buildings':>10} {'loop':>10} {'all fields':>11} {'energy+settlement':>18} {'energy':>8}")
+    for n in args.sizes:
+        projects = _synthetic_projects(n)
+        loop = _seconds(lambda: [project_building(p) for p in projects])
+        full = _seconds(lambda: project_portfolio(projects))
+        money = _seconds(lambda: project_portfolio(projects, fields=("energy", "settlement")))
+        energy = _seconds(lambda: project_portfolio(projects, fields=("energy",)))
+        print(f"{n:>10} {loop:>9.3f}s {full:>10.3f}s {money:>17.3f}s {energy:>7.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
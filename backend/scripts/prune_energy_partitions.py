@@ -0,0 +1,48 @@
+"""prune_energy_partitions — operator-run CLI to retire old energy_readings months.
+
+Detaches every monthly partition older than the cutoff month. Detached months
+stay as plain tables (energy_readings_YYYY_MM) for pg_dump/archiving unless
+--drop is given. Hourly/daily rollups are kept either way.
+
+Usage:
+    python -m scripts.prune_energy_partitions 2025-01
+    python -m scripts.prune_energy_partitions 2025-01 --drop
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from app.db.session import SessionLocal
+from app.repos import energy as energy_repo
+
+
+async def _prune(before: datetime, *, drop: bool) -> int:
+    async with SessionLocal() as session:
+        affected = await energy_repo.detach_partitions_before(session, before, drop=drop)
+        await session.commit()
+    verb = "dropped" if drop else "detached"
+    if not affected:
+        print(f"noop: no partitions before {before:%Y-%m}")
+    for name in affected:
+        print(f"{verb}: {name}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before", help="first month to keep, YYYY-MM")
+    parser.add_argument("--drop", action="store_true", help="drop instead of leaving detached tables")
+    args = parser.parse_args(argv)
+    try:
+        before = datetime.strptime(args.before, "%Y-%m").replace(tzinfo=timezone.utc)
+    except ValueError:
+        print(f"refused: {args.before!r} is not YYYY-MM", file=sys.stderr)
+        return 2
+    return asyncio.run(_prune(before, drop=args.drop))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,6 +14,7 @@ import uuid
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
+import numpy as np
 from sqlalchemy import select
 
 from app.config import get_settings
@@ -25,8 +26,9 @@ from app.models.energy import EnergyReading
 from app.models.financier import FinancierPosition
 from app.models.inventory import InventoryItem
 from app.models.user import User
+from app.repos import energy as energy_repo
 from app.repos import wallet as wallet_repo
-from app.services.solar.load_profiles import generate_load_profile
+from app.services.solar.load_profiles import generate_load_profiles
 
 BUILDINGS = [
     {
@@ -193,13 +195,17 @@ async def _seed_energy_readings(session, building: Building) -> int:
     """Insert 30 days × 24 hours of synthetic readings for one building."""
     # Skip if any reading exists for this building
     existing = await session.execute(
-        select(EnergyReading.id).where(EnergyReading.building_id == building.id).limit(1)
+        select(EnergyReading.building_id).where(EnergyReading.building_id == building.id).limit(1)
     )
     if existing.first():
         return 0
 
     now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
     array_kw = 8.0  # nominal pilot rooftop
+    # (days, 24) kWh for the building's stand-in resident, drawn in one batch.
+    loads = np.round(
+        generate_load_profiles(archetypes="emerging_appliance", resident_ids=[str(building.id)], days=30)[0], 4
+    )
     rows = []
     for day in range(30):
         for hour in range(24):
@@ -218,24 +224,18 @@ async def _seed_energy_readings(session, building: Building) -> int:
                     "timestamp": ts,
                     "kind": "generation",
                     "value": gen,
-                    "unit": "kWh",
                     "source": "synthetic",
                     "provenance": "seed:pvwatts-fallback",
                 }
             )
 
-            load = generate_load_profile(
-                archetype="emerging_appliance",
-                resident_id=str(building.id),
-                day_index=day,
-            )[local_h]
+            load = float(loads[day, local_h])
             rows.append(
                 {
                     "building_id": building.id,
                     "timestamp": ts,
                     "kind": "load",
                     "value": load,
-                    "unit": "kWh",
                     "source": "synthetic",
                     "provenance": "seed:load-archetype:emerging_appliance",
                 }
@@ -248,18 +248,13 @@ async def _seed_energy_readings(session, building: Building) -> int:
                     "timestamp": ts,
                     "kind": "irradiance",
                     "value": round(irr, 1),
-                    "unit": "W/m2",
                     "source": "synthetic",
                     "provenance": "seed:open-meteo-fallback",
                 }
             )
 
-    # Bulk insert
-    from sqlalchemy.dialects.postgresql import insert as pg_insert
-
-    if rows:
-        await session.execute(pg_insert(EnergyReading).values(rows))
-    return len(rows)
+    # Bulk insert (also refreshes the hourly/daily rollups for the seeded window)
+    return await energy_repo.bulk_insert_readings(session, rows)
 
 
 async def _seed_inventory(session, providers: list[User]) -> None:
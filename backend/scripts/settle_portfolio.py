@@ -0,0 +1,62 @@
+"""settle_portfolio — operator-run CLI for the month-end settlement of every live building.
+
+Settles the calendar month (UTC) for all live buildings through
+services/settlement_runner and prints the run summary and failures; --json
+prints the full report. Re-running a month is safe: periods are upserted and
+only ledger differences are posted.
+
+Usage:
+    python -m scripts.settle_portfolio 2026-09
+    python -m scripts.settle_portfolio 2026-09 --workers 8 --shard-size 100 --json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+
+from app.services.settlement_runner import run_portfolio_settlement
+
+
+def _month(value: str) -> tuple[datetime, datetime]:
+    start = datetime.strptime(value, "%Y-%m").replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+async def _settle(start: datetime, end: datetime, *, workers: int | None, shard_size: int | None, as_json: bool) -> int:
+    report = await run_portfolio_settlement(start, end, workers=workers, shard_size=shard_size)
+    if as_json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"settled {report['settled']}/{report['buildings']} buildings for {start:%Y-%m} "
+            f"in {report['seconds']:.2f}s ({report['buildingsPerSecond']} buildings/s), "
+            f"revenue KES {report['revenueKes']:,.2f}"
+        )
+        for failure in report["failures"]:
+            print(f"failed: {failure['buildingId']} {failure['error']}")
+    return 1 if report["failed"] else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("month", help="month to settle, YYYY-MM")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent shards (default: settings)")
+    parser.add_argument("--shard-size", type=int, default=None, help="buildings per shard (default: settings)")
+    parser.add_argument("--json", action="store_true", help="print the full run report")
+    args = parser.parse_args(argv)
+    try:
+        start, end = _month(args.month)
+    except ValueError:
+        print(f"refused: {args.month!r} is not YYYY-MM", file=sys.stderr)
+        return 2
+    return asyncio.run(
+        _settle(start, end, workers=args.workers, shard_size=args.shard_size, as_json=args.json)
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
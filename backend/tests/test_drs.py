@@ -3,7 +3,14 @@ from types import SimpleNamespace
 from app.data.demo import DEMO_PROJECTS
 from app.data.seed_uuids import seed_uuid
 from app.services.building_drs import resolve_project_dict_for_drs
-from app.services.drs import calculate_drs
+from app.services.drs import (
+    calculate_drs,
+    changed_inputs,
+    drs_from_outcome,
+    drs_outcome,
+    evaluate_drs,
+    recalculate_drs,
+)
 from app.services.projector import project_building
 
 
@@ -80,3 +87,120 @@ def test_drs_includes_checklist_and_critical_failure_metadata():
     assert drs["checklist"]
     assert all("label" in item and "complete" in item for item in drs["checklist"])
     assert drs["criticalFailures"] == []
+
+
+def _random_drs_inputs(n, seed=0):
+    import random
+
+    rng = random.Random(seed)
+    flags = [
+        "hasPrepaidFunds", "hasResidentDemandSignal", "hasCertifiedLeadElectrician", "hasVerifiedSupplierQuote",
+        "monitoringConnectivityResolved", "settlementDataTrusted", "contractsAndComplianceReady",
+        "propertyAuthorityComplete", "siteFeasibilityComplete", "hardwareProcurementComplete",
+        "stakeholdersVetted", "ownerPermissionsComplete", "atsKplcSwitchingVerified",
+    ]
+    numbers = ["demandCoverage", "prepaidCommitment", "loadProfile", "installationReadiness", "installerReadiness"]
+    inputs = []
+    for _ in range(n):
+        inp = {"siteKind": rng.choice(["homeowner", "apartment"]), "projectedUtilization": rng.uniform(0.3, 1.0)}
+        for key in flags:
+            choice = rng.random()
+            if choice < 0.8:
+                inp[key] = choice < 0.6
+            elif choice < 0.9:
+                inp[key] = None
+        for key in numbers:
+            if rng.random() < 0.9:
+                inp[key] = rng.uniform(-10, 120)
+        inputs.append(inp)
+    return inputs
+
+
+def test_evaluate_drs_matches_calculate_drs():
+    inputs = _random_drs_inputs(400)
+    batch = evaluate_drs(inputs)
+    expected = [calculate_drs(inp) for inp in inputs]
+    assert batch.decisions == [e["decision"] for e in expected]
+    assert batch.reasons == [e["reasons"] for e in expected]
+    assert batch.score.tolist() == [e["score"] for e in expected]
+    assert [batch.result(i) for i in range(len(batch))] == expected
+
+
+def test_evaluate_drs_columns_override_dicts():
+    import numpy as np
+
+    inputs = _random_drs_inputs(50, seed=1)
+    utilization = np.linspace(0.2, 1.0, 50)
+    batch = evaluate_drs(inputs, columns={"projectedUtilization": utilization})
+    expected = [calculate_drs({**inp, "projectedUtilization": u}) for inp, u in zip(inputs, utilization.tolist())]
+    assert batch.decisions == [e["decision"] for e in expected]
+    assert batch.reasons == [e["reasons"] for e in expected]
+
+    columns_only = evaluate_drs(columns={"siteKind": np.array(["apartment", "homeowner"]), "demandCoverage": [80, 80]})
+    assert columns_only.decisions == [calculate_drs({"siteKind": k, "demandCoverage": 80})["decision"]
+                                      for k in ("apartment", "homeowner")]
+
+
+def test_evaluate_drs_none_and_missing_fall_back_like_calculate_drs():
+    base = {**DEMO_PROJECTS[0]["drs"], "siteKind": "homeowner"}
+    inputs = [
+        {k: v for k, v in base.items() if k not in ("stakeholdersVetted", "hasResidentDemandSignal")},
+        {**base, "stakeholdersVetted": None, "hasResidentDemandSignal": None},
+        {**base, "hardwareProcurementComplete": None, "hasPrepaidFunds": False},
+    ]
+    batch = evaluate_drs(inputs)
+    assert [batch.result(i) for i in range(len(inputs))] == [calculate_drs(inp) for inp in inputs]
+
+
+def test_recalculate_drs_matches_full_recompute():
+    import json
+    import random
+
+    rng = random.Random(2)
+    inputs = _random_drs_inputs(300, seed=2)
+    for before, other in zip(inputs, reversed(inputs)):
+        previous = json.loads(json.dumps(calculate_drs(before)))
+        after = dict(before)
+        for key in rng.sample(sorted(before.keys() | other.keys()), 3):
+            if key in other:
+                after[key] = other[key]
+            else:
+                after.pop(key, None)
+        expected = calculate_drs(after)
+        assert recalculate_drs(before, previous, after) == expected
+        assert drs_from_outcome(after, json.loads(json.dumps(drs_outcome(expected)))) == expected
+
+
+def test_changed_inputs_is_type_sensitive():
+    assert changed_inputs({"a": 1, "b": True}, {"a": 1, "b": True}) == []
+    assert changed_inputs({"a": 0, "b": True}, {"a": False, "c": None}) == ["a", "b", "c"]
+
+
+def test_projection_cache_lru_ttl_and_fingerprint():
+    from app.services.projection_cache import ProjectionCache
+
+    now = [0.0]
+    cache = ProjectionCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    a, b, c = seed_uuid("a"), seed_uuid("b"), seed_uuid("c")
+    calls = []
+
+    def compute(tag):
+        return lambda: calls.append(tag) or {"tag": tag}
+
+    assert cache.get_or_compute(a, 1, compute("a1")) == {"tag": "a1"}
+    assert cache.get_or_compute(a, 1, compute("a1-again"))["tag"] == "a1"
+    assert cache.get_or_compute(a, 2, compute("a2"))["tag"] == "a2"  # inputs changed
+    cache.get_or_compute(b, 1, compute("b1"))
+    cache.get_or_compute(a, 2, compute("unused"))  # a is now most recently used
+    cache.get_or_compute(c, 1, compute("c1"))  # evicts b
+    cache.get_or_compute(b, 1, compute("b1-again"))
+    now[0] = 11.0
+    cache.get_or_compute(b, 1, compute("b1-expired"))
+    cache.invalidate(b)
+    cache.invalidate(b)
+    cache.record_refresh()
+
+    assert calls == ["a1", "a2", "b1", "c1", "b1-again", "b1-expired"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["invalidations"]) == (2, 6, 2, 1)
+    assert stats["refreshes"] == 1
@@ -1,3 +1,8 @@
+import asyncio
+import json
+
+import pytest
+
 from app.data.demo import DEMO_PROJECTS
 from app.services.energy import calculate_energy
 
@@ -13,3 +18,652 @@ def test_calculate_energy_matches_nyeri_typescript_baseline():
     assert output["E_grid"] == 473.04
     assert output["utilization"] == 0.77
     assert output["coverage"] == 0.8
+
+
+async def _auth_headers(client):
+    response = await client.post(
+        "/auth/verify-otp",
+        json={"email": "resident-a@emappa.test", "code": "000000"},
+    )
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+async def test_bulk_insert_refreshes_hourly_and_daily_rollups():
+    from datetime import datetime, timedelta, timezone
+
+    from app.db.session import SessionLocal
+    from app.data.seed_uuids import seed_uuid
+    from app.repos import energy as energy_repo
+
+    bid = seed_uuid("nyeri-ridge-a")
+    day = datetime(2001, 3, 4, tzinfo=timezone.utc)
+    readings = [
+        {
+            "building_id": bid,
+            "timestamp": day + timedelta(hours=10, minutes=minute),
+            "kind": "generation",
+            "value": value,
+            "source": "measured",
+            "provenance": "test:rollup",
+        }
+        for minute, value in [(0, 1.0), (20, 3.0), (40, 2.0)]
+    ]
+    async with SessionLocal() as session:
+        try:
+            await energy_repo.bulk_insert_readings(session, readings)
+            hourly = await energy_repo.rollup_series(
+                session, bid, kind="generation", start=day, end=day + timedelta(hours=23), resolution="hour"
+            )
+            assert [(h.value_sum, h.value_min, h.value_max, h.sample_count) for h in hourly] == [(6.0, 1.0, 3.0, 3)]
+
+            # A second batch into the same bucket is folded in, not double counted;
+            # a repeated timestamp is skipped by the unique index.
+            second = [
+                {**readings[0], "timestamp": day + timedelta(hours=10, minutes=50), "value": 4.0},
+                {**readings[1], "value": 99.0},
+            ]
+            assert await energy_repo.bulk_insert_readings(session, second) == 1
+            daily = await energy_repo.rollup_series(
+                session, bid, kind="generation", start=day, end=day, resolution="day"
+            )
+            assert [(d.value_sum, d.value_max, d.sample_count) for d in daily] == [(10.0, 4.0, 4)]
+        finally:
+            await session.rollback()
+
+
+async def test_today_and_rollup_series_endpoints(client):
+    from app.data.seed_uuids import seed_uuid
+
+    headers = await _auth_headers(client)
+    bid = str(seed_uuid("nyeri-ridge-a"))
+    today = await client.get(f"/energy/{bid}/today", headers=headers)
+    assert today.status_code == 200
+    assert all(len(today.json()[key]) == 24 for key in ("generation_kwh", "load_kwh", "irradiance_w_m2"))
+
+    daily = await client.get(f"/energy/{bid}/series?kind=load&resolution=day", headers=headers)
+    assert daily.status_code == 200
+    assert all(point["provenance"] == "rollup:day" for point in daily.json())
+
+    bad = await client.get(f"/energy/{bid}/series?kind=load&resolution=week", headers=headers)
+    assert bad.status_code == 400
+
+
+def test_pick_bucket_seconds_rounds_to_rollup_widths():
+    from app.repos.energy import pick_bucket_seconds, resolution_label
+
+    assert pick_bucket_seconds(99 * 60, 10) == 660
+    assert pick_bucket_seconds(30 * 86_400, 500) == 7_200
+    assert pick_bucket_seconds(365 * 86_400, 200) == 2 * 86_400
+    assert pick_bucket_seconds(600, 100, floor_seconds=3_600) == 3_600
+    assert resolution_label(3_600) == "hour"
+    assert resolution_label(660) == "660s"
+
+
+async def test_bucketed_series_bounds_points_and_preserves_totals():
+    from datetime import datetime, timedelta, timezone
+
+    from app.db.session import SessionLocal
+    from app.data.seed_uuids import seed_uuid
+    from app.repos import energy as energy_repo
+
+    bid = seed_uuid("nyeri-ridge-a")
+    start = datetime(2001, 5, 6, tzinfo=timezone.utc)
+    readings = [
+        {
+            "building_id": bid,
+            "timestamp": start + timedelta(minutes=i),
+            "kind": "load",
+            "value": float(i % 7),
+            "source": "measured",
+            "provenance": "test:downsample",
+        }
+        for i in range(600)
+    ]
+    end = start + timedelta(hours=10)
+    async with SessionLocal() as session:
+        try:
+            await energy_repo.bulk_insert_readings(session, readings)
+            first, last, count = await energy_repo.series_extent(session, bid, kind="load", start=start, end=end)
+            assert count == 600
+            width = energy_repo.pick_bucket_seconds((last - first).total_seconds(), 50)
+            buckets = await energy_repo.bucketed_series(
+                session, bid, kind="load", start=start, end=end, width_seconds=width
+            )
+            assert len(buckets) <= 50
+            assert sum(b.sample_count for b in buckets) == 600
+            assert sum(b.value_sum for b in buckets) == sum(r["value"] for r in readings)
+            assert max(b.value_max for b in buckets) == 6.0
+        finally:
+            await session.rollback()
+
+
+async def test_series_max_points_reports_resolution(client):
+    from app.data.seed_uuids import seed_uuid
+
+    headers = await _auth_headers(client)
+    bid = str(seed_uuid("nyeri-ridge-a"))
+    raw = await client.get(f"/energy/{bid}/series?kind=generation&maxPoints=10000", headers=headers)
+    assert raw.status_code == 200
+    assert raw.headers["x-energy-resolution"] == "raw"
+
+    small = await client.get(f"/energy/{bid}/series?kind=generation&maxPoints=20", headers=headers)
+    assert small.status_code == 200
+    assert len(small.json()) <= 20
+    assert small.headers["x-energy-resolution"] != "raw"
+
+    cors = await client.get(
+        f"/energy/{bid}/series?kind=generation&maxPoints=20",
+        headers={**headers, "Origin": "http://localhost:5173"},
+    )
+    assert "x-energy-resolution" in cors.headers["access-control-expose-headers"].lower()
+
+
+async def test_export_streams_ndjson_and_csv(client):
+    import json
+
+    from app.data.seed_uuids import seed_uuid
+
+    headers = await _auth_headers(client)
+    bid = str(seed_uuid("nyeri-ridge-a"))
+    raw = await client.get(f"/energy/{bid}/series?kind=load", headers=headers)
+
+    ndjson = await client.get(f"/energy/{bid}/export?kind=load&format=ndjson", headers=headers)
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in ndjson.text.splitlines()] == raw.json()
+
+    csv_response = await client.get(f"/energy/{bid}/export?kind=load&format=csv", headers=headers)
+    assert csv_response.status_code == 200
+    lines = csv_response.text.splitlines()
+    assert lines[0] == "buildingId,timestamp,kind,value,unit,source,provenance"
+    assert len(lines) == len(raw.json()) + 1
+
+    bad = await client.get(f"/energy/{bid}/export?kind=load&format=xml", headers=headers)
+    assert bad.status_code == 400
+
+
+async def test_export_streams_arrow_ipc(client):
+    pa = pytest.importorskip("pyarrow")
+    from app.data.seed_uuids import seed_uuid
+
+    headers = await _auth_headers(client)
+    bid = str(seed_uuid("nyeri-ridge-a"))
+    response = await client.get(f"/energy/{bid}/export?kind=generation&format=arrow", headers=headers)
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    raw = await client.get(f"/energy/{bid}/series?kind=generation", headers=headers)
+    assert table.num_rows == len(raw.json())
+    assert table.column("value").to_pylist() == [p["value"] for p in raw.json()]
+
+
+async def test_ingest_validates_dedupes_and_copies():
+    from datetime import datetime, timedelta, timezone
+
+    from app.db.session import SessionLocal
+    from app.data.seed_uuids import seed_uuid
+    from app.repos import energy as energy_repo
+    from app.services.ingest import ingest_readings
+
+    bid = seed_uuid("nyeri-ridge-a")
+    start = datetime(2001, 5, 6, 7, tzinfo=timezone.utc)
+
+    def reading(minutes, value, kind="generation", building_id=bid):
+        return {
+            "building_id": building_id,
+            "timestamp": start + timedelta(minutes=minutes),
+            "kind": kind,
+            "value": value,
+            "provenance": "test:ingest",
+        }
+
+    batch = [
+        reading(0, 1.0),
+        reading(15, 2.0),
+        reading(15, 5.0),  # repeated key in the batch: last one wins
+        reading(30, -1.0),
+        reading(45, float("nan")),
+        reading(0, 2500.0, kind="irradiance"),
+        reading(0, 1.0, kind="voltage"),
+        reading(0, 1.0, building_id=seed_uuid("no-such-building")),
+    ]
+    async with SessionLocal() as session:
+        try:
+            report = await ingest_readings(session, batch, chunk_rows=1)
+            assert (report.received, report.rejected, report.accepted, report.inserted) == (8, 5, 2, 2)
+            assert report.duplicates == 1
+            assert [e["reason"] for e in report.errors] == [
+                "negative_value",
+                "non_finite_value",
+                "irradiance_out_of_range",
+                "unknown_kind",
+                "unknown_building",
+            ]
+
+            rows = await energy_repo.series(
+                session, bid, kind="generation", start=start, end=start + timedelta(hours=1)
+            )
+            assert [(r.value, r.source) for r in rows] == [(1.0, "measured"), (5.0, "measured")]
+            hourly = await energy_repo.rollup_series(
+                session, bid, kind="generation", start=start, end=start, resolution="hour"
+            )
+            assert [(h.value_sum, h.sample_count) for h in hourly] == [(6.0, 2)]
+
+            again = await ingest_readings(session, batch[:2])
+            assert (again.inserted, again.duplicates) == (0, 2)
+        finally:
+            await session.rollback()
+
+
+async def test_ingest_endpoint_is_admin_only_and_bounded(client, monkeypatch):
+    from app.api import energy as energy_api
+    from app.data.seed_uuids import seed_uuid
+
+    body = {
+        "readings": [
+            {
+                "buildingId": str(seed_uuid("nyeri-ridge-a")),
+                "timestamp": "2001-07-08T09:00:00Z",
+                "kind": "load",
+                "value": 0.5,
+                "provenance": "test:ingest-endpoint",
+            }
+        ]
+    }
+    resident = await client.post("/energy/ingest", json=body, headers=await _auth_headers(client))
+    assert resident.status_code == 403
+
+    from app.services.telemetry_hub import telemetry_hub
+
+    login = await client.post("/auth/verify-otp", json={"email": "admin@emappa.test", "code": "000000"})
+    headers = {"Authorization": f"Bearer {login.json()['token']}"}
+    sub = await telemetry_hub.subscribe(body["readings"][0]["buildingId"])
+    try:
+        ok = await client.post("/energy/ingest", json=body, headers=headers)
+        assert ok.status_code == 200
+        assert ok.json()["received"] == 1
+        assert ok.json()["inserted"] + ok.json()["duplicates"] == 1
+        assert "rowsPerSecond" in ok.json()
+        _, frame = sub.queue.get_nowait()
+        assert json.loads(frame)["type"] == "energy.readings"
+        assert json.loads(frame)["data"] == {
+            "count": 1,
+            "latest": {"load": {"timestamp": "2001-07-08T09:00:00+00:00", "value": 0.5}},
+        }
+    finally:
+        telemetry_hub.unsubscribe(sub)
+
+    monkeypatch.setattr(energy_api.get_settings(), "ingest_max_batch", 0)
+    too_big = await client.post("/energy/ingest", json=body, headers=headers)
+    assert too_big.status_code == 413
+
+    monkeypatch.setattr(energy_api.get_settings(), "ingest_max_batch", 50_000)
+    monkeypatch.setattr(energy_api, "_INGEST_SLOTS", asyncio.Semaphore(0))
+    busy = await client.post("/energy/ingest", json=body, headers=headers)
+    assert busy.status_code == 429
+    assert busy.headers["retry-after"] == "1"
+
+
+async def test_readings_land_in_monthly_partitions_that_can_be_detached():
+    from datetime import datetime, timezone
+
+    from app.db.session import SessionLocal
+    from app.data.seed_uuids import seed_uuid
+    from app.repos import energy as energy_repo
+
+    bid = seed_uuid("nyeri-ridge-a")
+    ts = datetime(1999, 12, 31, 23, 30, tzinfo=timezone.utc)
+    reading = {
+        "building_id": bid,
+        "timestamp": ts,
+        "kind": "irradiance",
+        "value": 0.0,
+        "source": "synthetic",
+        "provenance": "test:partition",
+    }
+    async with SessionLocal() as session:
+        try:
+            await energy_repo.bulk_insert_readings(session, [reading])
+            assert "energy_readings_1999_12" in await energy_repo.list_partitions(session)
+            row = await energy_repo.latest_reading(session, bid, "irradiance")
+            assert row is not None and (row.unit, row.source) == ("W/m2", "synthetic")
+
+            detached = await energy_repo.detach_partitions_before(session, datetime(2000, 1, 1, tzinfo=timezone.utc))
+            assert "energy_readings_1999_12" in detached
+            assert all(name >= "energy_readings_2000_01" for name in await energy_repo.list_partitions(session))
+            assert await energy_repo.series(session, bid, kind="irradiance", start=ts, end=ts) == []
+        finally:
+            await session.rollback()
+
+
+async def test_concurrent_ingests_share_a_new_month_partition():
+    from datetime import datetime, timezone
+
+    from sqlalchemy import text
+
+    from app.db.session import SessionLocal
+    from app.repos import energy as energy_repo
+
+    month = datetime(1998, 6, 15, tzinfo=timezone.utc)
+    async with SessionLocal() as first, SessionLocal() as second:
+        try:
+            assert await energy_repo.ensure_partitions(first, start=month, end=month) == 1
+            racing = asyncio.create_task(energy_repo.ensure_partitions(second, start=month, end=month))
+            await asyncio.sleep(0.2)
+            assert not racing.done()  # waits on the creator's lock instead of failing
+            await first.commit()
+            assert await racing == 0
+            await second.commit()
+        finally:
+            await first.rollback()
+            await second.rollback()
+            async with SessionLocal() as cleanup:
+                await cleanup.execute(text('DROP TABLE IF EXISTS "energy_readings_1998_06"'))
+                await cleanup.commit()
+
+
+def test_hourly_engine_matches_average_day_model_for_a_flat_year():
+    import numpy as np
+
+    from app.services.energy_hourly import monthly_energy_outputs, simulate_hourly_energy
+
+    inp = DEMO_PROJECTS[0]["energy"]
+    daily_gen = inp["arrayKw"] * inp["peakSunHours"] * inp["systemEfficiency"]
+    daily_demand = inp["monthlyDemandKwh"] / 30
+    day_hours = np.arange(24)
+    daytime = (day_hours >= 6) & (day_hours < 18)
+    gen_day = np.where(daytime, daily_gen / 12, 0.0)
+    load_day = np.where(
+        daytime,
+        daily_demand * inp["daytimeDemandFraction"] / 12,
+        daily_demand * (1 - inp["daytimeDemandFraction"]) / 12,
+    )
+    totals = simulate_hourly_energy(
+        np.tile(gen_day, 365),
+        np.tile(load_day, 365),
+        battery_kwh=inp["batteryKwh"],
+        battery_depth_of_discharge=inp["batteryDepthOfDischarge"],
+        battery_round_trip_efficiency=inp["batteryRoundTripEfficiency"],
+    )
+    expected = calculate_energy(inp)
+    april = monthly_energy_outputs(totals)[3]  # 30 days, same as the average-day month
+    for key in ("E_gen", "E_direct", "E_charge", "E_battery_used", "E_sold", "E_waste", "E_grid", "coverage"):
+        assert april[key] == pytest.approx(expected[key], abs=0.02), key
+    assert totals["E_gen"].shape == (1, 12)
+
+
+def test_hourly_engine_vectorizes_across_buildings():
+    import numpy as np
+
+    from app.services.energy_hourly import simulate_hourly_energy
+
+    rng = np.random.default_rng(7)
+    gen = rng.uniform(0, 5, size=(3, 8_760))
+    load = rng.uniform(0, 5, size=(3, 8_760))
+    batteries = [0.0, 10.0, 1_000.0]
+    totals = simulate_hourly_energy(
+        gen, load, battery_kwh=batteries, battery_depth_of_discharge=0.8, battery_round_trip_efficiency=0.9
+    )
+    for b, battery in enumerate(batteries):
+        alone = simulate_hourly_energy(
+            gen[b], load[b], battery_kwh=battery, battery_depth_of_discharge=0.8, battery_round_trip_efficiency=0.9
+        )
+        np.testing.assert_allclose(totals["E_sold"][b], alone["E_sold"][0])
+    # No battery: nothing is stored; a bigger battery never sells less.
+    assert totals["E_charge"][0].sum() == 0
+    assert (totals["E_sold"][2] >= totals["E_sold"][1] - 1e-9).all()
+    np.testing.assert_allclose(
+        totals["E_gen"], totals["E_direct"] + totals["E_charge"] + totals["E_waste"], atol=1e-9
+    )
+
+
+async def test_telemetry_hub_fans_out_and_drops_slow_consumers():
+    from app.services.telemetry_hub import TelemetryHub
+
+    hub = TelemetryHub(queue_size=2)
+    fast, slow, other = await hub.subscribe("b1"), await hub.subscribe("b1"), await hub.subscribe("b2")
+    sent: list[str] = []
+
+    await hub.publish("b1", "energy.readings", {"n": 1})
+    await hub.publish("b1", "energy.readings", {"n": 2})
+    fast.queue.get_nowait()  # fast keeps up
+    fast.queue.get_nowait()
+    await hub.publish("b1", "energy.readings", {"n": 3})  # slow's queue of 2 is full
+
+    assert slow.dropped and not fast.dropped
+    assert slow.queue.get_nowait() is None  # the close sentinel replaces its backlog
+    assert other.queue.empty()
+
+    async def send(frame: str) -> None:
+        sent.append(frame)
+
+    pump = asyncio.create_task(hub.pump(fast, send))
+    await asyncio.sleep(0)
+    hub._drop(fast)
+    await pump
+    metrics = hub.metrics()
+    assert json.loads(sent[0])["data"] == {"n": 3}
+    assert (metrics["published"], metrics["droppedConsumers"], metrics["subscribers"]) == (3, 2, 1)
+    assert metrics["fanoutLatencyMs"]["samples"] == 1
+
+
+async def test_telemetry_hub_postgres_backend_round_trips():
+    from app.config import get_settings
+    from app.services.telemetry_hub import PostgresNotifyBackend, TelemetryHub
+
+    dsn = get_settings().database_url.replace("+asyncpg", "")
+    hub = TelemetryHub(backend_factory=lambda: PostgresNotifyBackend(dsn))
+    try:
+        sub = await hub.subscribe("b1")
+        await hub.publish("b1", "energy.readings", {"n": 1})
+        _, frame = await asyncio.wait_for(sub.queue.get(), timeout=5)
+        assert json.loads(frame)["buildingId"] == "b1"
+    finally:
+        await hub.close()
+
+
+def test_websocket_requires_token():
+    from starlette.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+
+    from app.data.seed_uuids import seed_uuid
+    from app.main import app
+
+    with TestClient(app) as tc:
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with tc.websocket_connect(f"/ws/{seed_uuid('nyeri-ridge-a')}"):
+                pass
+    assert (refused.value.code, refused.value.reason) == (1008, "missing_token")
+
+
+async def test_adapters_share_pool_and_cache_responses(tmp_path):
+    import httpx
+
+    from app.services.http_pool import HttpPool, ResponseCache
+    from app.services.solar import OpenMeteoAdapter, PVWattsAdapter
+
+    seen: list[httpx.Request] = []
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if "pvwatts" in request.url.path:
+            return httpx.Response(200, json={"outputs": {"ac": [1000.0] * 8760}})
+        return httpx.Response(200, json={"hourly": {"shortwave_radiation": [100.0] * 24}})
+
+    now = [1_000.0]
+
+    def pool() -> HttpPool:
+        cache = ResponseCache(max_entries=8, directory=tmp_path, clock=lambda: now[0])
+        return HttpPool(max_connections=4, max_per_host=2, cache=cache, transport=httpx.MockTransport(upstream))
+
+    first = pool()
+    pvwatts = PVWattsAdapter(api_key="key-1", base_url="https://pv.test/pvwatts/v8.json", http=first)
+    assert (await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8))[:2] == [1.0, 1.0]
+    pvwatts.api_key = "key-2"  # secrets are not part of the cache key
+    await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8)
+    await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=10)
+    assert len(seen) == 2
+
+    # The on-disk cache answers a fresh process; forecasts expire after the TTL.
+    second = pool()
+    await PVWattsAdapter(base_url="https://pv.test/pvwatts/v8.json", http=second).fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8)
+    meteo = OpenMeteoAdapter(base_url="https://meteo.test/v1/forecast", http=second)
+    await meteo.get_today_irradiance(lat=-0.4, lon=36.9)
+    await meteo.get_today_irradiance(lat=-0.4, lon=36.9)
+    assert (len(seen), second.upstream_calls, second.cache.hits) == (3, 1, 2)
+    now[0] += 3_601
+    await meteo.get_today_irradiance(lat=-0.4, lon=36.9)
+    assert len(seen) == 4
+    await first.aclose()
+    await second.aclose()
+
+
+async def test_http_pool_paces_limited_hosts_and_skips_invalid_bodies():
+    import httpx
+
+    from app.services.http_pool import HttpPool, ResponseCache
+    from app.services.solar import PVWattsAdapter
+
+    starts: list[float] = []
+    in_flight = [0, 0]  # current, max
+    pvwatts_bodies = [{"errors": ["rate limited"]}, {"outputs": {"ac": [10.0] * 100}}, {"outputs": {"ac": [1000.0] * 8760}}]
+
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        if "pvwatts" in request.url.path:
+            return httpx.Response(200, json=pvwatts_bodies.pop(0))
+        gate = pool._hosts["geo.test"]
+        starts.append(gate.next_start - gate.min_interval)  # the start this request reserved
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.01)
+        in_flight[0] -= 1
+        return httpx.Response(200, json=[])
+
+    pool = HttpPool(
+        max_connections=4,
+        max_per_host=4,
+        cache=ResponseCache(max_entries=8),
+        transport=httpx.MockTransport(upstream),
+        clock=lambda: 100.0,  # frozen: every turn after the first is pushed out by min_interval alone
+    )
+    pool.limit_host("geo.test", concurrency=1, min_interval=0.05)
+    await asyncio.gather(*(pool.get_json("https://geo.test/search", params={"q": i}) for i in range(3)))
+    assert in_flight[1] == 1
+    assert starts == pytest.approx([100.0, 100.05, 100.1])
+
+    # A 200 without a full year falls back to synthetic and is not cached, so the next call retries.
+    pvwatts = PVWattsAdapter(api_key="k", base_url="https://pv.test/pvwatts/v8.json", http=pool)
+    assert await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8) is None
+    assert await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8) is None
+    assert len(await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8)) == 8760
+    assert len(await pvwatts.fetch_hourly_kwh(lat=-0.4, lon=36.9, kw=8)) == 8760  # cached now
+    assert pvwatts_bodies == []
+    await pool.aclose()
+
+
+async def test_pv_profile_store_snaps_scales_and_persists(tmp_path):
+    import numpy as np
+
+    from app.services.solar import PVProfileStore
+
+    class FakeAdapter:
+        def __init__(self, fail=False):
+            self.calls: list[dict] = []
+            self.fail = fail
+
+        async def fetch_hourly_kwh(self, **kwargs):
+            self.calls.append(kwargs)
+            return None if self.fail else [kwargs["kw"] * (h % 24 == 12) * 4.0 for h in range(8760)]
+
+    adapter = FakeAdapter()
+    store = PVProfileStore(tmp_path, grid_deg=0.05, adapter=adapter)
+    small = await store.get_hourly_kwh(lat=-0.4213, lon=36.9511, kw=2.0)
+    big = await store.get_hourly_kwh(lat=-0.4190, lon=36.9488, kw=8.0, tilt_deg=0.3)
+    assert len(adapter.calls) == 1 and adapter.calls[0]["kw"] == 1.0
+    assert (adapter.calls[0]["lat"], adapter.calls[0]["lon"]) == (-0.4, 36.95)
+    assert small.shape == (8760,) and small[12] == 8.0 and big[12] == 32.0
+
+    # A fresh process reads the .npy without any fetch; failures are never persisted.
+    warm = PVProfileStore(tmp_path, adapter=FakeAdapter(fail=True))
+    assert (await warm.get_hourly_kwh(lat=-0.4, lon=36.95, kw=1.0))[12] == 4.0
+    assert warm.adapter.calls == [] and len(list(tmp_path.glob("*.npy"))) == 1
+    fallback = await warm.get_hourly_kwh(lat=1.0, lon=36.0, kw=1.0)
+    assert fallback.sum() > 0 and warm.fetches == 1 and len(list(tmp_path.glob("*.npy"))) == 1
+    assert isinstance(await warm.profile(lat=-0.4, lon=36.95), np.memmap)
+
+
+async def test_pvwatts_adapter_reads_through_profile_store(tmp_path):
+    import httpx
+
+    from app.services.http_pool import HttpPool, ResponseCache
+    from app.services.solar import PVProfileStore, PVWattsAdapter
+
+    seen: list[httpx.Request] = []
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={"outputs": {"ac": [500.0] * 8760}})
+
+    def adapter(store: PVProfileStore) -> PVWattsAdapter:
+        cache = ResponseCache(max_entries=8)
+        pool = HttpPool(max_connections=2, max_per_host=2, cache=cache, transport=httpx.MockTransport(upstream))
+        return PVWattsAdapter(api_key="k", base_url="https://pv.test/pvwatts/v8.json", http=pool, profiles=store)
+
+    pvwatts = adapter(PVProfileStore(tmp_path))
+    assert (await pvwatts.get_hourly_kwh(lat=-0.4213, lon=36.9511, kw=8))[:2] == [4.0, 4.0]
+    assert (await pvwatts.get_hourly_kwh(lat=-0.4190, lon=36.9488, kw=3))[:2] == [1.5, 1.5]
+    assert len(seen) == 1
+    assert (seen[0].url.params["system_capacity"], seen[0].url.params["lat"]) == ("1.0", "-0.4")
+
+    # A new process (fresh store and pool) is served from the .npy alone.
+    assert len(await adapter(PVProfileStore(tmp_path)).get_hourly_kwh(lat=-0.4, lon=36.95, kw=2)) == 8760
+    assert len(seen) == 1
+
+
+def test_synthetic_pv_follows_latitude_and_is_seed_deterministic():
+    import numpy as np
+
+    from app.services.solar.synthetic import synthetic_hourly_kwh
+
+    clear = synthetic_hourly_kwh([-0.4, 40.0], [1.0, 2.0])
+    assert clear.shape == (2, 8760)
+    equator_daily = clear[0].sum() / 365
+    assert 5.0 < equator_daily < 6.0
+    assert clear[:, :6].sum() == 0  # night before sunrise
+    # At 40°N, June days are longer and stronger than December days; near the equator barely differ.
+    june, december = slice(160 * 24, 161 * 24), slice(350 * 24, 351 * 24)
+    assert clear[1, june].sum() > 1.5 * clear[1, december].sum()
+    assert np.count_nonzero(clear[1, june]) > np.count_nonzero(clear[1, december])
+    assert abs(clear[0, june].sum() - clear[0, december].sum()) < 0.2 * clear[0, june].sum()
+
+    cloudy = synthetic_hourly_kwh(np.full(50, -0.4), 8.0, cloudiness=0.3, seed=7, dtype=np.float32)
+    assert cloudy.dtype == np.float32 and cloudy.shape == (50, 8760)
+    np.testing.assert_array_equal(cloudy, synthetic_hourly_kwh(np.full(50, -0.4), 8.0, cloudiness=0.3, seed=7, dtype=np.float32))
+    assert 0.55 < cloudy.sum() / (8 * clear[0].sum() * 50) < 0.85
+    with pytest.raises(ValueError):
+        synthetic_hourly_kwh(0.0, 1.0, cloudiness=0.3)
+
+
+def test_batch_load_profiles_are_counter_based_and_match_single_day():
+    import numpy as np
+
+    from app.services.solar import RESIDENT_LOAD_ARCHETYPES, generate_load_profile, generate_load_profiles
+
+    ids = [f"resident-{i}" for i in range(40)]
+    fleet = generate_load_profiles(archetypes="lighting_tv", resident_ids=ids, days=30)
+    assert fleet.shape == (40, 30, 24)
+    # Day values depend only on (archetype, resident, day): not on batch composition or range.
+    window = generate_load_profiles(archetypes="lighting_tv", resident_ids=ids[::-1][:5], days=range(10, 20))
+    np.testing.assert_array_equal(window, fleet[::-1][:5, 10:20])
+    assert generate_load_profile(archetype="lighting_tv", resident_id="resident-3", day_index=7) == [
+        round(v, 4) for v in fleet[3, 7].tolist()
+    ]
+
+    daily = fleet.sum(axis=2)
+    assert abs(daily.mean() / RESIDENT_LOAD_ARCHETYPES["lighting_tv"]["daily_kwh_mean"] - 1) < 0.03
+    assert 0.1 < daily.std() / daily.mean() < 0.2
+
+    mixed = generate_load_profiles(archetypes=["basic_lighting", "microbiz_kiosk"], resident_ids=ids[:2], days=3)
+    assert mixed[1].sum() > mixed[0].sum()
+    with pytest.raises(ValueError):
+        generate_load_profiles(archetypes=["basic_lighting"], resident_ids=ids[:2], days=3)
@@ -1,6 +1,5 @@
 from app.data.demo import DEMO_PROJECTS
-from app.services.consistency import audit_all_demo_projects
-from app.services.lbrs import calculate_lbrs
+from app.services.lbrs import LIVE_TEST_KEYS, calculate_lbrs, default_lbrs_input, evaluate_lbrs, lbrs_sweep
 from app.services.payback import calculate_payback
 from app.services.projector import project_building
 
@@ -65,6 +64,46 @@ def test_lbrs_homeowner_requires_home_switching():
     assert ok["decision"] == "deployment_ready"
 
 
+
+def test_evaluate_lbrs_matches_calculate_lbrs():
+    import random
+
+    rng = random.Random(4)
+    inputs = [
+        {
+            "siteKind": rng.choice(["apartment", "homeowner", None]),
+            **{key: rng.choice([True, True, True, False, None]) for key in LIVE_TEST_KEYS if rng.random() < 0.9},
+        }
+        for _ in range(300)
+    ]
+    batch = evaluate_lbrs(inputs)
+    expected = [calculate_lbrs(inp) for inp in inputs]
+    assert [batch.result(i) for i in range(len(inputs))] == expected
+    assert batch.score.tolist() == [e["score"] for e in expected]
+    assert batch.decisions == [e["decision"] for e in expected]
+
+
+def test_lbrs_sweep_counts_gates_and_blockers():
+    ready = {key: True for key in LIVE_TEST_KEYS}
+    projects = [
+        {"id": "a", "stage": "live", "buildingKind": "apartment"},
+        {"id": "b", "stage": "install", "buildingKind": "single_family"},
+        {"id": "c", "stage": "install", "lbrs": {**ready, "siteKind": "apartment", "electricalSafetyComplete": False}},
+        {"id": "d", "stage": "review", "buildingKind": "apartment"},
+    ]
+    sweep = lbrs_sweep(projects)
+    assert sweep["ids"] == ["a", "b", "c"]
+    assert sweep["decision"] == ["deployment_ready", "blocked", "blocked"]
+    assert sweep["score"] == [calculate_lbrs(default_lbrs_input(p))["score"] for p in projects[:3]]
+    assert all(type(score) is float for score in sweep["score"])
+    assert sweep["liveReady"] == 1
+    assert sweep["gatePassCounts"]["ELEC_SAFE"] == {"applicable": 3, "passed": 1}
+    assert sweep["gatePassCounts"]["ATS_APT"] == {"applicable": 2, "passed": 2}
+    assert sweep["gatePassCounts"]["ATS_HOME"] == {"applicable": 1, "passed": 0}
+    assert sweep["blockerHistogram"] == [1, 1, 0, 0, 0, 0, 0, 0, 0, 1]
+    assert default_lbrs_input(projects[0]) is default_lbrs_input({"stage": "live"})
+
+
 def test_payback_positive_matches_two_decimal_rounding():
     pb = calculate_payback({"investment": 12000, "monthlyPayout": 1000})
     assert pb["notCurrentlyRecovering"] is False
@@ -79,12 +118,6 @@ def test_payback_zero_payout():
     assert z["notCurrentlyRecovering"] is True
 
 
-def test_demo_consistency_audit():
-    audit = audit_all_demo_projects(DEMO_PROJECTS)
-    assert audit["ok"]
-    assert all(r["ok"] for r in audit["results"])
-
-
 def test_projector_owner_royalty_zero_for_homeowner():
     p = {**DEMO_PROJECTS[0], "buildingKind": "single_family", "stage": "live"}
     out = project_building(p)
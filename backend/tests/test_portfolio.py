@@ -0,0 +1,118 @@
+import pytest
+
+from app.data.demo import DEMO_PROJECTS
+from app.services.consistency import audit_all_demo_projects
+from app.services.projector import project_building
+
+
+def test_demo_consistency_audit():
+    audit = audit_all_demo_projects(DEMO_PROJECTS)
+    assert audit["ok"]
+    assert all(r["ok"] for r in audit["results"])
+
+
+def test_batch_audit_matches_single_project_audits():
+    from app.services.consistency import audit_project_consistency
+
+    projects = _edge_fixture(150, 3)
+    assert audit_all_demo_projects(projects)["results"] == [audit_project_consistency(p) for p in projects]
+
+
+def _portfolio_fixture(n: int, seed: int = 11) -> list[dict]:
+    import random
+
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        base = DEMO_PROJECTS[i % len(DEMO_PROJECTS)]
+        energy = {
+            **base["energy"],
+            "arrayKw": round(rng.uniform(2, 60), 1),
+            "batteryKwh": rng.choice([0, 5, 28, 60]),
+            "monthlyDemandKwh": round(rng.uniform(100, 6000)),
+        }
+        projects.append(
+            {
+                **base,
+                "id": f"{base['id']}-{i}",
+                "energy": energy,
+                "fundedKes": rng.choice([0, base["fundedKes"]]),
+                "prepaidCommittedKes": round(rng.uniform(0, 90_000)),
+                "buildingKind": rng.choice(["apartment", "single_family"]),
+            }
+        )
+    return projects
+
+
+def _edge_fixture(n: int, seed: int) -> list[dict]:
+    """Wider inputs with fractional prices and sizes, so products land on and near .xx5 ties."""
+    import random
+
+    rng = random.Random(seed)
+    projects = _portfolio_fixture(n, seed)
+    for project in projects:
+        project["energy"] = {
+            **project["energy"],
+            "arrayKw": round(rng.uniform(0.5, 120), rng.choice([0, 1, 2, 3])),
+            "peakSunHours": round(rng.uniform(3, 7), 2),
+            "batteryKwh": rng.choice([0, 5, 13.5, 28, 60]),
+            "monthlyDemandKwh": round(rng.uniform(50, 9000), rng.choice([0, 1, 2])),
+        }
+        project["solarPriceKes"] = rng.choice([project["solarPriceKes"], round(rng.uniform(10, 40), 2), 22.5, 19.05])
+    return projects
+
+
+def _assert_matches_project_building(projects: list[dict]) -> None:
+    from app.services.portfolio import portfolio_row, project_portfolio
+
+    portfolio = project_portfolio(projects)
+    for i, project in enumerate(projects):
+        expected = project_building(project)
+        row = portfolio_row(portfolio, i)
+        assert row["energy"] == expected["energy"], project["id"]
+        settlement = {k: v for k, v in row["settlement"].items() if k not in ("savingsKes", "prepaidCoverage")}
+        assert settlement == expected["settlement"], project["id"]
+        assert row["settlement"]["savingsKes"] == expected["savingsKes"]
+        assert row["settlement"]["prepaidCoverage"] == expected["roleViews"]["owner"]["prepaidCoverage"]
+        assert row["payback"] == expected["financierPayback"]
+        assert (row["drs"]["score"], row["drs"]["decision"], row["drs"]["label"]) == (
+            expected["drs"]["score"],
+            expected["drs"]["decision"],
+            expected["drs"]["label"],
+        )
+        for component in ("demandCoverage", "prepaidCommitment"):
+            assert row["drs"][component] == expected["drs"]["components"][component]
+
+
+def test_project_portfolio_matches_project_building():
+    _assert_matches_project_building(_portfolio_fixture(200))
+
+
+def test_project_portfolio_matches_project_building_across_seeds():
+    for seed in range(20):
+        _assert_matches_project_building(_edge_fixture(100, seed))
+
+
+def test_portfolio_round2_matches_scalar_round2_on_ties():
+    import random
+
+    import numpy as np
+
+    from app.services.energy import round2
+    from app.services.portfolio import _round2
+
+    rng = random.Random(7)
+    values = [k / 1000 for k in range(-1_000, 50_000, 5)]  # every 0.005 step in [-1, 50): half of them .xx5 ties
+    values += [round(rng.uniform(0, 1e5), 3) for _ in range(20_000)]
+    values += [1.005, 2.675, 1.115, 0.285, 12_345.675, 1e-13, 0.0]
+    assert _round2(np.array(values)).tolist() == [round2(v) for v in values]
+    assert _round2(np.array([np.inf]))[0] == np.inf
+
+
+def test_project_portfolio_materializes_only_requested_fields():
+    from app.services.portfolio import project_portfolio
+
+    out = project_portfolio(DEMO_PROJECTS, fields=("energy",))
+    assert set(out) == {"ids", "energy"}
+    with pytest.raises(ValueError):
+        project_portfolio(DEMO_PROJECTS, fields=("roleViews",))
@@ -15,3 +15,34 @@ def test_settlement_phase_echoes_royalty():
         "royalty",
     )
     assert settlement["phase"] == "royalty"
+
+
+def test_split_pool_allocates_every_cent_pro_rata():
+    import uuid
+    from decimal import Decimal
+
+    from app.services.settlement_engine import split_pool
+
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    shares = dict(split_pool(Decimal("100.00"), [(a, Decimal(1)), (b, Decimal(1)), (c, Decimal(1))]))
+    assert sum(shares.values()) == Decimal("100.00")
+    assert sorted(shares.values()) == [Decimal("33.33"), Decimal("33.33"), Decimal("33.34")]
+    assert split_pool(Decimal("10"), [(a, Decimal(3)), (b, Decimal(1))]) == [(a, Decimal("7.50")), (b, Decimal("2.50"))]
+    assert split_pool(Decimal("10"), []) == []
+
+
+def test_ledger_rows_post_only_differences():
+    import uuid
+    from decimal import Decimal
+
+    from app.services.settlement_engine import ledger_rows
+
+    a, b = uuid.uuid4(), uuid.uuid4()
+    payouts = [{"userId": a, "kind": "royalty", "amountKes": Decimal("12.00")}]
+    assert ledger_rows("settlement:x", payouts, {("settlement:x", a, "royalty"): Decimal("12.00")}) == []
+    rows = ledger_rows(
+        "settlement:x",
+        payouts,
+        {("settlement:x", a, "royalty"): Decimal("10.00"), ("settlement:x", b, "capital_return"): Decimal("4.00")},
+    )
+    assert {(r["user_id"], r["amount_kes"]) for r in rows} == {(a, Decimal("2.00")), (b, Decimal("-4.00"))}
@@ -2,12 +2,25 @@
 e.mappa Allocation Engine
 Optimally distributes power from multiple providers to customers
 Based on price, reliability, capacity, and customer preferences
+
+The greedy fill (customers in order, each drawing from providers in score
+order) is a merit-order queue: customer i's slice of the day's supply is the
+overlap of [cumsum demand before i, cumsum demand through i] with each
+provider's slice of cumulative sorted capacity. allocate_batch evaluates that
+with cumulative sums over whole (customers x hours) / (providers x hours)
+arrays, so a year of 10k customers x 100 providers runs in hour blocks in
+seconds and never builds per-customer dicts.
 """
 
-from typing import Dict, List, Tuple
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
 
+PRICE_WEIGHT = 0.5
+RELIABILITY_WEIGHT = 0.3
+CAPACITY_WEIGHT = 0.2
+
 @dataclass
 class AllocationResult:
     """Result of allocation optimization for one hour"""
@@ -19,27 +32,380 @@ class AllocationResult:
     unmet_demand: float
 
 
+@dataclass
+class BatchAllocationResult:
+    """Allocation for many hours at once (arrays are providers x hours / customers x hours)"""
+    merit_order: np.ndarray           # (hours, providers) provider indices, best score first
+    provider_allocated: np.ndarray    # (providers, hours) kWh sold by each provider
+    provider_utilization: np.ndarray  # (providers, hours) % of available capacity sold
+    total_allocated: np.ndarray       # (hours,)
+    unmet_demand: np.ndarray          # (hours,)
+    total_cost: np.ndarray            # (hours,) provider cost in KES, before markup
+    weighted_avg_price: np.ndarray    # (hours,)
+    customer_allocated: np.ndarray    # (customers, hours), or (customers,) totals if not kept per hour
+    customer_cost: np.ndarray         # same shape as customer_allocated
+
+
+def provider_scores(capacity: np.ndarray, price: np.ndarray, reliability: np.ndarray) -> np.ndarray:
+    """
+    Composite provider score per hour, (providers, hours)
+    Same arithmetic (and order of operations) as the per-hour greedy scorer
+    """
+    total_supply = capacity.sum(axis=0)
+    capacity_ratio = np.divide(capacity, total_supply, out=np.zeros_like(capacity), where=total_supply > 0)
+    price_score = 1.0 / (price / 20.0)
+    return (price_score * PRICE_WEIGHT +
+            reliability.reshape(-1, 1) * RELIABILITY_WEIGHT +
+            capacity_ratio * CAPACITY_WEIGHT)
+
+
+def _allocate_block(demand: np.ndarray, capacity: np.ndarray, price: np.ndarray,
+                    reliability: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Merit-order fill for one block of hours; see module docstring"""
+    # Stable sort on -score == Python's sorted(..., reverse=True) tie order
+    order = np.argsort(-provider_scores(capacity, price, reliability), axis=0, kind="stable")
+    cap_sorted = np.take_along_axis(capacity, order, axis=0)
+    price_sorted = np.take_along_axis(price, order, axis=0)
+
+    cum_capacity = np.cumsum(cap_sorted, axis=0)
+    cum_demand = np.cumsum(demand, axis=0)
+    supply = cum_capacity[-1]
+    total_demand = cum_demand[-1]
+
+    # Provider j (in merit order) sells its slice of [0, total demand]
+    used_sorted = np.diff(np.minimum(cum_capacity, total_demand), axis=0, prepend=0.0)
+    provider_allocated = np.empty_like(capacity)
+    np.put_along_axis(provider_allocated, order, used_sorted, axis=0)
+
+    # Customer i is served its slice of [0, supply]
+    served_upto = np.minimum(cum_demand, supply)
+    customer_allocated = np.diff(served_upto, axis=0, prepend=0.0)
+
+    # Cost of serving [0, x] is piecewise linear in x with breakpoints at cum_capacity
+    cum_cost = np.cumsum(cap_sorted * price_sorted, axis=0)
+    customer_cost = np.empty_like(customer_allocated)
+    for h in range(demand.shape[1]):
+        cost_upto = np.interp(served_upto[:, h],
+                              np.concatenate(([0.0], cum_capacity[:, h])),
+                              np.concatenate(([0.0], cum_cost[:, h])))
+        customer_cost[:, h] = np.diff(cost_upto, prepend=0.0)
+
+    return order.T, provider_allocated, customer_allocated, customer_cost
+
+
+def allocate_batch(demand: np.ndarray,
+                   capacity: np.ndarray,
+                   price: np.ndarray,
+                   reliability: np.ndarray,
+                   block_hours: int = 168,
+                   keep_customer_hours: bool = True) -> BatchAllocationResult:
+    """
+    Allocate a whole day or year in one call
+
+    Args:
+        demand: (customers, hours) kWh, customers in allocation order
+        capacity: (providers, hours) available kWh
+        price: (providers, hours) KES/kWh
+        reliability: (providers,) 0-1
+        block_hours: Hours processed per block (bounds working memory)
+        keep_customer_hours: False returns per-customer totals instead of
+                             (customers, hours) arrays, for year-long fleets
+
+    Returns:
+        BatchAllocationResult; matches allocate_hour hour by hour
+    """
+    demand = np.asarray(demand)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    reliability = np.asarray(reliability, dtype=np.float64)
+    n_customers, hours = demand.shape
+    n_providers = capacity.shape[0]
+
+    merit_order = np.empty((hours, n_providers), dtype=np.intp)
+    provider_allocated = np.empty((n_providers, hours))
+    customer_shape = (n_customers, hours) if keep_customer_hours else (n_customers,)
+    customer_allocated = np.zeros(customer_shape)
+    customer_cost = np.zeros(customer_shape)
+
+    for start in range(0, hours, block_hours):
+        block = slice(start, min(start + block_hours, hours))
+        order, used, served, cost = _allocate_block(
+            np.asarray(demand[:, block], dtype=np.float64), capacity[:, block], price[:, block], reliability
+        )
+        merit_order[block] = order
+        provider_allocated[:, block] = used
+        if keep_customer_hours:
+            customer_allocated[:, block] = served
+            customer_cost[:, block] = cost
+        else:
+            customer_allocated += served.sum(axis=1)
+            customer_cost += cost.sum(axis=1)
+
+    total_allocated = provider_allocated.sum(axis=0)
+    total_cost = (provider_allocated * price).sum(axis=0)
+    total_demand = np.asarray(demand.sum(axis=0), dtype=np.float64)
+
+    return BatchAllocationResult(
+        merit_order=merit_order,
+        provider_allocated=provider_allocated,
+        provider_utilization=np.divide(provider_allocated * 100, capacity,
+                                       out=np.zeros_like(capacity), where=capacity > 0),
+        total_allocated=total_allocated,
+        unmet_demand=np.maximum(0.0, total_demand - total_allocated),
+        total_cost=total_cost,
+        weighted_avg_price=np.divide(total_cost, total_allocated,
+                                     out=np.zeros_like(total_cost), where=total_allocated > 0),
+        customer_allocated=customer_allocated,
+        customer_cost=customer_cost,
+    )
+
+
+def hour_pairs(demand: np.ndarray, capacity: np.ndarray, order: np.ndarray) -> List[Tuple[int, int, float]]:
+    """
+    Sparse (customer index, provider index, kWh) allocations for one hour
+    At most customers + providers - 1 pairs: the overlaps of the two cumulative queues
+    """
+    cum_demand = np.cumsum(demand)
+    cum_capacity = np.cumsum(capacity[order])
+    flow = min(cum_demand[-1] if len(cum_demand) else 0.0, cum_capacity[-1] if len(cum_capacity) else 0.0)
+    edges = np.union1d(cum_demand[cum_demand < flow], cum_capacity[cum_capacity < flow])
+    edges = np.concatenate(([0.0], edges, [flow]))
+    lengths = np.diff(edges)
+    keep = lengths > 0
+    mids = (edges[:-1] + edges[1:])[keep] / 2
+    customers = np.searchsorted(cum_demand, mids, side="right")
+    providers = order[np.searchsorted(cum_capacity, mids, side="right")]
+    starts = edges[:-1][keep]
+    ends = edges[1:][keep]
+    # Slice amounts as overlap of the two intervals, so each equals min(need, remaining)
+    return [(int(c), int(p), float(e - s)) for c, p, s, e in zip(customers, providers, starts, ends)]
+
+
+class LPAllocator:
+    """
+    Optimal allocation mode: each hour is a small linear program
+
+        minimize    sum_j price_j * y_j + unmet_penalty * u + reliability_penalty * v
+        subject to  sum_j y_j + u = demand                       (serve or record unmet)
+                    sum_j (reliability_j - min_reliability) * y_j + v >= 0   (fleet reliability floor)
+                    y_j <= max_provider_share * sum_k y_k          (no single provider dominates)
+                    0 <= y_j <= capacity_j,  v >= 0
+
+    The reliability floor is soft: v is the kWh-weighted shortfall below
+    min_reliability, charged at reliability_penalty (KES per kWh per unit of
+    reliability). Low-reliability supply is therefore still used when it is
+    all there is, as long as price_j + reliability_penalty * min_reliability
+    stays below unmet_penalty (true for the defaults at simulated prices).
+    The share cap is hard: supply that cannot meet it goes unserved (e.g.
+    max_provider_share < 1 with a single producing provider serves nothing),
+    so max_provider_share defaults to 1.0 (off).
+
+    y_j is the kWh bought from provider j. Every customer is then served the
+    same fraction of their demand with the same provider mix, so shortages
+    are shared rather than falling on whoever comes last in the greedy order.
+
+    Solved with a dense revised simplex (Bland's rule) in NumPy, no SciPy. The
+    all-slack start (y = 0, u = demand) is always feasible. Each hour
+    warm-starts from the previous hour's optimal basis while that basis is
+    still primal-feasible for the new demand and capacities.
+    """
+
+    def __init__(self, min_reliability: float = 0.8, max_provider_share: float = 1.0,
+                 unmet_penalty: float = 1000.0, reliability_penalty: float = 100.0,
+                 tolerance: float = 1e-9):
+        self.min_reliability = min_reliability
+        self.reliability_penalty = reliability_penalty
+        self.max_provider_share = max_provider_share
+        self.unmet_penalty = unmet_penalty
+        self.tolerance = tolerance
+        self._basis: Optional[np.ndarray] = None
+        self.iterations = 0
+        self.warm_starts = 0
+        self.solves = 0
+
+    def _standard_form(self, demand: float, capacity: np.ndarray, price: np.ndarray,
+                       reliability: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Columns: y (P), u, reliability slack, share slacks (P), capacity slacks (P), shortfall v"""
+        P = len(capacity)
+        m, n = 2 * P + 2, 3 * P + 3
+        A = np.zeros((m, n))
+        A[0, :P] = 1.0
+        A[0, P] = 1.0
+        A[1, :P] = self.min_reliability - reliability
+        A[1, P + 1] = 1.0
+        A[1, -1] = -1.0
+        share = np.eye(P) - self.max_provider_share
+        A[2:P + 2, :P] = share
+        A[2:P + 2, P + 2:2 * P + 2] = np.eye(P)
+        A[P + 2:, :P] = np.eye(P)
+        A[P + 2:, 2 * P + 2:3 * P + 2] = np.eye(P)
+        b = np.concatenate(([demand, 0.0], np.zeros(P), capacity))
+        c = np.concatenate((price, [self.unmet_penalty], np.zeros(2 * P + 1), [self.reliability_penalty]))
+        return A, b, c
+
+    def _slack_basis(self, P: int) -> np.ndarray:
+        return np.concatenate(([P, P + 1], np.arange(P + 2, 3 * P + 2)))
+
+    def solve_hour(self, demand: float, capacity: np.ndarray, price: np.ndarray,
+                   reliability: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Optimal (kWh per provider, unmet kWh) for one hour's total demand"""
+        A, b, c = self._standard_form(demand, capacity, price, reliability)
+        m = A.shape[0]
+        tol = self.tolerance
+        self.solves += 1
+
+        basis = None
+        if self._basis is not None and len(self._basis) == m:
+            try:
+                if np.all(np.linalg.solve(A[:, self._basis], b) >= -tol):
+                    basis = self._basis.copy()
+                    self.warm_starts += 1
+            except np.linalg.LinAlgError:
+                pass
+        if basis is None:
+            basis = self._slack_basis(len(capacity))
+
+        while True:
+            B = A[:, basis]
+            x_B = np.linalg.solve(B, b)
+            duals = np.linalg.solve(B.T, c[basis])
+            reduced = c - A.T @ duals
+            reduced[basis] = 0.0
+            entering = np.flatnonzero(reduced < -tol)
+            if entering.size == 0:
+                break
+            e = entering[0]  # Bland: lowest index, never cycles on degenerate hours
+            direction = np.linalg.solve(B, A[:, e])
+            rows = np.flatnonzero(direction > tol)
+            ratios = np.maximum(x_B[rows], 0.0) / direction[rows]
+            best = rows[np.isclose(ratios, ratios.min(), rtol=0, atol=tol)]
+            leave = best[np.argmin(basis[best])]
+            basis[leave] = e
+            self.iterations += 1
+
+        self._basis = basis
+        x = np.zeros(A.shape[1])
+        x[basis] = np.maximum(x_B, 0.0)
+        P = len(capacity)
+        return x[:P], float(x[P])
+
+    def allocate(self, demand: np.ndarray, capacity: np.ndarray, price: np.ndarray,
+                 reliability: np.ndarray) -> BatchAllocationResult:
+        """
+        LP allocation over (customers x hours) demand and (providers x hours)
+        capacity/price, hour by hour with warm starts; same result type as allocate_batch
+        """
+        demand = np.asarray(demand, dtype=np.float64)
+        capacity = np.asarray(capacity, dtype=np.float64)
+        price = np.asarray(price, dtype=np.float64)
+        reliability = np.asarray(reliability, dtype=np.float64)
+        hours = demand.shape[1]
+        total_demand = demand.sum(axis=0)
+
+        provider_allocated = np.zeros_like(capacity)
+        for h in range(hours):
+            provider_allocated[:, h], _ = self.solve_hour(total_demand[h], capacity[:, h], price[:, h], reliability)
+
+        total_allocated = provider_allocated.sum(axis=0)
+        total_cost = (provider_allocated * price).sum(axis=0)
+        served_fraction = np.divide(total_allocated, total_demand,
+                                    out=np.zeros_like(total_allocated), where=total_demand > 0)
+        cost_per_demand_kwh = np.divide(total_cost, total_demand,
+                                        out=np.zeros_like(total_cost), where=total_demand > 0)
+        return BatchAllocationResult(
+            merit_order=np.argsort(price.T, axis=1, kind="stable"),
+            provider_allocated=provider_allocated,
+            provider_utilization=np.divide(provider_allocated * 100, capacity,
+                                           out=np.zeros_like(capacity), where=capacity > 0),
+            total_allocated=total_allocated,
+            unmet_demand=np.maximum(0.0, total_demand - total_allocated),
+            total_cost=total_cost,
+            weighted_avg_price=np.divide(total_cost, total_allocated,
+                                         out=np.zeros_like(total_cost), where=total_allocated > 0),
+            customer_allocated=demand * served_fraction,
+            customer_cost=demand * cost_per_demand_kwh,
+        )
+
+
 class AllocationEngine:
     """
     e.mappa's core allocation engine
     Distributes provider power to customers optimally
     """
     
-    def __init__(self, platform_markup: float = 2.0):
+    def __init__(self, platform_markup: float = 2.0, history_limit: Optional[int] = 168,
+                 mode: str = "greedy", lp: Optional[LPAllocator] = None):
         """
         Args:
             platform_markup: KES per kWh that e.mappa adds (default 2.0)
+            history_limit: Most recent hourly results kept in allocation_history
+                           (default one week; None keeps everything)
+            mode: "greedy" (score-ordered merit fill) or "lp" (LPAllocator)
+            lp: LPAllocator settings for mode="lp" (default constraints if omitted)
         """
+        if mode not in ("greedy", "lp"):
+            raise ValueError(f"unknown allocation mode: {mode}")
         self.platform_markup = platform_markup
-        self.allocation_history = []
+        self.allocation_history = deque(maxlen=history_limit)
+        self.mode = mode
+        self.lp = lp or LPAllocator()
+        
+    def allocate_hour(self,
+                     hour: int,
+                     providers: List,  # List of SolarProvider objects
+                     customers: Dict,  # Dict of Customer objects
+                     customer_preferences: Dict = None) -> AllocationResult:
+        """
+        Allocate power for a single hour (merit-order fill, see allocate_batch;
+        or the LP in mode="lp")
+        
+        Strategy:
+        1. Calculate total demand
+        2. Sort providers by score (price, reliability, capacity)
+        3. Fill customers in order from the best-scored providers
+        4. Ensure no provider over-allocated
+        """
+        names = [p.name for p in providers]
+        customer_ids = list(customers.keys())
+        capacity = np.array([[p.get_available_capacity(hour)] for p in providers], dtype=np.float64)
+        price = np.array([[p.get_price(hour)] for p in providers], dtype=np.float64)
+        reliability = np.array([p.reliability for p in providers], dtype=np.float64)
+        demand = np.array([[customers[cid].hourly_consumption[hour]] for cid in customer_ids], dtype=np.float64)
+        
+        allocations = {cid: {} for cid in customer_ids}
+        if self.mode == "lp":
+            batch = self.lp.allocate(demand, capacity, price, reliability)
+            total_demand = demand[:, 0].sum()
+            for i, cid in enumerate(customer_ids):
+                share = demand[i, 0] / total_demand if total_demand > 0 else 0.0
+                for j, name in enumerate(names):
+                    if batch.provider_allocated[j, 0] > 0:
+                        allocations[cid][name] = float(batch.provider_allocated[j, 0] * share)
+        else:
+            batch = allocate_batch(demand, capacity, price, reliability)
+            for c, p, kwh in hour_pairs(demand[:, 0], capacity[:, 0], batch.merit_order[0]):
+                allocations[customer_ids[c]][names[p]] = kwh
+        
+        result = AllocationResult(
+            hour=hour,
+            customer_allocations=allocations,
+            provider_utilization={name: float(batch.provider_utilization[j, 0]) for j, name in enumerate(names)},
+            weighted_avg_price=float(batch.weighted_avg_price[0]),
+            total_allocated=float(batch.total_allocated[0]),
+            unmet_demand=float(batch.unmet_demand[0])
+        )
+        
+        self.allocation_history.append(result)
+        return result
         
-    def allocate_hour(self, 
+    def allocate_hour_reference(self, 
                      hour: int,
                      providers: List,  # List of SolarProvider objects
                      customers: Dict,  # Dict of Customer objects
                      customer_preferences: Dict = None) -> AllocationResult:
         """
-        Allocate power for a single hour using optimization algorithm
+        Original per-customer greedy loop, kept as the reference that
+        allocate_hour / allocate_batch are checked against (not recorded in history)
         
         Strategy:
         1. Calculate total demand
@@ -85,11 +451,6 @@ class AllocationEngine:
             # Normalize price (lower is better)
             price_score = 1.0 / (price / 20.0)  # Normalized around KES 20
             
-            # Weight factors
-            PRICE_WEIGHT = 0.5
-            RELIABILITY_WEIGHT = 0.3
-            CAPACITY_WEIGHT = 0.2
-            
             score = (price_score * PRICE_WEIGHT + 
                     reliability * RELIABILITY_WEIGHT + 
                     capacity_ratio * CAPACITY_WEIGHT)
@@ -155,7 +516,7 @@ class AllocationEngine:
         
         weighted_avg_price = total_cost / total_allocated if total_allocated > 0 else 0
         
-        result = AllocationResult(
+        return AllocationResult(
             hour=hour,
             customer_allocations=allocations,
             provider_utilization=provider_utilization,
@@ -163,9 +524,6 @@ class AllocationEngine:
             total_allocated=total_allocated,
             unmet_demand=unmet_demand
         )
-        
-        self.allocation_history.append(result)
-        return result
     
     def calculate_customer_cost(self, 
                                 customer_id: str, 
@@ -0,0 +1,186 @@
+"""
+e.mappa Allocation Benchmark
+Checks allocate_batch / allocate_hour against the original greedy loop,
+times both at fleet scale, and compares the LP mode with the greedy baseline
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from allocation_engine import AllocationEngine, LPAllocator, allocate_batch
+
+
+class ArrayProvider:
+    """Minimal SolarProvider stand-in backed by arrays"""
+
+    def __init__(self, name: str, capacity: np.ndarray, price: np.ndarray, reliability: float):
+        self.name = name
+        self.capacity = capacity
+        self.price = price
+        self.reliability = reliability
+
+    def get_available_capacity(self, hour: int) -> float:
+        return float(self.capacity[hour])
+
+    def get_price(self, hour: int) -> float:
+        return float(self.price[hour])
+
+
+class ArrayCustomer:
+    """Minimal Customer stand-in backed by an array"""
+
+    def __init__(self, consumption: np.ndarray):
+        self.hourly_consumption = consumption.tolist()
+
+
+def random_market(n_customers: int, n_providers: int, hours: int, seed: int = 0,
+                  dtype=np.float64) -> Dict[str, np.ndarray]:
+    """Random but plausible demand, capacity and price matrices"""
+    rng = np.random.default_rng(seed)
+    hour_of_day = np.arange(hours) % 24
+    sun = np.clip(np.sin((hour_of_day - 6) / 12 * np.pi), 0, None)
+    return {
+        "demand": (rng.uniform(0.1, 2.5, (n_customers, hours))).astype(dtype),
+        # Supply covers ~60-120% of midday demand across the fleet
+        "capacity": rng.uniform(0.5, 1.5, (n_providers, hours)) * sun * (1.8 * n_customers / n_providers),
+        "price": np.round(rng.uniform(14, 26, (n_providers, hours)), 2),
+        "reliability": rng.uniform(0.7, 0.98, n_providers),
+    }
+
+
+def check_equivalence(n_customers: int = 300, n_providers: int = 12, hours: int = 24, seed: int = 1) -> float:
+    """Max absolute difference between allocate_batch and the greedy loop over every hour"""
+    market = random_market(n_customers, n_providers, hours, seed)
+    providers = [ArrayProvider(f"p{j}", market["capacity"][j], market["price"][j], market["reliability"][j])
+                 for j in range(n_providers)]
+    customers = {f"c{i}": ArrayCustomer(market["demand"][i]) for i in range(n_customers)}
+    batch = allocate_batch(market["demand"], market["capacity"], market["price"], market["reliability"])
+    engine = AllocationEngine()
+
+    worst = 0.0
+    for hour in range(hours):
+        ref = engine.allocate_hour_reference(hour, providers, customers)
+        fast = engine.allocate_hour(hour, providers, customers)
+        assert fast.customer_allocations.keys() == ref.customer_allocations.keys()
+        for i, cid in enumerate(customers):
+            ref_alloc = ref.customer_allocations[cid]
+            assert list(fast.customer_allocations[cid]) == list(ref_alloc), (hour, cid)
+            worst = max(worst, abs(sum(ref_alloc.values()) - batch.customer_allocated[i, hour]))
+            for name, kwh in ref_alloc.items():
+                worst = max(worst, abs(fast.customer_allocations[cid][name] - kwh))
+        for j, p in enumerate(providers):
+            worst = max(worst, abs(ref.provider_utilization[p.name] - batch.provider_utilization[j, hour]))
+        worst = max(worst,
+                    abs(ref.total_allocated - batch.total_allocated[hour]),
+                    abs(ref.unmet_demand - batch.unmet_demand[hour]),
+                    abs(ref.weighted_avg_price - batch.weighted_avg_price[hour]))
+    return worst
+
+
+def time_greedy_vs_batch(n_customers: int, n_providers: int, hours: int) -> Dict[str, float]:
+    market = random_market(n_customers, n_providers, hours)
+    providers = [ArrayProvider(f"p{j}", market["capacity"][j], market["price"][j], market["reliability"][j])
+                 for j in range(n_providers)]
+    customers = {f"c{i}": ArrayCustomer(market["demand"][i]) for i in range(n_customers)}
+    engine = AllocationEngine()
+
+    started = time.perf_counter()
+    for hour in range(hours):
+        engine.allocate_hour_reference(hour, providers, customers)
+    greedy = time.perf_counter() - started
+
+    started = time.perf_counter()
+    allocate_batch(market["demand"], market["capacity"], market["price"], market["reliability"])
+    batch = time.perf_counter() - started
+    return {"greedy_s": greedy, "batch_s": batch}
+
+
+def time_year(n_customers: int, n_providers: int, hours: int = 8760) -> float:
+    market = random_market(n_customers, n_providers, hours, dtype=np.float32)
+    started = time.perf_counter()
+    result = allocate_batch(market["demand"], market["capacity"], market["price"], market["reliability"],
+                            keep_customer_hours=False)
+    elapsed = time.perf_counter() - started
+    assert result.customer_allocated.shape == (n_customers,)
+    return elapsed
+
+
+def compare_lp(n_customers: int = 200, n_providers: int = 10, hours: int = 168) -> Dict[str, Dict[str, float]]:
+    """Greedy vs LP on the same week: solve time, cost, unmet demand and worst-served customer"""
+    market = random_market(n_customers, n_providers, hours, seed=2)
+    args = (market["demand"], market["capacity"], market["price"], market["reliability"])
+
+    started = time.perf_counter()
+    greedy = allocate_batch(*args)
+    greedy_s = time.perf_counter() - started
+
+    lp = LPAllocator(min_reliability=0.8)
+    started = time.perf_counter()
+    optimal = lp.allocate(*args)
+    lp_s = time.perf_counter() - started
+
+    cold = LPAllocator(min_reliability=0.8)
+    for h in range(hours):
+        cold._basis = None
+        cold.solve_hour(market["demand"][:, h].sum(), market["capacity"][:, h], market["price"][:, h],
+                        market["reliability"])
+    cold_iterations = cold.iterations
+
+    def stats(result, seconds):
+        served = result.customer_allocated.sum(axis=1) / market["demand"].sum(axis=1)
+        delivered = (result.provider_allocated * market["reliability"][:, None]).sum()
+        return {
+            "seconds": seconds,
+            "avg_price": result.total_cost.sum() / result.total_allocated.sum(),
+            "unmet_kwh": result.unmet_demand.sum(),
+            "min_served": served.min(),
+            "reliability": delivered / result.provider_allocated.sum(),
+        }
+
+    return {
+        "greedy": stats(greedy, greedy_s),
+        "lp": {**stats(optimal, lp_s),
+               "warm_start_rate": lp.warm_starts / lp.solves,
+               "iterations": lp.iterations,
+               "cold_iterations": cold_iterations},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="e.mappa allocation benchmark")
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--providers", type=int, default=100)
+    parser.add_argument("--hours", type=int, default=8760)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("e.mappa Allocation Benchmark")
+    print("=" * 60)
+
+    worst = check_equivalence()
+    print(f"Batch vs greedy, 300 customers x 12 providers x 24h: max |diff| = {worst:.2e}")
+
+    timing = time_greedy_vs_batch(1_000, 20, 24)
+    print(f"1,000 customers x 20 providers x 24h: "
+          f"greedy {timing['greedy_s']:.2f}s, batch {timing['batch_s']:.3f}s "
+          f"({timing['greedy_s'] / timing['batch_s']:.0f}x)")
+
+    comparison = compare_lp()
+    print("\nGreedy vs LP, 200 customers x 10 providers x 168h (reliability floor 0.8):")
+    print(f"  {'':<8} {'time':>8} {'KES/kWh':>9} {'unmet kWh':>11} {'min served':>11} {'reliability':>12}")
+    for mode, row in comparison.items():
+        print(f"  {mode:<8} {row['seconds']:>7.3f}s {row['avg_price']:>9.2f} {row['unmet_kwh']:>11.1f} "
+              f"{row['min_served']:>10.1%} {row['reliability']:>12.3f}")
+    lp_row = comparison["lp"]
+    print(f"  LP warm-started {lp_row['warm_start_rate']:.0%} of hours: "
+          f"{lp_row['iterations']} simplex pivots vs {lp_row['cold_iterations']} from cold")
+
+    elapsed = time_year(args.customers, args.providers, args.hours)
+    print(f"{args.customers:,} customers x {args.providers} providers x {args.hours:,}h: batch {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
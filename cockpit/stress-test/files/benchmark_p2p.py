@@ -0,0 +1,114 @@
+"""
+e.mappa P2P Marketplace Benchmark
+Checks the call auction against the supply/demand curves and pushes a
+year of synthetic orders through both clearing modes
+"""
+
+import argparse
+import time
+from typing import Dict
+
+import numpy as np
+
+from p2p_trading import Order, OrderType, P2PMarketplace
+
+
+def random_orders(n: int, hour: int, rng: np.random.Generator):
+    """n orders for one hour, roughly one seller per two buyers, prices around KES 19-26"""
+    is_sell = rng.random(n) < 0.35
+    quantity = rng.uniform(0.05, 2.0, n)
+    price = np.where(is_sell, rng.uniform(17, 24, n), rng.uniform(19, 27, n)).round(2)
+    return [
+        Order(f"u{i % 5000}", OrderType.SELL if sell else OrderType.BUY, float(q), float(p), hour, float(hour))
+        for i, (sell, q, p) in enumerate(zip(is_sell, quantity, price))
+    ]
+
+
+def max_crossing_volume(orders) -> float:
+    """Largest volume where cumulative demand at a bid still meets cumulative supply at an ask"""
+    buys = sorted((o for o in orders if o.order_type == OrderType.BUY), key=lambda o: -o.price_per_kwh)
+    sells = sorted((o for o in orders if o.order_type == OrderType.SELL), key=lambda o: o.price_per_kwh)
+    demand = np.cumsum([o.quantity_kwh for o in buys])
+    supply = np.cumsum([o.quantity_kwh for o in sells])
+    best = 0.0
+    for i, buy in enumerate(buys):
+        # Sellers willing to trade at this bid
+        j = sum(1 for o in sells if o.price_per_kwh <= buy.price_per_kwh)
+        if j:
+            best = max(best, min(demand[i], supply[j - 1]))
+    return float(best)
+
+
+def check_call_auction(n_orders: int = 400, seed: int = 3) -> Dict[str, float]:
+    """Uniform price sits inside every matched order's limit and volume is the curve maximum"""
+    rng = np.random.default_rng(seed)
+    orders = random_orders(n_orders, 12, rng)
+    limits = {id(o): o.price_per_kwh for o in orders}
+    expected = max_crossing_volume([Order(**vars(o)) for o in orders])
+
+    market = P2PMarketplace(clearing="call")
+    for order in orders:
+        market.add_order(order)
+    trades = market.clear_call_auction(12)
+
+    price = trades[0].price_per_kwh
+    assert all(t.price_per_kwh == price for t in trades)
+    by_user_limit = {(o.user_id, o.order_type): limits[id(o)] for o in orders}
+    for t in trades:
+        assert by_user_limit[(t.buyer_id, OrderType.BUY)] >= price >= by_user_limit[(t.seller_id, OrderType.SELL)]
+    # What is left in the book must no longer cross
+    assert market.get_market_price() == 0.0 or market.buy_orders.peek()[0] < market.sell_orders.peek()[0]
+
+    volume = sum(t.quantity_kwh for t in trades)
+    return {"price": price, "volume": volume, "expected": expected}
+
+
+def time_year(orders_per_hour: int, hours: int, clearing: str, ttl: int = 6) -> Dict[str, float]:
+    """Push hours x orders_per_hour orders through one marketplace with hourly expiry"""
+    rng = np.random.default_rng(0)
+    market = P2PMarketplace(order_ttl_hours=ttl, clearing=clearing, keep_trades=False)
+    peak_book = 0
+
+    started = time.perf_counter()
+    for hour in range(hours):
+        market.expire_orders(hour)
+        for order in random_orders(orders_per_hour, hour, rng):
+            market.add_order(order)
+        if clearing == "call":
+            market.clear_call_auction(hour)
+        depth = market.get_order_book_depth()
+        peak_book = max(peak_book, depth["buy_orders"] + depth["sell_orders"])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "seconds": elapsed,
+        "orders": orders_per_hour * hours,
+        "trades": sum(s.trades for s in market.hour_stats.values()),
+        "expired": market.expired_orders,
+        "peak_book": peak_book,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="e.mappa P2P marketplace benchmark")
+    parser.add_argument("--orders-per-hour", type=int, default=250)
+    parser.add_argument("--hours", type=int, default=8760)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("e.mappa P2P Marketplace Benchmark")
+    print("=" * 60)
+
+    check = check_call_auction()
+    print(f"Call auction, 400 orders: KES {check['price']:.2f}/kWh uniform, "
+          f"{check['volume']:.2f} kWh cleared (curve max {check['expected']:.2f})")
+
+    for clearing in ("continuous", "call"):
+        run = time_year(args.orders_per_hour, args.hours, clearing)
+        print(f"{clearing:<10} {run['orders']:,} orders over {args.hours:,}h: {run['seconds']:.1f}s "
+              f"({run['orders'] / run['seconds']:,.0f} orders/s), {run['trades']:,} trades, "
+              f"{run['expired']:,} expired, peak book {run['peak_book']:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,8 +28,13 @@ class Customer:
         self.total_cost = 0
         self.kplc_comparison_cost = 0
         
-    def generate_consumption_pattern(self) -> List[float]:
-        """Generate realistic 24-hour consumption pattern"""
+    def generate_consumption_pattern(self, rng=None) -> List[float]:
+        """Generate realistic 24-hour consumption pattern
+
+        Args:
+            rng: np.random.Generator for seeded runs (default: global np.random)
+        """
+        rng = rng if rng is not None else np.random
         consumption = []
         
         patterns = {
@@ -67,7 +72,7 @@ class Customer:
                 power += pattern["evening_peak"][2] * peak_intensity
             
             # Add randomness (±15%)
-            power *= np.random.uniform(0.85, 1.15)
+            power *= rng.uniform(0.85, 1.15)
             consumption.append(max(0.1, power))  # Minimum 0.1 kW
         
         self.hourly_consumption = consumption
@@ -113,8 +118,12 @@ class Prosumer(Customer):
         return self.calculate_net_position(hour) > threshold_kwh
 
 
-def create_customer_base() -> Dict[str, Customer]:
-    """Create the 20-customer pilot base (14 consumers + 6 prosumers)"""
+def create_customer_base(rng=None) -> Dict[str, Customer]:
+    """Create the 20-customer pilot base (14 consumers + 6 prosumers)
+
+    Args:
+        rng: np.random.Generator for seeded runs (default: global np.random)
+    """
     
     customers = {}
     
@@ -125,7 +134,7 @@ def create_customer_base() -> Dict[str, Customer]:
             customer_id=customer_id,
             customer_type="residential" if i <= 12 else "business"
         )
-        customers[customer_id].generate_consumption_pattern()
+        customers[customer_id].generate_consumption_pattern(rng=rng)
     
     # Create 6 prosumers with varying ownership shares
     prosumer_shares = [4.0, 6.0, 3.0, 5.0, 4.5, 3.5]  # kW ownership
@@ -137,7 +146,7 @@ def create_customer_base() -> Dict[str, Customer]:
             ownership_share_kw=share,
             customer_type="residential"
         )
-        customers[customer_id].generate_consumption_pattern()
+        customers[customer_id].generate_consumption_pattern(rng=rng)
     
     return customers
 
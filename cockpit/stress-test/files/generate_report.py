@@ -4,11 +4,13 @@ Creates charts and reports from simulation data
 """
 
 import json
+import os
 import sys
 
 def load_results(filename='emappa_simulation_results.json'):
-    """Load simulation results from JSON"""
-    filepath = f"/home/claude/emappa_simulation/{filename}"
+    """Load simulation results from JSON (in EMAPPA_RESULTS_DIR, default: this directory)"""
+    directory = os.environ.get("EMAPPA_RESULTS_DIR", os.path.dirname(os.path.abspath(__file__)))
+    filepath = os.path.join(directory, filename)
     with open(filepath, 'r') as f:
         return json.load(f)
 
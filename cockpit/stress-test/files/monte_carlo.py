@@ -0,0 +1,154 @@
+"""
+e.mappa Monte-Carlo Stress Test
+Runs thousands of independently seeded 24-hour scenarios in parallel
+and reports P10/P50/P90 bands for the headline metrics
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from run_simulation import EmappaSimulation
+
+METRICS = ("savings_kes", "platform_revenue_kes", "unmet_demand_kwh", "provider_utilization_pct")
+PERCENTILES = (10, 50, 90)
+
+
+def scenario_seeds(n_scenarios: int, base_seed: int) -> List[np.random.SeedSequence]:
+    """
+    One independent seed per scenario, derived from base_seed
+    Scenario i gets the same stream no matter how many workers run it
+    """
+    return np.random.SeedSequence(base_seed).spawn(n_scenarios)
+
+
+def run_scenario(seed: np.random.SeedSequence) -> Dict[str, float]:
+    """Run one seeded 24-hour scenario and return its headline metrics"""
+
+    simulation = EmappaSimulation(seed=seed)
+    results = simulation.run_24_hour_simulation(verbose=False)
+    summary = results["summary"]
+
+    return {
+        "savings_kes": summary["financial_metrics"]["total_savings_kes"],
+        "platform_revenue_kes": summary["financial_metrics"]["platform_revenue_kes"],
+        "unmet_demand_kwh": sum(h["supply_demand"]["unmet_demand_kw"] for h in results["hourly_data"]),
+        "provider_utilization_pct": summary["system_metrics"]["avg_provider_utilization"],
+    }
+
+
+def _run_chunk(seeds: List[np.random.SeedSequence]) -> np.ndarray:
+    """Worker entry point: metrics for a chunk of scenarios as a (len(seeds), len(METRICS)) array"""
+    out = np.empty((len(seeds), len(METRICS)))
+    for i, seed in enumerate(seeds):
+        metrics = run_scenario(seed)
+        out[i] = [metrics[name] for name in METRICS]
+    return out
+
+
+def summarize(samples: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """P10/P50/P90 plus mean and std per metric from a (scenarios, metrics) array"""
+    bands = np.percentile(samples, PERCENTILES, axis=0)
+
+    return {
+        name: {
+            **{f"p{p}": round(float(bands[j, i]), 2) for j, p in enumerate(PERCENTILES)},
+            "mean": round(float(samples[:, i].mean()), 2),
+            "std": round(float(samples[:, i].std()), 2),
+        }
+        for i, name in enumerate(METRICS)
+    }
+
+
+def run_monte_carlo(n_scenarios: int = 1000,
+                    base_seed: int = 42,
+                    workers: Optional[int] = None,
+                    chunk_size: Optional[int] = None) -> Dict:
+    """
+    Run n_scenarios seeded scenarios across a process pool
+
+    Args:
+        n_scenarios: Number of independent 24-hour scenarios
+        base_seed: Root seed; the same value reproduces the same bands
+        workers: Worker processes (default: CPU count; 1 runs in-process)
+        chunk_size: Scenarios per task (default: spread evenly, ~4 tasks per worker)
+
+    Returns:
+        Dictionary with percentile bands, throughput and run parameters
+    """
+
+    workers = workers or os.cpu_count() or 1
+    seeds = scenario_seeds(n_scenarios, base_seed)
+    chunk_size = chunk_size or max(1, -(-n_scenarios // (workers * 4)))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, n_scenarios, chunk_size)]
+
+    started = time.perf_counter()
+    if workers == 1:
+        parts = [_run_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() keeps chunk order, so rows line up with scenario index
+            parts = list(pool.map(_run_chunk, chunks))
+    elapsed = time.perf_counter() - started
+
+    samples = np.concatenate(parts) if parts else np.empty((0, len(METRICS)))
+
+    return {
+        "parameters": {
+            "scenarios": n_scenarios,
+            "base_seed": base_seed,
+            "workers": workers,
+            "chunk_size": chunk_size,
+        },
+        "bands": summarize(samples) if n_scenarios else {},
+        "performance": {
+            "seconds": round(elapsed, 3),
+            "scenarios_per_sec": round(n_scenarios / elapsed, 1) if elapsed > 0 else 0,
+        },
+    }
+
+
+def print_report(report: Dict):
+    """Print human-readable percentile bands"""
+
+    params = report["parameters"]
+    perf = report["performance"]
+
+    print("=" * 70)
+    print(f"e.mappa Monte-Carlo - {params['scenarios']} scenarios (seed {params['base_seed']})")
+    print("=" * 70)
+    print(f"{'Metric':<28} {'P10':>12} {'P50':>12} {'P90':>12}")
+    print("-" * 70)
+    for name, band in report["bands"].items():
+        print(f"{name:<28} {band['p10']:>12,.2f} {band['p50']:>12,.2f} {band['p90']:>12,.2f}")
+    print("-" * 70)
+    print(f"Workers: {params['workers']}   "
+          f"Time: {perf['seconds']:.2f}s   "
+          f"Throughput: {perf['scenarios_per_sec']:.1f} scenarios/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="e.mappa Monte-Carlo stress test")
+    parser.add_argument("--scenarios", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the report here")
+    args = parser.parse_args()
+
+    report = run_monte_carlo(args.scenarios, args.seed, args.workers, args.chunk_size)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
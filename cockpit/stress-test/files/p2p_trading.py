@@ -3,7 +3,7 @@ e.mappa P2P Trading Marketplace
 Enables prosumers to sell excess energy credits to other customers
 """
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import heapq
@@ -33,105 +33,298 @@ class Trade:
     hour: int
     platform_fee_kes: float
 
+class _BookSide:
+    """
+    One side of the order book: a price-priority heap plus the live orders by sequence number
+    Cancelled/expired orders stay in the heap until they reach the top (lazy deletion),
+    so volume and count are kept as running totals instead of re-summing the heap
+    """
+
+    def __init__(self, sign: int):
+        """
+        Args:
+            sign: +1 for sells (lowest price first), -1 for buys (highest price first)
+        """
+        self.sign = sign
+        self.heap = []
+        self.live = {}       # seq -> Order still resting in the book
+        self.volume = 0.0
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def push(self, seq: int, order: Order):
+        heapq.heappush(self.heap, (self.sign * order.price_per_kwh, seq, order))
+        self.live[seq] = order
+        self.volume += order.quantity_kwh
+
+    def peek(self) -> Optional[Tuple[float, int, Order]]:
+        """Best live order as (price, seq, order), dropping dead entries on the way"""
+        while self.heap and self.heap[0][1] not in self.live:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None
+        key, seq, order = self.heap[0]
+        return self.sign * key, seq, order
+
+    def fill(self, seq: int, quantity_kwh: float):
+        """Take quantity off a resting order; drop it once it is (nearly) empty"""
+        order = self.live[seq]
+        order.quantity_kwh -= quantity_kwh
+        self.volume -= quantity_kwh
+        if order.quantity_kwh <= 0.001:  # Floating point tolerance
+            self.remove(seq)
+
+    def remove(self, seq: int) -> Optional[Order]:
+        order = self.live.pop(seq, None)
+        if order is None:
+            return None
+        self.volume = self.volume - order.quantity_kwh if self.live else 0.0
+        # Rebuild once dead entries outnumber live ones so the heap stays O(book size)
+        if len(self.heap) > 2 * len(self.live) + 64:
+            self.heap = [entry for entry in self.heap if entry[1] in self.live]
+            heapq.heapify(self.heap)
+        return order
+
+
+@dataclass
+class HourStats:
+    """Running trade aggregates for one hour"""
+    trades: int = 0
+    kwh: float = 0.0
+    value_kes: float = 0.0
+    fees_kes: float = 0.0
+    price_sum: float = 0.0
+
+    @property
+    def avg_price(self) -> float:
+        return self.price_sum / self.trades if self.trades else 0
+
+
 class P2PMarketplace:
     """
     Order book for peer-to-peer energy trading
     Matches buy and sell orders
+
+    Trades are indexed by hour with running aggregates, so per-hour stats and
+    book depth are O(1) and a year-long run never rescans history
     """
     
-    def __init__(self, platform_fee_percent: float = 5.0):
+    def __init__(self,
+                 platform_fee_percent: float = 5.0,
+                 order_ttl_hours: Optional[int] = None,
+                 clearing: str = "continuous",
+                 keep_trades: bool = True):
         """
         Args:
             platform_fee_percent: % fee e.mappa takes on each trade (default 5%)
+            order_ttl_hours: Orders older than this many hours are expired by
+                expire_orders() (default: never expire)
+            clearing: "continuous" matches on every add_order(); "call" lets orders
+                rest until clear_call_auction() crosses the book at one uniform price
+            keep_trades: Keep every Trade object in self.trades / trades_for_hour();
+                turn off for year-long runs where the hourly aggregates are enough
         """
+        if clearing not in ("continuous", "call"):
+            raise ValueError(f"Unknown clearing mode: {clearing}")
+
         self.platform_fee_percent = platform_fee_percent
-        self.buy_orders = []   # Max heap (highest price first)
-        self.sell_orders = []  # Min heap (lowest price first)
+        self.order_ttl_hours = order_ttl_hours
+        self.clearing = clearing
+        self.keep_trades = keep_trades
+        self.buy_orders = _BookSide(-1)   # Highest price first
+        self.sell_orders = _BookSide(+1)  # Lowest price first
         self.trades = []
         self.total_platform_revenue = 0
+        self.hour_stats: Dict[int, HourStats] = {}
+        self.seller_earnings: Dict[str, float] = {}   # Trade value minus platform fee
+        self.expired_orders = 0
+        self._trades_by_hour: Dict[int, List[Trade]] = {}
+        self._expiry: Dict[int, List[Tuple[_BookSide, int]]] = {}
         self._order_counter = 0  # For guaranteed unique ordering
         
     def add_order(self, order: Order) -> List[Trade]:
         """
         Add an order to the order book and attempt to match
-        Returns list of trades executed
+        Returns list of trades executed (always empty in call-auction mode)
         """
-        if order.order_type == OrderType.BUY:
-            # Negative for max heap (Python heapq is min heap)
-            # Use counter as tiebreaker to avoid Order comparison
-            heapq.heappush(self.buy_orders, (-order.price_per_kwh, self._order_counter, order))
-        else:
-            heapq.heappush(self.sell_orders, (order.price_per_kwh, self._order_counter, order))
+        side = self.buy_orders if order.order_type == OrderType.BUY else self.sell_orders
+        # Counter breaks price ties in time order and avoids Order comparison
+        side.push(self._order_counter, order)
+        if self.order_ttl_hours is not None:
+            self._expiry.setdefault(order.hour, []).append((side, self._order_counter))
         
         self._order_counter += 1
+        if self.clearing == "call":
+            return []
         return self._match_orders()
     
     def _match_orders(self) -> List[Trade]:
         """Match buy and sell orders when prices align"""
         new_trades = []
         
-        while self.buy_orders and self.sell_orders:
-            best_buy_price, _, buy_order = self.buy_orders[0]
-            best_sell_price, _, sell_order = self.sell_orders[0]
-            
-            best_buy_price = -best_buy_price  # Convert back from negative
+        while True:
+            best_buy = self.buy_orders.peek()
+            best_sell = self.sell_orders.peek()
+            if best_buy is None or best_sell is None:
+                break
+            best_buy_price, buy_seq, buy_order = best_buy
+            best_sell_price, sell_seq, sell_order = best_sell
             
             # Can trade if buy price >= sell price
-            if best_buy_price >= best_sell_price:
-                # Trade at seller's price (market standard)
-                trade_price = best_sell_price
-                trade_quantity = min(buy_order.quantity_kwh, sell_order.quantity_kwh)
-                
-                # Calculate platform fee
-                gross_value = trade_quantity * trade_price
-                platform_fee = gross_value * (self.platform_fee_percent / 100)
-                
-                # Record trade
-                trade = Trade(
-                    buyer_id=buy_order.user_id,
-                    seller_id=sell_order.user_id,
-                    quantity_kwh=trade_quantity,
-                    price_per_kwh=trade_price,
-                    total_kes=gross_value,
-                    hour=buy_order.hour,
-                    platform_fee_kes=platform_fee
-                )
-                
-                self.trades.append(trade)
-                new_trades.append(trade)
-                self.total_platform_revenue += platform_fee
-                
-                # Update remaining quantities
-                buy_order.quantity_kwh -= trade_quantity
-                sell_order.quantity_kwh -= trade_quantity
-                
-                # Remove fulfilled orders
-                if buy_order.quantity_kwh <= 0.001:  # Floating point tolerance
-                    heapq.heappop(self.buy_orders)
-                if sell_order.quantity_kwh <= 0.001:
-                    heapq.heappop(self.sell_orders)
-            else:
+            if best_buy_price < best_sell_price:
                 break  # No more matches possible
+
+            # Trade at seller's price (market standard)
+            trade_quantity = min(buy_order.quantity_kwh, sell_order.quantity_kwh)
+            new_trades.append(self._record_trade(buy_order, sell_order, trade_quantity,
+                                                 best_sell_price, buy_order.hour))
+            self.buy_orders.fill(buy_seq, trade_quantity)
+            self.sell_orders.fill(sell_seq, trade_quantity)
         
         return new_trades
+
+    def clear_call_auction(self, hour: int) -> List[Trade]:
+        """
+        Batch-clear every crossing order in the book at one uniform price
+
+        Buys are walked from the highest bid down and sells from the lowest ask up,
+        which gives the maximum tradable volume. Every fill then settles at the
+        midpoint of the marginal (last matched) bid and ask, so no buyer pays more
+        than their bid and no seller gets less than their ask. Unfilled remainders
+        stay in the book.
+
+        Args:
+            hour: Hour the auction runs in; recorded on the resulting trades
+
+        Returns:
+            List of trades executed
+        """
+        fills = []
+        buy_levels = list(self.buy_orders.live.items())
+        sell_levels = list(self.sell_orders.live.items())
+        buy_levels.sort(key=lambda item: (-item[1].price_per_kwh, item[0]))
+        sell_levels.sort(key=lambda item: (item[1].price_per_kwh, item[0]))
+
+        b = s = 0
+        buy_left = buy_levels[0][1].quantity_kwh if buy_levels else 0.0
+        sell_left = sell_levels[0][1].quantity_kwh if sell_levels else 0.0
+        while b < len(buy_levels) and s < len(sell_levels):
+            buy_seq, buy_order = buy_levels[b]
+            sell_seq, sell_order = sell_levels[s]
+            if buy_order.price_per_kwh < sell_order.price_per_kwh:
+                break
+            quantity = min(buy_left, sell_left)
+            fills.append((buy_seq, sell_seq, quantity))
+            buy_left -= quantity
+            sell_left -= quantity
+            if buy_left <= 0.001:
+                b += 1
+                buy_left = buy_levels[b][1].quantity_kwh if b < len(buy_levels) else 0.0
+            if sell_left <= 0.001:
+                s += 1
+                sell_left = sell_levels[s][1].quantity_kwh if s < len(sell_levels) else 0.0
+
+        if not fills:
+            return []
+
+        last_buy, last_sell, _ = fills[-1]
+        price = (self.buy_orders.live[last_buy].price_per_kwh
+                 + self.sell_orders.live[last_sell].price_per_kwh) / 2
+
+        new_trades = []
+        for buy_seq, sell_seq, quantity in fills:
+            buy_order = self.buy_orders.live[buy_seq]
+            sell_order = self.sell_orders.live[sell_seq]
+            new_trades.append(self._record_trade(buy_order, sell_order, quantity, price, hour))
+            self.buy_orders.fill(buy_seq, quantity)
+            self.sell_orders.fill(sell_seq, quantity)
+        return new_trades
+
+    def _record_trade(self, buy_order: Order, sell_order: Order,
+                      quantity_kwh: float, price: float, hour: int) -> Trade:
+        """Build a Trade and fold it into the hourly aggregates"""
+        # Calculate platform fee
+        gross_value = quantity_kwh * price
+        platform_fee = gross_value * (self.platform_fee_percent / 100)
+
+        trade = Trade(
+            buyer_id=buy_order.user_id,
+            seller_id=sell_order.user_id,
+            quantity_kwh=quantity_kwh,
+            price_per_kwh=price,
+            total_kes=gross_value,
+            hour=hour,
+            platform_fee_kes=platform_fee
+        )
+
+        if self.keep_trades:
+            self.trades.append(trade)
+            self._trades_by_hour.setdefault(hour, []).append(trade)
+
+        stats = self.hour_stats.get(hour)
+        if stats is None:
+            stats = self.hour_stats[hour] = HourStats()
+        stats.trades += 1
+        stats.kwh += quantity_kwh
+        stats.value_kes += gross_value
+        stats.fees_kes += platform_fee
+        stats.price_sum += price
+
+        self.seller_earnings[trade.seller_id] = (
+            self.seller_earnings.get(trade.seller_id, 0) + gross_value - platform_fee
+        )
+        self.total_platform_revenue += platform_fee
+        return trade
+
+    def expire_orders(self, current_hour: int) -> int:
+        """
+        Drop resting orders placed more than order_ttl_hours before current_hour
+        Returns the number of orders expired (always 0 without a TTL)
+        """
+        if self.order_ttl_hours is None:
+            return 0
+
+        cutoff = current_hour - self.order_ttl_hours
+        expired = 0
+        for hour in [h for h in self._expiry if h < cutoff]:
+            for side, seq in self._expiry.pop(hour):
+                if side.remove(seq) is not None:
+                    expired += 1
+        self.expired_orders += expired
+        return expired
+
+    def trades_for_hour(self, hour: int) -> List[Trade]:
+        """Trades recorded for an hour (empty when keep_trades is off)"""
+        return self._trades_by_hour.get(hour, [])
+
+    def get_hour_stats(self, hour: int) -> HourStats:
+        """Running trade aggregates for an hour"""
+        return self.hour_stats.get(hour) or HourStats()
+
+    def discard_hours(self, before_hour: int):
+        """Forget per-hour stats and trade index entries for hours already reported"""
+        for hour in [h for h in self.hour_stats if h < before_hour]:
+            del self.hour_stats[hour]
+        for hour in [h for h in self._trades_by_hour if h < before_hour]:
+            del self._trades_by_hour[hour]
     
     def get_market_price(self) -> float:
         """Get current market clearing price"""
-        if not self.buy_orders or not self.sell_orders:
+        best_buy = self.buy_orders.peek()
+        best_sell = self.sell_orders.peek()
+        if best_buy is None or best_sell is None:
             return 0.0
         
-        best_buy = -self.buy_orders[0][0]
-        best_sell = self.sell_orders[0][0]
-        
-        return (best_buy + best_sell) / 2
+        return (best_buy[0] + best_sell[0]) / 2
     
     def get_order_book_depth(self) -> Dict:
         """Get current order book state"""
         return {
             "buy_orders": len(self.buy_orders),
             "sell_orders": len(self.sell_orders),
-            "total_buy_volume": sum(o[2].quantity_kwh for o in self.buy_orders),
-            "total_sell_volume": sum(o[2].quantity_kwh for o in self.sell_orders)
+            "total_buy_volume": max(self.buy_orders.volume, 0.0),
+            "total_sell_volume": max(self.sell_orders.volume, 0.0)
         }
 
 
@@ -221,14 +414,22 @@ def simulate_p2p_trading_hour(hour: int,
                               consumers: List,
                               total_solar_output: float,
                               total_solar_capacity: float,
-                              marketplace: P2PMarketplace) -> Dict:
+                              marketplace: P2PMarketplace,
+                              day: int = 0) -> Dict:
     """
     Simulate P2P trading for one hour
+
+    Args:
+        hour: Hour of day (0-23), indexes the 24-hour consumption profiles
+        day: Day of a multi-day run; orders and stats are keyed by day * 24 + hour
     
     Returns:
         Dictionary with trading statistics
     """
     
+    book_hour = day * 24 + hour
+    orders_expired = marketplace.expire_orders(book_hour)
+
     # Calculate prosumer positions
     prosumer_positions = {}
     for prosumer in prosumers:
@@ -265,6 +466,7 @@ def simulate_p2p_trading_hour(hour: int,
         
         if net_position > 0.1:  # Has excess to sell
             order = agent.create_sell_order(hour, net_position, market_conditions)
+            order.hour = book_hour
             marketplace.add_order(order)
             orders_placed += 1
     
@@ -278,21 +480,25 @@ def simulate_p2p_trading_hour(hour: int,
             # They want to buy extra beyond allocation
             extra_need = consumer.hourly_consumption[hour] * 0.2  # 20% extra
             order = agent.create_buy_order(hour, extra_need, market_conditions)
+            order.hour = book_hour
             marketplace.add_order(order)
             orders_placed += 1
     
-    # Get trading statistics
-    trades_this_hour = [t for t in marketplace.trades if t.hour == hour]
+    if marketplace.clearing == "call":
+        marketplace.clear_call_auction(book_hour)
+
+    # Get trading statistics from the hourly aggregates
+    hour_stats = marketplace.get_hour_stats(book_hour)
     
     stats = {
         'hour': hour,
         'orders_placed': orders_placed,
-        'trades_executed': len(trades_this_hour),
-        'total_kwh_traded': sum(t.quantity_kwh for t in trades_this_hour),
-        'total_value_kes': sum(t.total_kes for t in trades_this_hour),
-        'platform_revenue_kes': sum(t.platform_fee_kes for t in trades_this_hour),
-        'avg_trade_price': (sum(t.price_per_kwh for t in trades_this_hour) / 
-                           len(trades_this_hour)) if trades_this_hour else 0,
+        'orders_expired': orders_expired,
+        'trades_executed': hour_stats.trades,
+        'total_kwh_traded': hour_stats.kwh,
+        'total_value_kes': hour_stats.value_kes,
+        'platform_revenue_kes': hour_stats.fees_kes,
+        'avg_trade_price': hour_stats.avg_price,
         'market_clearing_price': marketplace.get_market_price(),
         'order_book': marketplace.get_order_book_depth()
     }
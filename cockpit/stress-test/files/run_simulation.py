@@ -5,41 +5,150 @@ Generates comprehensive demo results
 """
 
 import json
-from datetime import datetime
-from typing import Dict, List
+import os
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
 import sys
 sys.path.append('/home/claude/emappa_simulation')
 
+import numpy as np
+
 from solar_generation import create_provider_fleet, get_total_available_power
 from customers import create_customer_base, get_prosumers, get_consumers, calculate_total_demand
 from allocation_engine import AllocationEngine
 from p2p_trading import P2PMarketplace, simulate_p2p_trading_hour
 
+# Where export_results() / generate_report.py read and write by default
+RESULTS_DIR = os.environ.get("EMAPPA_RESULTS_DIR", os.path.dirname(os.path.abspath(__file__)))
+
+
+class SummaryAccumulator:
+    """
+    Running totals behind the simulation summary
+    Fed one hour at a time, so multi-day runs never hold the hourly dicts
+    """
+
+    def __init__(self):
+        self.hours = 0
+        self.total_energy_allocated = 0
+        self.total_p2p_traded = 0
+        self.total_emappa_cost = 0
+        self.total_kplc_cost = 0
+        self.p2p_revenue = 0
+        self.total_trades = 0
+        self.total_p2p_value = 0
+        self.utilization_sum = 0
+        self.peak_supply = None   # (day, hour, kW)
+        self.peak_demand = None
+
+    def add(self, hour_data: Dict, day: int = 0):
+        """Fold one hour's results into the totals"""
+        self.hours += 1
+        self.total_energy_allocated += hour_data["allocation"]["total_allocated_kwh"]
+        self.total_p2p_traded += hour_data["p2p_trading"]["total_kwh_traded"]
+        self.total_emappa_cost += hour_data["costs"]["total_emappa_cost_kes"]
+        self.total_kplc_cost += hour_data["costs"]["total_kplc_cost_kes"]
+        self.p2p_revenue += hour_data["p2p_trading"]["platform_revenue_kes"]
+        self.total_trades += hour_data["p2p_trading"]["trades_executed"]
+        self.total_p2p_value += hour_data["p2p_trading"]["total_value_kes"]
+        self.utilization_sum += sum(hour_data["provider_stats"]["utilization"].values())
+
+        # Strict > keeps the first peak, as max() over the hourly list did
+        supply = hour_data["supply_demand"]["total_supply_kw"]
+        demand = hour_data["supply_demand"]["total_demand_kw"]
+        if self.peak_supply is None or supply > self.peak_supply[2]:
+            self.peak_supply = (day, hour_data["hour"], supply)
+        if self.peak_demand is None or demand > self.peak_demand[2]:
+            self.peak_demand = (day, hour_data["hour"], demand)
+
+    def summary(self, platform_markup: float, prosumer_earnings: Dict[str, float],
+                num_providers: int, days: int = 1) -> Dict:
+        """Summary dictionary in the shape print_summary() and the dashboard expect"""
+        total_energy_allocated = self.total_energy_allocated
+        total_p2p_traded = self.total_p2p_traded
+        total_emappa_cost = self.total_emappa_cost
+        total_kplc_cost = self.total_kplc_cost
+        total_savings = total_kplc_cost - total_emappa_cost
+        allocation_revenue = total_energy_allocated * platform_markup
+        p2p_revenue = self.p2p_revenue
+        total_platform_revenue = allocation_revenue + p2p_revenue
+        total_trades = self.total_trades
+
+        avg_prosumer_earnings = sum(prosumer_earnings.values()) / len(prosumer_earnings) if prosumer_earnings else 0
+
+        summary = {
+            "energy_metrics": {
+                "total_energy_allocated_kwh": round(total_energy_allocated, 2),
+                "total_p2p_traded_kwh": round(total_p2p_traded, 2),
+                "p2p_as_percent_of_total": round(total_p2p_traded / total_energy_allocated * 100, 1) if total_energy_allocated > 0 else 0
+            },
+            "financial_metrics": {
+                "total_customer_cost_emappa_kes": round(total_emappa_cost, 2),
+                "total_customer_cost_kplc_kes": round(total_kplc_cost, 2),
+                "total_savings_kes": round(total_savings, 2),
+                "avg_savings_percent": round(total_savings / total_kplc_cost * 100, 1) if total_kplc_cost > 0 else 0,
+                "platform_revenue_kes": round(total_platform_revenue, 2),
+                "revenue_from_allocation": round(allocation_revenue, 2),
+                "revenue_from_p2p": round(p2p_revenue, 2)
+            },
+            "trading_metrics": {
+                "total_p2p_trades": total_trades,
+                "total_p2p_value_kes": round(self.total_p2p_value, 2),
+                "avg_trade_size_kwh": round(total_p2p_traded / total_trades, 2) if total_trades > 0 else 0,
+                "avg_prosumer_earnings_kes": round(avg_prosumer_earnings, 2),
+                "top_prosumer_earnings_kes": round(max(prosumer_earnings.values()), 2) if prosumer_earnings else 0
+            },
+            "system_metrics": {
+                "peak_supply_hour": self.peak_supply[1],
+                "peak_supply_kw": round(self.peak_supply[2], 2),
+                "peak_demand_hour": self.peak_demand[1],
+                "peak_demand_kw": round(self.peak_demand[2], 2),
+                "avg_provider_utilization": round(self.utilization_sum / (self.hours * num_providers), 1)
+            }
+        }
+
+        if days > 1:
+            summary["system_metrics"]["peak_supply_day"] = self.peak_supply[0]
+            summary["system_metrics"]["peak_demand_day"] = self.peak_demand[0]
+
+        return summary
+
 
 class EmappaSimulation:
     """Complete e.mappa platform simulation"""
     
-    def __init__(self):
-        self.providers = create_provider_fleet()
-        self.customers = create_customer_base()
+    def __init__(self, seed=None, order_ttl_hours: Optional[int] = None, keep_trades: bool = True):
+        """
+        Args:
+            seed: int or np.random.SeedSequence for a reproducible scenario
+                  (default: unseeded global np.random, as in the demo)
+            order_ttl_hours: Expire unmatched P2P orders after this many hours
+                  (default: never; multi-day runs should set it to keep the book bounded)
+            keep_trades: Keep every P2P Trade object (turn off for multi-day runs)
+        """
+        rng = np.random.default_rng(seed) if seed is not None else None
+        self._rng = rng
+        self.providers = create_provider_fleet(rng=rng)
+        self.customers = create_customer_base(rng=rng)
         self.allocation_engine = AllocationEngine(platform_markup=2.0)
-        self.p2p_marketplace = P2PMarketplace(platform_fee_percent=5.0)
+        self.p2p_marketplace = P2PMarketplace(platform_fee_percent=5.0,
+                                              order_ttl_hours=order_ttl_hours,
+                                              keep_trades=keep_trades)
         
         self.prosumers = get_prosumers(self.customers)
         self.consumers = get_consumers(self.customers)
         
         self.simulation_results = []
         
-    def run_24_hour_simulation(self) -> Dict:
-        """Run complete 24-hour simulation"""
+    def run_24_hour_simulation(self, verbose: bool = True) -> Dict:
+        """Run complete 24-hour simulation
+
+        Args:
+            verbose: print progress (Monte-Carlo workers turn this off)
+        """
         
-        print("=" * 70)
-        print("e.mappa Platform Simulation - 24 Hour Demo")
-        print("=" * 70)
-        print(f"Simulation Date: {datetime.now().strftime('%Y-%m-%d')}")
-        print(f"Providers: {len(self.providers)}")
-        print(f"Customers: {len(self.customers)} (Prosumers: {len(self.prosumers)}, Consumers: {len(self.consumers)})")
-        print("=" * 70)
+        if verbose:
+            self._print_header()
         
         hourly_results = []
         
@@ -48,7 +157,7 @@ class EmappaSimulation:
             hourly_results.append(hour_data)
             
             # Print progress
-            if hour % 6 == 0:
+            if verbose and hour % 6 == 0:
                 print(f"\n[Hour {hour:02d}:00] Simulating...")
         
         # Calculate summary statistics
@@ -68,9 +177,84 @@ class EmappaSimulation:
         
         self.simulation_results = full_results
         return full_results
+
+    def run_days(self,
+                 days: int,
+                 on_hour: Optional[Callable[[int, Dict], None]] = None,
+                 start_date: Optional[datetime] = None,
+                 verbose: bool = False) -> Dict:
+        """
+        Run a multi-day simulation without keeping the hourly results
+
+        Each day redraws provider production and customer consumption from the
+        simulation's generator. Every hour is handed to on_hour(day, hour_data)
+        (e.g. a streaming file writer) and folded into a running summary, so
+        memory stays flat however many days are simulated.
+
+        Args:
+            days: Number of days to simulate (365 for a year)
+            on_hour: Called with (day, hour_data) as each hour is produced
+            start_date: Date of day 0 (default: today)
+            verbose: print progress once per simulated month
+
+        Returns:
+            Dictionary with simulation metadata and summary (no hourly data)
+        """
+
+        start_date = start_date or datetime.now()
+        accumulator = SummaryAccumulator()
+
+        for day in range(days):
+            if day > 0:
+                self._start_day(start_date + timedelta(days=day))
+            for hour in range(24):
+                hour_data = self._simulate_hour(hour, day)
+                accumulator.add(hour_data, day)
+                if on_hour is not None:
+                    on_hour(day, hour_data)
+            # Hours of finished days have been reported; the marketplace can forget them
+            self.p2p_marketplace.discard_hours((day + 1) * 24)
+
+            if verbose and (day + 1) % 30 == 0:
+                print(f"[Day {day + 1:03d}] Simulated")
+
+        full_results = {
+            "simulation_metadata": {
+                "date": start_date.isoformat(),
+                "days": days,
+                "num_providers": len(self.providers),
+                "num_customers": len(self.customers),
+                "num_prosumers": len(self.prosumers),
+                "pilot_location": "Nyeri, Kenya"
+            },
+            "summary": accumulator.summary(self.allocation_engine.platform_markup,
+                                           self.p2p_marketplace.seller_earnings,
+                                           len(self.providers), days)
+        }
+
+        self.simulation_results = full_results
+        return full_results
+
+    def _start_day(self, date: datetime):
+        """Draw a new day of provider production and customer consumption"""
+        for provider in self.providers:
+            provider.generate_production_curve(date, rng=self._rng)
+        for customer in self.customers.values():
+            customer.generate_consumption_pattern(rng=self._rng)
+        for prosumer in self.prosumers:
+            prosumer.hourly_generation = []
     
-    def _simulate_hour(self, hour: int) -> Dict:
-        """Simulate a single hour"""
+    def _print_header(self):
+        print("=" * 70)
+        print("e.mappa Platform Simulation - 24 Hour Demo")
+        print("=" * 70)
+        print(f"Simulation Date: {datetime.now().strftime('%Y-%m-%d')}")
+        print(f"Providers: {len(self.providers)}")
+        print(f"Customers: {len(self.customers)} (Prosumers: {len(self.prosumers)}, Consumers: {len(self.consumers)})")
+        print("=" * 70)
+    
+    def _simulate_hour(self, hour: int, day: int = 0) -> Dict:
+        """Simulate a single hour (hour of day; day offsets the P2P order book)"""
         
         # 1. Get provider supply and customer demand
         total_supply = get_total_available_power(self.providers, hour)
@@ -92,7 +276,8 @@ class EmappaSimulation:
             consumers=self.consumers,
             total_solar_output=total_supply,
             total_solar_capacity=total_solar_capacity,
-            marketplace=self.p2p_marketplace
+            marketplace=self.p2p_marketplace,
+            day=day
         )
         
         # 5. Calculate costs vs KPLC
@@ -149,73 +334,15 @@ class EmappaSimulation:
     def _calculate_summary(self, hourly_results: List[Dict]) -> Dict:
         """Calculate overall simulation summary statistics"""
         
-        # Energy totals
-        total_energy_allocated = sum(h["allocation"]["total_allocated_kwh"] for h in hourly_results)
-        total_p2p_traded = sum(h["p2p_trading"]["total_kwh_traded"] for h in hourly_results)
-        
-        # Cost comparisons
-        total_emappa_cost = sum(h["costs"]["total_emappa_cost_kes"] for h in hourly_results)
-        total_kplc_cost = sum(h["costs"]["total_kplc_cost_kes"] for h in hourly_results)
-        total_savings = total_kplc_cost - total_emappa_cost
-        
-        # Platform revenue
-        allocation_revenue = total_energy_allocated * self.allocation_engine.platform_markup
-        p2p_revenue = sum(h["p2p_trading"]["platform_revenue_kes"] for h in hourly_results)
-        total_platform_revenue = allocation_revenue + p2p_revenue
-        
-        # Trading stats
-        total_trades = sum(h["p2p_trading"]["trades_executed"] for h in hourly_results)
-        total_p2p_value = sum(h["p2p_trading"]["total_value_kes"] for h in hourly_results)
-        
-        # Provider performance
-        peak_supply_hour = max(hourly_results, key=lambda h: h["supply_demand"]["total_supply_kw"])
-        peak_demand_hour = max(hourly_results, key=lambda h: h["supply_demand"]["total_demand_kw"])
-        
-        # Prosumer earnings (from P2P trades)
-        prosumer_earnings = {}
-        for trade in self.p2p_marketplace.trades:
-            if trade.seller_id not in prosumer_earnings:
-                prosumer_earnings[trade.seller_id] = 0
-            # Seller gets trade value minus platform fee
-            prosumer_earnings[trade.seller_id] += (trade.total_kes - trade.platform_fee_kes)
-        
-        avg_prosumer_earnings = sum(prosumer_earnings.values()) / len(prosumer_earnings) if prosumer_earnings else 0
-        
-        summary = {
-            "energy_metrics": {
-                "total_energy_allocated_kwh": round(total_energy_allocated, 2),
-                "total_p2p_traded_kwh": round(total_p2p_traded, 2),
-                "p2p_as_percent_of_total": round(total_p2p_traded / total_energy_allocated * 100, 1) if total_energy_allocated > 0 else 0
-            },
-            "financial_metrics": {
-                "total_customer_cost_emappa_kes": round(total_emappa_cost, 2),
-                "total_customer_cost_kplc_kes": round(total_kplc_cost, 2),
-                "total_savings_kes": round(total_savings, 2),
-                "avg_savings_percent": round(total_savings / total_kplc_cost * 100, 1) if total_kplc_cost > 0 else 0,
-                "platform_revenue_kes": round(total_platform_revenue, 2),
-                "revenue_from_allocation": round(allocation_revenue, 2),
-                "revenue_from_p2p": round(p2p_revenue, 2)
-            },
-            "trading_metrics": {
-                "total_p2p_trades": total_trades,
-                "total_p2p_value_kes": round(total_p2p_value, 2),
-                "avg_trade_size_kwh": round(total_p2p_traded / total_trades, 2) if total_trades > 0 else 0,
-                "avg_prosumer_earnings_kes": round(avg_prosumer_earnings, 2),
-                "top_prosumer_earnings_kes": round(max(prosumer_earnings.values()), 2) if prosumer_earnings else 0
-            },
-            "system_metrics": {
-                "peak_supply_hour": peak_supply_hour["hour"],
-                "peak_supply_kw": round(peak_supply_hour["supply_demand"]["total_supply_kw"], 2),
-                "peak_demand_hour": peak_demand_hour["hour"],
-                "peak_demand_kw": round(peak_demand_hour["supply_demand"]["total_demand_kw"], 2),
-                "avg_provider_utilization": round(
-                    sum(sum(h["provider_stats"]["utilization"].values()) 
-                        for h in hourly_results) / (len(hourly_results) * len(self.providers)), 1
-                )
-            }
-        }
-        
-        return summary
+        accumulator = SummaryAccumulator()
+        for hour_data in hourly_results:
+            accumulator.add(hour_data)
+
+        # Prosumer earnings (from P2P trades): trade value minus platform fee,
+        # kept as a running total by the marketplace
+        return accumulator.summary(self.allocation_engine.platform_markup,
+                                   self.p2p_marketplace.seller_earnings,
+                                   len(self.providers))
     
     def print_summary(self):
         """Print human-readable summary of simulation"""
@@ -225,9 +352,10 @@ class EmappaSimulation:
             return
         
         summary = self.simulation_results["summary"]
+        days = self.simulation_results["simulation_metadata"].get("days", 1)
         
         print("\n" + "=" * 70)
-        print("SIMULATION SUMMARY - 24 HOURS")
+        print("SIMULATION SUMMARY - 24 HOURS" if days == 1 else f"SIMULATION SUMMARY - {days} DAYS")
         print("=" * 70)
         
         print("\n🔋 ENERGY METRICS")
@@ -264,14 +392,23 @@ class EmappaSimulation:
         
         print("\n" + "=" * 70)
     
-    def export_results(self, filename: str = "emappa_simulation_results.json"):
-        """Export simulation results to JSON file"""
+    def export_results(self, filename: str = "emappa_simulation_results.json",
+                       directory: Optional[str] = None):
+        """
+        Export simulation results to JSON file
+
+        Args:
+            filename: Output file name
+            directory: Output directory (default: RESULTS_DIR, set with EMAPPA_RESULTS_DIR)
+        """
         
         if not self.simulation_results:
             print("No simulation results to export.")
             return
         
-        filepath = f"/home/claude/emappa_simulation/{filename}"
+        directory = directory or RESULTS_DIR
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, filename)
         
         with open(filepath, 'w') as f:
             json.dump(self.simulation_results, f, indent=2)
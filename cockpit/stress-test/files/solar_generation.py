@@ -20,11 +20,15 @@ class SolarProvider:
         self.hourly_generation = []
         self.hourly_prices = []
         
-    def generate_production_curve(self, date: datetime) -> List[float]:
+    def generate_production_curve(self, date: datetime, rng=None) -> List[float]:
         """
         Generate realistic 24-hour solar production curve
         Based on Nyeri, Kenya solar irradiance patterns
+
+        Args:
+            rng: np.random.Generator for seeded runs (default: global np.random)
         """
+        rng = rng if rng is not None else np.random
         hours = range(24)
         production = []
         
@@ -41,7 +45,7 @@ class SolarProvider:
                 # Cloud factor varies by provider reliability
                 # More reliable providers have better weather forecasting/redundancy
                 cloud_variance = 1.0 - (self.reliability * 0.3)  # 70-100% range
-                cloud_factor = np.random.uniform(cloud_variance, 1.0)
+                cloud_factor = rng.uniform(cloud_variance, 1.0)
                 
                 # Calculate actual power output
                 power_kw = (self.capacity_kw * solar_intensity * 
@@ -93,8 +97,12 @@ class SolarProvider:
         return self.hourly_prices[hour]
 
 
-def create_provider_fleet() -> List[SolarProvider]:
-    """Create the 3 solar providers for e.mappa pilot"""
+def create_provider_fleet(rng=None) -> List[SolarProvider]:
+    """Create the 3 solar providers for e.mappa pilot
+
+    Args:
+        rng: np.random.Generator for seeded runs (default: global np.random)
+    """
     
     providers = [
         SolarProvider(
@@ -120,7 +128,7 @@ def create_provider_fleet() -> List[SolarProvider]:
     # Generate production curves and pricing for all providers
     today = datetime.now()
     for provider in providers:
-        provider.generate_production_curve(today)
+        provider.generate_production_curve(today, rng=rng)
         provider.generate_dynamic_pricing()
     
     return providers
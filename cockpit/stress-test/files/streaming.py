@@ -0,0 +1,255 @@
+"""
+e.mappa Streaming Simulation
+Runs multi-day / year-long simulations for one or more buildings and streams
+every hour to a columnar file (Parquet when pyarrow is installed, else CSV)
+while the summary is accumulated on the fly - memory stays flat
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: falls back to CSV
+    pa = pq = None
+
+from run_simulation import EmappaSimulation
+
+# Leaf column names stored as integers; everything else is float64
+INT_FIELDS = frozenset({
+    "building", "day", "hour",
+    "orders_placed", "orders_expired", "trades_executed", "buy_orders", "sell_orders",
+})
+SUMMARY_TOTALS = (
+    ("energy_metrics", "total_energy_allocated_kwh"),
+    ("energy_metrics", "total_p2p_traded_kwh"),
+    ("financial_metrics", "total_customer_cost_emappa_kes"),
+    ("financial_metrics", "total_customer_cost_kplc_kes"),
+    ("financial_metrics", "total_savings_kes"),
+    ("financial_metrics", "platform_revenue_kes"),
+    ("trading_metrics", "total_p2p_trades"),
+)
+
+
+def flatten_hour(hour_data: Dict, prefix: str = "") -> Dict:
+    """Nested hour dict -> flat row, e.g. {"supply_demand.total_supply_kw": 41.2, ...}"""
+    row = {}
+    for key, value in hour_data.items():
+        if prefix and key == "hour":
+            continue  # p2p_trading repeats the hour
+        if isinstance(value, dict):
+            row.update(flatten_hour(value, f"{prefix}{key}."))
+        else:
+            row[f"{prefix}{key}"] = value
+    return row
+
+
+class _HourlyWriter(ABC):
+    """Buffers flat rows and hands them to the file format in blocks;
+    subclasses must implement _write and _close"""
+
+    extension = ""
+
+    def __init__(self, path: str, buffer_rows: int = 24 * 7):
+        self.path = path
+        self.buffer_rows = buffer_rows
+        self.rows_written = 0
+        self._rows = []
+
+    def add(self, row: Dict):
+        self._rows.append(row)
+        if len(self._rows) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._write(self._rows)
+            self.rows_written += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    @abstractmethod
+    def _write(self, rows: List[Dict]):
+        """Write one buffered block of rows"""
+
+    @abstractmethod
+    def _close(self):
+        """Release the underlying file/writer"""
+
+
+class CsvHourlyWriter(_HourlyWriter):
+    """One CSV row per simulated hour, header taken from the first row"""
+
+    extension = "csv"
+
+    def __init__(self, path: str, buffer_rows: int = 24 * 7):
+        super().__init__(path, buffer_rows)
+        self._file = open(path, "w", newline="")
+        self._writer = None
+
+    def _write(self, rows: List[Dict]):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0]))
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetHourlyWriter(_HourlyWriter):
+    """Parquet file written one row group per buffered block (needs pyarrow)"""
+
+    extension = "parquet"
+
+    def __init__(self, path: str, buffer_rows: int = 24 * 7, compression: str = "zstd"):
+        if pa is None:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow) - use format='csv'")
+        super().__init__(path, buffer_rows)
+        self.compression = compression
+        self._writer = None
+
+    def _write(self, rows: List[Dict]):
+        if self._writer is None:
+            schema = pa.schema([
+                (name, pa.int64() if name.rsplit(".", 1)[-1] in INT_FIELDS else pa.float64())
+                for name in rows[0]
+            ])
+            self._writer = pq.ParquetWriter(self.path, schema, compression=self.compression)
+        self._writer.write_table(pa.Table.from_pylist(rows, schema=self._writer.schema))
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_hourly_writer(directory: str, fmt: str = "auto", name: str = "hourly") -> _HourlyWriter:
+    """
+    Create the hourly writer for directory/name.<ext>
+
+    Args:
+        directory: Output directory (created if missing)
+        fmt: "parquet", "csv" or "auto" (Parquet when pyarrow is installed)
+        name: File name without extension
+    """
+    if fmt == "auto":
+        fmt = "parquet" if pa is not None else "csv"
+    writers = {"csv": CsvHourlyWriter, "parquet": ParquetHourlyWriter}
+    if fmt not in writers:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    os.makedirs(directory, exist_ok=True)
+    writer_cls = writers[fmt]
+    return writer_cls(os.path.join(directory, f"{name}.{writer_cls.extension}"))
+
+
+def run_streaming(days: int = 365,
+                  buildings: int = 1,
+                  directory: str = "results",
+                  fmt: str = "auto",
+                  base_seed: int = 42,
+                  order_ttl_hours: Optional[int] = 24,
+                  verbose: bool = True) -> Dict:
+    """
+    Simulate `days` days for each building and stream the hours to disk
+
+    Buildings run one after another, each with its own seeded scenario, so
+    only one simulation is alive at a time. All hours land in one file with
+    `building` and `day` columns; summaries go to summary.json.
+
+    Args:
+        days: Days per building (365 for a year)
+        buildings: Number of independent buildings (20-home pilots)
+        directory: Output directory for hourly.<ext> and summary.json
+        fmt: "parquet", "csv" or "auto"
+        base_seed: Root seed; building i always gets the same scenario
+        order_ttl_hours: Expire unmatched P2P orders after this many hours
+        verbose: print progress per building
+
+    Returns:
+        Dictionary with run parameters, fleet totals and per-building summaries
+    """
+
+    seeds = np.random.SeedSequence(base_seed).spawn(buildings)
+    writer = open_hourly_writer(directory, fmt)
+    summaries = []
+
+    started = time.perf_counter()
+    try:
+        for building, seed in enumerate(seeds):
+            simulation = EmappaSimulation(seed=seed, order_ttl_hours=order_ttl_hours, keep_trades=False)
+
+            def on_hour(day: int, hour_data: Dict, building=building):
+                writer.add({"building": building, "day": day, **flatten_hour(hour_data)})
+
+            results = simulation.run_days(days, on_hour=on_hour)
+            summaries.append({"building": building, **results["summary"]})
+            if verbose:
+                savings = results["summary"]["financial_metrics"]["total_savings_kes"]
+                print(f"[Building {building + 1}/{buildings}] {days} days, savings KES {savings:,.2f}")
+    finally:
+        writer.close()
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "parameters": {
+            "days": days,
+            "buildings": buildings,
+            "base_seed": base_seed,
+            "order_ttl_hours": order_ttl_hours,
+        },
+        "output": {"hourly": writer.path, "rows": writer.rows_written},
+        "performance": {
+            "seconds": round(elapsed, 3),
+            "hours_per_sec": round(writer.rows_written / elapsed, 1) if elapsed > 0 else 0,
+        },
+        "fleet": {
+            metric: round(sum(s[group][metric] for s in summaries), 2)
+            for group, metric in SUMMARY_TOTALS
+        },
+        "buildings": summaries,
+    }
+
+    with open(os.path.join(directory, "summary.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="e.mappa streaming multi-day simulation")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--buildings", type=int, default=1)
+    parser.add_argument("--out", default="results", help="output directory")
+    parser.add_argument("--format", dest="fmt", choices=("auto", "parquet", "csv"), default="auto")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--order-ttl", type=int, default=24, help="hours before unmatched P2P orders expire")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"e.mappa Streaming Simulation - {args.buildings} building(s) x {args.days} days")
+    print("=" * 60)
+
+    report = run_streaming(args.days, args.buildings, args.out, args.fmt, args.seed, args.order_ttl)
+
+    print("-" * 60)
+    for metric, value in report["fleet"].items():
+        print(f"  {metric:<32} {value:>16,.2f}")
+    print("-" * 60)
+    print(f"✅ {report['output']['rows']:,} hourly rows -> {report['output']['hourly']} "
+          f"({report['performance']['seconds']:.1f}s, {report['performance']['hours_per_sec']:,.0f} hours/s)")
+
+
+if __name__ == "__main__":
+    main()